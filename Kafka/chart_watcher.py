@@ -0,0 +1,64 @@
+import os
+import signal
+import sys
+from typing import Final
+
+from kafka import KafkaAdminClient
+from kafka.admin import NewTopic
+from kafka.errors import TopicAlreadyExistsError
+from kafka.producer import KafkaProducer
+
+# 차트 플러그인(airflow/dags/plugins) 경로 추가
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "airflow", "dags"))
+
+from plugins.chart_watcher import ChartWatcher, encode_record  # noqa: E402
+
+
+def create_topic(bootstrap_servers, name, partitions, replica=1):
+    client = KafkaAdminClient(bootstrap_servers=bootstrap_servers)
+    try:
+        topic = NewTopic(
+            name=name, num_partitions=partitions, replication_factor=replica
+        )
+        client.create_topics([topic])
+    except TopicAlreadyExistsError as e:
+        print(e)
+        pass
+    finally:
+        client.close()
+
+
+def main():
+    topic_name: Final = "chart_rank_changes"
+    bootstrap_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092").split(",")
+
+    create_topic(bootstrap_servers, topic_name, 5)
+
+    # provider 를 key 로 보내서 같은 차트의 변경은 같은 파티션에 순서대로 쌓이도록 한다
+    producer = KafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        client_id="chart_rank_changes_producer",
+        key_serializer=lambda k: k.encode("utf-8") if k else None,
+        value_serializer=encode_record,
+        linger_ms=50,
+    )
+
+    def send(provider, records):
+        for record in records:
+            producer.send(topic_name, key=provider, value=record)
+        producer.flush()
+
+    watcher = ChartWatcher(send)
+    signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("Chart watcher 종료")
+    finally:
+        producer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Benchmarks the chart parse hot path of every provider offline, on recorded or synthetic responses.
+
+Recorded fixtures (`plugins.chart_fixtures.record_fixture()`, saved to `benchmarks/fixtures`) are
+used when present and inflated to each size; otherwise a synthetic payload of the same shape is
+generated. No recorded fixture is committed, so numbers without `--record` come from synthetic data.
+
+사용법:
+    python airflow/benchmarks/bench_chart_parsers.py [--sizes 100 1000 10000] [--providers melon vibe]
+    python airflow/benchmarks/bench_chart_parsers.py --save baseline.json
+    python airflow/benchmarks/bench_chart_parsers.py --baseline baseline.json  # 느려지면 exit 1
+    python airflow/benchmarks/bench_chart_parsers.py --record  # 실제 응답을 fixture 로 녹화 (네트워크 필요)
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+DAGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dags")
+sys.path.insert(0, DAGS_DIR)
+
+from plugins.chart_fetcher import CHART_PROVIDERS  # noqa: E402
+from plugins.chart_fixtures import (ChartFixture, ChartFixtureException,  # noqa: E402
+                                    inflate_fixture, record_fixture,
+                                    replay_chart, synthetic_fixture)
+
+DEFAULT_SIZES = (100, 1000, 10000)
+# baseline 대비 이 비율 이상 느려지면 regression 으로 본다
+DEFAULT_TOLERANCE = 0.25
+
+# provider -> (이미지 URL 변환 메서드 이름, 예시 URL)
+IMAGE_HELPERS = {
+    "melon": ("_getResizedImage", "https://cdnimg.melon.co.kr/cm2/album/images/111/00001/1_500.jpg/melon/resize/120/quality/80/optimize"),
+    "flo": ("_getResizedImage", "https://cdn.music-flo.com/image/album/001/1.jpg?1&/dims/resize/350x350/quality/90"),
+    "vibe": ("_getResizedImageUrl", "https://musicmeta-phinf.pstatic.net/album/030/000001/1.jpg?type=r480Fll&v=20250301"),
+}
+
+
+def load_fixture(provider: str, size: int) -> ChartFixture:
+    try:
+        return inflate_fixture(provider, ChartFixture.load(provider), size)
+    except ChartFixtureException:
+        return synthetic_fixture(provider, size)
+
+
+def _best(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _memory(func):
+    """Returns (peak bytes, blocks still allocated by the result) for one call of `func`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        current = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count for stat in current.statistics("filename"))
+    del result
+    return peak, blocks
+
+
+def bench_provider(provider: str, size: int, repeat: int) -> dict:
+    fixture = load_fixture(provider, size)
+    data = json.loads(fixture.body)
+
+    def parse():
+        chart = CHART_PROVIDERS[provider]()
+        chart._parseEntries(data)
+        return chart
+
+    def fetch():
+        chart = replay_chart(provider, fixture)
+        chart.fetchEntries()
+        return chart
+
+    def stream():
+        chart = replay_chart(provider, fixture)
+        for _ in chart.streamEntries():
+            pass
+        return chart
+
+    entries = len(fetch())
+    # parse 는 이미 디코딩된 dict 에서 시작하므로 JSON 디코딩 비용이 빠져 있다.
+    # stream 은 본문 전체를 dict 로 만들지 않으므로 큰 차트에서 fetch 보다 peak 가 훨씬 작아야 한다
+    parsePeak, _ = _memory(parse)
+    peak, blocks = _memory(fetch)
+    streamPeak, _ = _memory(stream)
+    return {
+        "provider": provider,
+        "size": size,
+        "entries": entries,
+        "bytes": len(fixture.body),
+        "parse": entries / _best(parse, repeat),
+        "fetch": entries / _best(fetch, repeat),
+        "stream": entries / _best(stream, repeat),
+        "parsePeakKiB": parsePeak / 1024,
+        "peakKiB": peak / 1024,
+        "streamPeakKiB": streamPeak / 1024,
+        "blocks": blocks,
+    }
+
+
+def bench_image_helpers(repeat: int, number: int = 10000) -> dict:
+    results = {}
+    for provider, (method, url) in IMAGE_HELPERS.items():
+        func = getattr(CHART_PROVIDERS[provider](), method)
+        seconds = min(timeit.repeat(lambda: func(url), number=number, repeat=repeat))
+        results[f"{provider}.{method}"] = seconds / number * 1e9
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the `(key, current, baseline)` throughputs that dropped more than `tolerance`."""
+    previous = {(r["provider"], r["size"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get((r["provider"], r["size"]))
+        if old is None:
+            continue
+        for metric in ("parse", "fetch", "stream"):
+            if r[metric] < old[metric] * (1 - tolerance):
+                regressions.append((f"{r['provider']}/{r['size']}/{metric}", r[metric], old[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", nargs="+", default=list(CHART_PROVIDERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="record live fixtures first")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.record:
+        for provider in args.providers:
+            record_fixture(provider)
+            print(f"🎙️ {provider} fixture 녹화 완료")
+
+    results = []
+    print(f"{'provider':<8}{'size':>7}{'KiB':>9}{'parse/s':>11}{'fetch/s':>11}{'stream/s':>11}{'parse KiB':>11}{'fetch KiB':>11}{'stream KiB':>12}{'blocks':>9}")
+    for provider in args.providers:
+        for size in args.sizes:
+            r = bench_provider(provider, size, args.repeat)
+            results.append(r)
+            print(
+                f"{provider:<8}{r['entries']:>7}{r['bytes'] / 1024:>9.0f}{r['parse']:>11,.0f}"
+                f"{r['fetch']:>11,.0f}{r['stream']:>11,.0f}{r['parsePeakKiB']:>11,.0f}{r['peakKiB']:>11,.0f}"
+                f"{r['streamPeakKiB']:>12,.0f}{r['blocks']:>9,}"
+            )
+
+    print()
+    for name, ns in bench_image_helpers(args.repeat).items():
+        print(f"{name:<32}{ns:>8.0f} ns/call")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, current, old in regressions:
+            print(f"❌ regression {name}: {current:,.0f}/s (baseline {old:,.0f}/s)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compares the chart serializers in `plugins.chart_serializers` with the original `ChartData.json()`.
+
+The baseline is the encoder the chart clients used before the columnar `ChartColumns` storage:
+`json.dumps` with a `__dict__` default over one object per entry (`LegacyChart` below).
+
+사용법:
+    python airflow/benchmarks/bench_chart_serializers.py [--entries 100] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+DAGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dags")
+sys.path.insert(0, DAGS_DIR)
+
+from plugins.chart_base import ChartColumns  # noqa: E402
+from plugins.chart_serializers import FORMATS, ChartSnapshot  # noqa: E402
+
+
+def synthetic_chart(size: int) -> ChartSnapshot:
+    columns = ChartColumns()
+    for i in range(size):
+        columns.append(
+            title=f"노래 제목 {i}",
+            artist=f"아티스트 {i % 97}",
+            image=f"https://cdnimg.melon.co.kr/cm2/album/images/{i:08d}_500.jpg",
+            rank=i + 1,
+            lastPos=i + 1 + (i % 7) - 3,
+            isNew=i % 13 == 0,
+        )
+    meta = {"provider": "melon", "name": "TOP100", "date": datetime(2025, 3, 1, 11)}
+    return ChartSnapshot(
+        meta, columns, ("rank", "title", "artist", "lastPos", "isNew", "image")
+    )
+
+
+class LegacyEntry:
+    """A per-row entry object like the original `ChartEntry`, serialized through its `__dict__`."""
+
+    def __init__(self, title, artist, image, lastPos, rank, isNew):
+        self.title = title
+        self.artist = artist
+        self.image = image
+        self.lastPos = lastPos
+        self.rank = rank
+        self.isNew = isNew
+
+
+class LegacyChart:
+    """The original `ChartData` layout: chart attributes plus a list of `LegacyEntry` objects."""
+
+    def __init__(self, chart: ChartSnapshot):
+        self.name = chart.name
+        self.date = chart.date
+        self.entries = [
+            LegacyEntry(e.title, e.artist, e.image, e.lastPos, e.rank, e.isNew)
+            for e in chart.entries
+        ]
+
+    def json(self):
+        return json.dumps(
+            self,
+            default=lambda o: o.isoformat() if isinstance(o, datetime) else o.__dict__,
+            sort_keys=True,
+            indent=4,
+            ensure_ascii=False,
+        )
+
+
+def _seconds(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(size: int, repeat: int):
+    chart = synthetic_chart(size)
+    legacyChart = LegacyChart(chart)
+    legacy = legacyChart.json()
+    rows = [("json() [legacy]", _seconds(legacyChart.json, repeat),
+             _seconds(lambda: json.loads(legacy), repeat), len(legacy.encode("utf-8")))]
+
+    for name, (dumps, loads) in FORMATS.items():
+        try:
+            data = dumps(chart)
+        except ImportError as e:
+            print(f"skip {name}: {e}")
+            continue
+        size_bytes = len(data if isinstance(data, bytes) else data.encode("utf-8"))
+        rows.append((name, _seconds(lambda: dumps(chart), repeat),
+                     _seconds(lambda: loads(data), repeat), size_bytes))
+
+    base_dump, base_load = rows[0][1], rows[0][2]
+    print(f"entries={size} repeat={repeat} (best of)")
+    print(f"{'format':<16}{'dump ms':>10}{'x':>7}{'load ms':>10}{'x':>7}{'bytes':>11}")
+    for name, dump, load, size_bytes in rows:
+        print(
+            f"{name:<16}{dump * 1000:>10.3f}{base_dump / dump:>7.1f}"
+            f"{load * 1000:>10.3f}{base_load / load:>7.1f}{size_bytes:>11,}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.entries, args.repeat)
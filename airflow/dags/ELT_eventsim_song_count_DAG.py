@@ -1,10 +1,10 @@
 import os
 from datetime import timedelta
 
+from dags.plugins.pipeline_datasets import EVENTSIM_LOG_DATASET
 from dags.plugins.variables import SPARK_JARS
 
 from airflow import DAG
-from airflow.operators.trigger_dagrun import TriggerDagRunOperator
 from airflow.providers.apache.spark.operators.spark_submit import \
     SparkSubmitOperator
 from airflow.utils.dates import days_ago
@@ -20,19 +20,11 @@ default_args = {
 dag = DAG(
     dag_id="ELT_eventsim_song_artist_count",
     default_args=default_args,
-    schedule_interval="@daily",
+    schedule=[EVENTSIM_LOG_DATASET],  # eventsim_ETL 이 EVENTSIM_LOG 를 갱신하면 실행
     catchup=False,
     tags=["ELT", "Eventsim"],
 )
 
-trigger_dag_task = TriggerDagRunOperator(
-    task_id="trigger_eventsim_etl",
-    trigger_dag_id="eventsim_ETL",  # 실행할 대상 DAG ID
-    wait_for_completion=True,  # 완료될 때까지 대기
-    poke_interval=10,  # DAG 상태 체크 주기 (초 단위)
-    dag=dag,
-)
-
 spark_submit_task = SparkSubmitOperator(
     task_id="process_songs_and_artists_spark",
     application="dags/scripts/ELT_eventsim_script.py",
@@ -43,4 +35,4 @@ spark_submit_task = SparkSubmitOperator(
     dag=dag,
 )
 
-trigger_dag_task >> spark_submit_task
+spark_submit_task
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 
+from dags.plugins.pipeline_datasets import EVENTSIM_LOG_DATASET
 from dags.plugins.variables import SPARK_JARS
 
 from airflow import DAG
@@ -42,6 +43,7 @@ spark_job = SparkSubmitOperator(
     executor_memory="2g",
     driver_memory="1g",
     jars=SPARK_JARS,
+    outlets=[EVENTSIM_LOG_DATASET],
     dag=dag,
 )
 
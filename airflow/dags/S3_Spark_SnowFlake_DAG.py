@@ -1,6 +1,8 @@
 import os
 from datetime import datetime, timedelta
 
+from plugins.pipeline_datasets import MUSIC_CHARTS_DATASET, RAW_CHARTS_DATASET
+
 from airflow import DAG
 from airflow.providers.apache.spark.operators.spark_submit import \
     SparkSubmitOperator
@@ -37,7 +39,7 @@ dag = DAG(
     "s3_to_snowflake_pipeline",
     default_args=default_args,
     description="Read from S3, process data with Spark, and store in Snowflake",
-    schedule_interval="0 2 * * *",
+    schedule=[RAW_CHARTS_DATASET],  # chart_ingest_dag 가 차트 업로드를 마치면 실행
     catchup=False,
 )
 
@@ -58,6 +60,7 @@ spark_submit_task = SparkSubmitOperator(
     name="s3_to_snowflake_pipeline",
     execution_timeout=timedelta(minutes=45),
     verbose=True,
+    outlets=[MUSIC_CHARTS_DATASET],
     jars=SPARK_JARS,
     conf={
         "spark.hadoop.fs.s3a.impl": "org.apache.hadoop.fs.s3a.S3AFileSystem",
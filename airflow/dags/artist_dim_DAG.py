@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from plugins.pipeline_datasets import ARTIST_DIM_DATASET, MUSIC_CHARTS_DATASET
+from scripts.update_artist_dim import update_artist_dim
+
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+
+# DAG 설정
+default_args = {
+    "owner": "airflow",
+    "depends_on_past": False,
+    "start_date": datetime(2025, 3, 4),
+    "retries": 2,
+    "retry_delay": timedelta(minutes=5),
+}
+
+with DAG(
+    "artist_dim_dag",
+    default_args=default_args,
+    schedule=[MUSIC_CHARTS_DATASET],  # music_charts 적재가 끝나면 실행
+    catchup=False,
+    tags=["artist_dim", "Spotify"],
+) as dag:
+
+    update_artist_dim_task = PythonOperator(
+        task_id="update_artist_dim",
+        python_callable=update_artist_dim,
+        op_kwargs={"logical_date": "{{ ds }}"},
+        outlets=[ARTIST_DIM_DATASET],
+    )
+
+    update_artist_dim_task
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from plugins.artist_dim import get_artist_dim
+from plugins.chart_cache import get_shared_cache
+from plugins.chart_fetcher import CHART_PROVIDERS
+from plugins.chart_staging import write_chart_parquet
+from plugins.pipeline_datasets import RAW_CHARTS_DATASET
+
+from airflow import DAG
+from airflow.decorators import task
+from airflow.exceptions import AirflowSkipException
+from airflow.providers.amazon.aws.hooks.s3 import S3Hook
+from airflow.utils.trigger_rule import TriggerRule
+
+# S3 설정
+S3_BUCKET = "de5-s4tify"
+LOCAL_DATA_DIR = "/opt/airflow/data"
+# 바뀌지 않은 차트는 이 시간(초) 안에 저장된 스냅샷으로 오늘 파일을 만든다 (매일 실행되므로 전날 스냅샷까지)
+CHART_SNAPSHOT_TTL = 2 * 24 * 60 * 60
+
+
+def chart_s3_key(provider, date):
+    return f"raw_data/{provider}_chart_data/{provider}_chart_{date}.parquet"
+
+
+def chart_local_path(provider, date):
+    return f"{LOCAL_DATA_DIR}/{provider}_chart_with_genre_{date}.parquet"
+
+
+# 1. provider 공통 준비: artist_dim 로컬 사본은 모든 차트가 같이 쓰므로 한 번만 동기화
+@task
+def prepare_providers():
+    artist_dim = get_artist_dim()
+    artist_dim.sync()
+    print(f"🗂️ artist_dim: {artist_dim.summary()}")
+    return list(CHART_PROVIDERS)
+
+
+# 2. provider 별 차트 조회 → 장르 추가 → Parquet 변환 → S3 업로드 (provider 마다 매핑되어 병렬 실행)
+@task(retries=2, retry_delay=timedelta(minutes=1))
+def ingest_chart(provider):
+    # Spark 적재 스크립트와 같이 실행 시점의 날짜를 사용
+    today = datetime.now().strftime("%Y-%m-%d")
+    chart = CHART_PROVIDERS[provider]()
+    changed = chart.fetchEntries(conditional=True, saveState=False)
+    if not changed and not len(chart.columns):
+        # 304 응답은 본문이 없으므로 공유 스냅샷 캐시에서 채운다 (스냅샷이 없으면 다시 요청해서 저장)
+        # 차트가 바뀌지 않아도 일별 소비자가 날짜를 잃지 않도록 오늘 파일은 항상 올린다
+        cached = chart.fetchCached(CHART_SNAPSHOT_TTL)
+        print(f"♻️ {provider} 차트 변경 없음, {'스냅샷 캐시' if cached else '다시 조회한 차트'}로 오늘 파일 작성")
+    else:
+        get_shared_cache().put(chart)
+
+    columns = chart.columns
+    print(f"📊 {provider} 차트 데이터 처리: {len(columns)}곡 (변경: {changed})")
+    # 장르는 Spotify 대신 artist_dim 로컬 사본에서 찾는다 (처음 보는 아티스트는 매일 artist_dim_dag 가 추가)
+    # artist_key 는 Snowflake 에서 artist_dim 과 조인할 때 쓰는 정규화된 아티스트 이름
+    genres, artist_keys = get_artist_dim().genresAndKeys(columns.artist)
+
+    parquet_path = write_chart_parquet(
+        chart, genres, artist_keys, chart_local_path(provider, today), today
+    )
+
+    # load_file 은 큰 파일을 multipart 로 나눠서 올린다
+    s3_key = chart_s3_key(provider, today)
+    S3Hook(aws_conn_id="S4tify_S3").load_file(
+        parquet_path, key=s3_key, bucket_name=S3_BUCKET, replace=True
+    )
+
+    # 업로드까지 끝났을 때만 fetch 상태를 저장해서, 재시도 시 건너뛰지 않도록 한다
+    chart.saveFetchState()
+    print(f"✅ S3 업로드 완료: {s3_key}")
+    return s3_key
+
+
+# 3. 모든 provider 가 끝나면 (일부가 실패해도) 올라간 차트가 있을 때만 RAW_CHARTS_DATASET 갱신
+#    (모두 실패하면 Dataset 이벤트를 남기지 않으므로 적재 DAG 도 실행되지 않는다)
+@task(trigger_rule=TriggerRule.ALL_DONE, outlets=[RAW_CHARTS_DATASET])
+def collect_landed_charts(s3_keys):
+    landed = [key for key in s3_keys if key]
+    if not landed:
+        raise AirflowSkipException("새로 업로드된 차트가 없어 적재를 건너뜁니다.")
+    print(f"📦 업로드된 차트 {len(landed)}개: {landed}")
+    return landed
+
+
+# 4. 마지막 태스크: ingest_chart 중 하나라도 실패하면 upstream_failed 가 되어 DAG 실행이 실패한다
+@task(trigger_rule=TriggerRule.NONE_FAILED)
+def check_ingest_results():
+    print("✅ 모든 차트 수집 태스크가 성공했습니다.")
+
+
+# DAG 설정
+default_args = {
+    "owner": "airflow",
+    "depends_on_past": False,
+    "start_date": datetime(2025, 2, 27),
+    "retries": 1,
+    "retry_delay": timedelta(minutes=2),
+}
+
+with DAG(
+    "chart_ingest_dag",
+    default_args=default_args,
+    schedule_interval="0 1 * * *",  # 매일 01:00 실행 (모든 차트를 한 번에 수집)
+    catchup=False,
+    tags=["chart"],
+) as dag:
+
+    # 마지막 provider 가 끝나는 즉시 RAW_CHARTS_DATASET 을 통해 s3_to_snowflake_pipeline 이 실행된다
+    ingested = ingest_chart.expand(provider=prepare_providers())
+    collect_landed_charts(ingested)
+    # 실패한 provider 가 있으면 DAG 실행도 실패로 남긴다
+    ingested >> check_ingest_results()
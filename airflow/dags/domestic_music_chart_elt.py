@@ -1,17 +1,13 @@
-import time
 from datetime import timedelta
 
+from plugins.pipeline_datasets import ARTIST_DIM_DATASET, MUSIC_CHARTS_DATASET
+
 from airflow import DAG
 from airflow.operators.dummy import DummyOperator
-from airflow.operators.python import PythonOperator
 from airflow.providers.snowflake.operators.snowflake import SnowflakeOperator
 from airflow.utils.dates import days_ago
 
 
-def wait_one_minute():
-    time.sleep(60)
-
-
 default_args = {
     "owner": "airflow",
     "start_date": days_ago(1),
@@ -22,7 +18,8 @@ default_args = {
 with DAG(
     "domestic_music_chart_dashboard_elt",
     default_args=default_args,
-    schedule_interval="@daily",
+    # music_charts 적재와 그 뒤의 artist_dim 갱신이 모두 끝나면 실행
+    schedule=[MUSIC_CHARTS_DATASET, ARTIST_DIM_DATASET],
     catchup=False,
 ) as dag:
 
@@ -30,26 +27,34 @@ with DAG(
     start = DummyOperator(task_id="start")
 
     # Step 1: 최신 데이터만 추출하여 adhoc 스키마에 저장 (컬럼 "DATE" 사용)
+    # 장르는 차트 수집 시 artist_name_keys() 로 계산한 artist_key 로 artist_dim 과 조인하고,
+    # artist_dim 에 없는 아티스트만 차트 파일의 genre 를 사용
     clean_music_chart = SnowflakeOperator(
         task_id="clean_music_chart",
         snowflake_conn_id="snowflake_conn",
         sql="""
             CREATE OR REPLACE TABLE s4tify.adhoc.music_chart_cleaned AS
             SELECT
-                rank, title, artist, genre, lastpos, image, peakpos, isnew, source, "DATE" AS time_date
-            FROM s4tify.raw_data.music_charts
-            WHERE "DATE" = (SELECT MAX("DATE") FROM s4tify.raw_data.music_charts);
+                c.rank, c.title, c.artist,
+                CASE
+                    WHEN ARRAY_SIZE(d.genres) > 0 THEN d.genres
+                    -- Parquet 적재분은 JSON 배열, 이전 CSV 적재분은 파이썬 리스트 문자열
+                    ELSE COALESCE(TRY_PARSE_JSON(c.genre), TRY_PARSE_JSON(REPLACE(c.genre, '''', '\"')))::ARRAY
+                END AS genre,
+                c.lastpos, c.image, c.peakpos, c.isnew, c.source, c."DATE" AS time_date
+            FROM s4tify.raw_data.music_charts c
+            LEFT JOIN s4tify.raw_data.artist_dim d
+                ON ARRAY_CONTAINS(c.artist_key::VARIANT, d.name_keys)
+            WHERE c."DATE" = (SELECT MAX("DATE") FROM s4tify.raw_data.music_charts)
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY c.source, c.rank, c.title, c.artist ORDER BY d.updated_at DESC
+            ) = 1;
         """,
     )
 
-    # Step 2: 1분 대기 (데이터 저장 후 안정적 처리 위해)
-    wait_task = PythonOperator(
-        task_id="wait_one_minute",
-        python_callable=wait_one_minute,
-    )
-    # Step 3: 대시보드용 ELT SQL 태스크들
+    # Step 2: 대시보드용 ELT SQL 태스크들 (clean_music_chart 가 끝나면 바로 실행)
 
-    # 3-1. 장르별 인기곡 트렌드 분석 (수정됨)
+    # 2-1. 장르별 인기곡 트렌드 분석 (수정됨)
     genre_trend_analysis = SnowflakeOperator(
         task_id="genre_trend_analysis",
         snowflake_conn_id="snowflake_conn",
@@ -60,13 +65,13 @@ with DAG(
                 COUNT(DISTINCT title) AS total_songs,
                 AVG(rank) AS avg_rank
             FROM s4tify.adhoc.music_chart_cleaned,
-            LATERAL FLATTEN(input => parse_json(REPLACE(genre, '''', '\"'))) AS genre_flattened
+            LATERAL FLATTEN(input => genre) AS genre_flattened
             GROUP BY genre_flattened.value
             ORDER BY avg_rank;
         """,
     )
 
-    # 3-2. 아티스트별 최고 순위 및 평균 순위 분석
+    # 2-2. 아티스트별 최고 순위 및 평균 순위 분석
     artist_performance = SnowflakeOperator(
         task_id="artist_performance",
         snowflake_conn_id="snowflake_conn",
@@ -84,7 +89,7 @@ with DAG(
         """,
     )
 
-    # 3-3. 신곡(NEW) 현황 분석
+    # 2-3. 신곡(NEW) 현황 분석
     new_songs_analysis = SnowflakeOperator(
         task_id="new_songs_analysis",
         snowflake_conn_id="snowflake_conn",
@@ -98,7 +103,7 @@ with DAG(
         """,
     )
 
-    # 3-4. TOP 10 곡의 안정성 분석 (평균/최대 유지 기간)
+    # 2-4. TOP 10 곡의 안정성 분석 (평균/최대 유지 기간)
     top10_stability = SnowflakeOperator(
         task_id="top10_stability",
         snowflake_conn_id="snowflake_conn",
@@ -117,7 +122,7 @@ with DAG(
         """,
     )
 
-    # 3-5. 차트 1위 곡의 주간 유지 기간 분석
+    # 2-5. 차트 1위 곡의 주간 유지 기간 분석
     no1_song_duration = SnowflakeOperator(
         task_id="no1_song_duration",
         snowflake_conn_id="snowflake_conn",
@@ -145,7 +150,7 @@ with DAG(
         """,
     )
 
-    # 3-6. 랭킹 상승/하락 곡 분석
+    # 2-6. 랭킹 상승/하락 곡 분석
     rank_change_analysis = SnowflakeOperator(
         task_id="rank_change_analysis",
         snowflake_conn_id="snowflake_conn",
@@ -191,9 +196,9 @@ with DAG(
     end = DummyOperator(task_id="end")
 
     # DAG 실행 순서
-    start >> clean_music_chart >> wait_task
     (
-        wait_task
+        start
+        >> clean_music_chart
         >> [
             genre_trend_analysis,
             artist_performance,
@@ -0,0 +1,353 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List
+
+# 아티스트 이름 -> Spotify ID, ID -> 장르 캐시 파일. 같은 worker 의 모든 프로세스가 공유한다
+ARTIST_CACHE_PATH = os.getenv(
+    "ARTIST_CACHE_PATH",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "artist_cache.sqlite3"),
+)
+# 캐시 유효 기간 (초)
+DEFAULT_ID_TTL = 30 * 24 * 60 * 60
+DEFAULT_GENRE_TTL = 7 * 24 * 60 * 60
+# "찾을 수 없음" 결과를 기억하는 기간 (초)
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+# 날짜별 top-tracks 결과를 보관하는 기간 (초). 같은 날짜의 재실행/재시도만 재사용한다
+DEFAULT_TOP_TRACKS_RETENTION = 3 * 24 * 60 * 60
+# SQLite 의 바인딩 변수 개수 제한보다 작게 IN (...) 조회를 나눈다
+_QUERY_CHUNK_SIZE = 500
+
+# 캐시에 값이 없을 때 반환하는 값. None 은 "조회했지만 없음" 을 뜻한다
+MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artist_ids (
+    name TEXT PRIMARY KEY,
+    artist_id TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artist_aliases (
+    alias TEXT PRIMARY KEY,
+    artist_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artist_top_tracks (
+    day TEXT NOT NULL,
+    artist_id TEXT NOT NULL,
+    tracks TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (day, artist_id)
+);
+CREATE TABLE IF NOT EXISTS artist_genres (
+    artist_id TEXT PRIMARY KEY,
+    genres TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+# "(feat. X)", "[with X]" 처럼 괄호로 감싼 피처링 표기
+_PAREN_FEATURING = re.compile(r"[(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^)\]]*[)\]]")
+# 괄호 없이 뒤에 붙는 " feat. X" 표기
+_TRAILING_FEATURING = re.compile(r"\s(?:feat\.?|ft\.?|featuring)\s.*$")
+_HANGUL = re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3]")
+_LATIN = re.compile(r"[a-z]")
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def normalize_artist_name(name: str) -> str:
+    """Returns the cache key for an artist name: NFKC-normalized, casefolded, single-spaced."""
+    name = unicodedata.normalize("NFKC", name or "")
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+def _split_scripts(name):
+    # "아이브 ive" 처럼 한글 표기와 로마자 표기가 나란히 있으면 각각을 별칭으로 본다
+    groups = []
+    for token in re.split(r"[\s/]+", name):
+        if not token:
+            continue
+        hangul = bool(_HANGUL.search(token))
+        if groups and groups[-1][0] == hangul:
+            groups[-1][1].append(token)
+        else:
+            groups.append((hangul, [token]))
+    return [" ".join(tokens) for _, tokens in groups] if len(groups) > 1 else []
+
+
+def _split_trailing_alias(name):
+    # 이름 끝의 "(아이브)" 같은 병기 표기를 (이름, 별칭) 으로 나눈다.
+    # "(여자)아이들" 처럼 이름 일부인 괄호와 "((여자)아이들)" 같은 중첩 괄호도 처리한다
+    if not name.endswith((")", "]")):
+        return name, None
+    depth = 0
+    for i in range(len(name) - 1, -1, -1):
+        if name[i] in ")]":
+            depth += 1
+        elif name[i] in "([":
+            depth -= 1
+            if depth == 0:
+                if i == 0:
+                    return name, None
+                return name[:i].strip(), name[i + 1:-1].strip()
+    return name, None
+
+
+def _without_featuring(name):
+    name = _TRAILING_FEATURING.sub("", _PAREN_FEATURING.sub("", name))
+    return re.sub(r"\s+", " ", name).strip()
+
+
+def _script(name):
+    hangul = bool(_HANGUL.search(name))
+    latin = bool(_LATIN.search(name))
+    if hangul == latin:
+        return None
+    return "hangul" if hangul else "latin"
+
+
+def _split_script_alias(name):
+    # 이름 끝 괄호가 "IVE (아이브)" 처럼 다른 문자로 쓴 같은 이름일 때만 별칭으로 나눈다.
+    # "WSG워너비 (가야G)", "SUPER JUNIOR (D&E)" 같은 유닛/그룹 표기는 이름 전체를 하나의 아티스트로 본다
+    base, alias = _split_trailing_alias(name)
+    if alias is None:
+        return name, None
+    scripts = (_script(base), _script(alias))
+    if None in scripts or scripts[0] == scripts[1]:
+        return name, None
+    return base, alias
+
+
+def artist_name_keys(name: str) -> List[str]:
+    """Returns the alias keys of an artist name, most specific first.
+    The first key is `normalize_artist_name(name)`; the rest drop featured artists, split
+    a trailing "IVE (아이브)"-style alias into "ive" and "아이브", and split Hangul/Latin spellings.
+    A trailing parenthetical in the same script, such as the sub-unit in "WSG워너비 (가야G)", is kept
+    as part of the name.
+    """
+    full = normalize_artist_name(name)
+    base = _without_featuring(full)
+    name, alias = _split_script_alias(base)
+    keys = [full, base, name, alias or ""]
+    for key in list(keys[2:]):
+        keys.extend(_split_scripts(key))
+    keys = (re.sub(r"\s+", " ", key).strip(" ,&") for key in keys)
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def artist_search_name(name: str) -> str:
+    """Returns the name sent to Spotify search: without featured artists and parenthesized aliases."""
+    full = normalize_artist_name(name)
+    return _split_script_alias(_without_featuring(full))[0] or full
+
+
+class ArtistCache:
+    """A persistent SQLite cache of Spotify artist lookups.
+    Not-found results are cached as well (as `None`) for `negativeTtl` seconds, so unknown artists
+    are not searched again on every run. Successful lookups also feed an alias index
+    (`artist_name_keys()` -> Spotify ID), so "IVE (아이브)" on one chart and "IVE" on another
+    resolve to the same ID without a second search.
+    Attributes:
+        path: The SQLite file. (default: `ARTIST_CACHE_PATH`)
+        idTtl: Seconds an artist name -> Spotify ID mapping stays valid. (default: 30 days)
+        genreTtl: Seconds an ID -> genres mapping stays valid. (default: 7 days)
+        negativeTtl: Seconds a not-found result stays valid. (default: 1 day)
+        stats: `{"hits", "misses", "negativeHits", "aliasHits"}` counters for this process.
+    """
+
+    def __init__(
+        self,
+        path: str = ARTIST_CACHE_PATH,
+        idTtl: float = DEFAULT_ID_TTL,
+        genreTtl: float = DEFAULT_GENRE_TTL,
+        negativeTtl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.path = path
+        self.idTtl = idTtl
+        self.genreTtl = genreTtl
+        self.negativeTtl = negativeTtl
+        self.stats = {"hits": 0, "misses": 0, "negativeHits": 0, "aliasHits": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def hitRatio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return "hits={hits} (negative={negativeHits}) misses={misses} alias hits={aliasHits}".format(
+            **self.stats) + f" hit ratio={self.hitRatio:.1%}"
+
+    def getArtistId(self, name: str):
+        """Returns the cached Spotify ID for `name`, `None` for a cached not-found, or `MISS`."""
+        return self._get(
+            "SELECT artist_id, updated_at FROM artist_ids WHERE name = ?",
+            normalize_artist_name(name),
+            self.idTtl,
+        )
+
+    def putArtistId(self, name: str, artistId):
+        self._put(
+            "INSERT OR REPLACE INTO artist_ids (name, artist_id, updated_at) VALUES (?, ?, ?)",
+            normalize_artist_name(name),
+            artistId,
+        )
+
+    def getAliasId(self, name: str):
+        """Returns the Spotify ID indexed under the most specific alias key of `name`, or `MISS`."""
+        keys = artist_name_keys(name)
+        if not keys:
+            return MISS
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT alias, artist_id FROM artist_aliases WHERE alias IN ({}) AND updated_at >= ?".format(
+                    ", ".join("?" * len(keys))),
+                (*keys, time.time() - self.idTtl),
+            ).fetchall()
+            found = dict(rows)
+            for key in keys:
+                if key in found:
+                    self.stats["aliasHits"] += 1
+                    return found[key]
+            return MISS
+
+    def putAliases(self, names: Iterable[str], artistId: str):
+        """Indexes every alias key of `names` (e.g. the chart spelling and Spotify's name) under `artistId`.
+        A key that is still indexed under another artist keeps that artist.
+        """
+        keys = dict.fromkeys(key for name in names for key in artist_name_keys(name))
+        if not artistId or not keys:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # 다른 아티스트로 인덱싱된 키는 만료되기 전까지 덮어쓰지 않는다
+                conn.executemany(
+                    """
+                    INSERT INTO artist_aliases (alias, artist_id, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT (alias) DO UPDATE SET artist_id = excluded.artist_id, updated_at = excluded.updated_at
+                    WHERE artist_aliases.artist_id = excluded.artist_id OR artist_aliases.updated_at < ?
+                    """,
+                    [(key, artistId, now, now - self.idTtl) for key in keys],
+                )
+
+    def getGenres(self, artistId: str):
+        """Returns the cached genre list of `artistId`, `None` for a cached not-found, or `MISS`."""
+        genres = self._get(
+            "SELECT genres, updated_at FROM artist_genres WHERE artist_id = ?",
+            artistId,
+            self.genreTtl,
+        )
+        if genres is MISS or genres is None:
+            return genres
+        return genres.split(", ") if genres else []
+
+    def putGenres(self, artistId: str, genres):
+        self._put(
+            "INSERT OR REPLACE INTO artist_genres (artist_id, genres, updated_at) VALUES (?, ?, ?)",
+            artistId,
+            None if genres is None else ", ".join(genres),
+        )
+
+    def getTopTracks(self, day: str, artistIds: Iterable[str]) -> Dict[str, list]:
+        """Returns `{artistId: tracks}` for the artists whose top tracks were already stored for `day`."""
+        artistIds = list(artistIds)
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(artistIds), _QUERY_CHUNK_SIZE):
+                chunk = artistIds[start:start + _QUERY_CHUNK_SIZE]
+                rows = conn.execute(
+                    "SELECT artist_id, tracks FROM artist_top_tracks WHERE day = ? AND artist_id IN ({})".format(
+                        ", ".join("?" * len(chunk))),
+                    (day, *chunk),
+                ).fetchall()
+                found.update((artistId, json.loads(tracks)) for artistId, tracks in rows)
+        return found
+
+    def putTopTracks(self, day: str, artistId: str, tracks: list):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artist_top_tracks (day, artist_id, tracks, updated_at) VALUES (?, ?, ?, ?)",
+                    (day, artistId, json.dumps(tracks, ensure_ascii=False), time.time()),
+                )
+
+    def purge(self):
+        """Deletes every expired row."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for table, ttl in (
+                    ("artist_ids", self.idTtl),
+                    ("artist_aliases", self.idTtl),
+                    ("artist_genres", self.genreTtl),
+                    ("artist_top_tracks", DEFAULT_TOP_TRACKS_RETENTION),
+                ):
+                    conn.execute(f"DELETE FROM {table} WHERE updated_at < ?", (now - ttl,))
+                conn.execute(
+                    "DELETE FROM artist_ids WHERE artist_id IS NULL AND updated_at < ?",
+                    (now - self.negativeTtl,),
+                )
+                conn.execute(
+                    "DELETE FROM artist_genres WHERE genres IS NULL AND updated_at < ?",
+                    (now - self.negativeTtl,),
+                )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _get(self, query, key, ttl):
+        with self._lock:
+            row = self._connect().execute(query, (key,)).fetchone()
+
+            if row is not None:
+                value, updatedAt = row
+                age = time.time() - updatedAt
+                if age <= (self.negativeTtl if value is None else ttl):
+                    self.stats["hits"] += 1
+                    if value is None:
+                        self.stats["negativeHits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+            return MISS
+
+    def _put(self, query, key, value):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(query, (key, value, time.time()))
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+def get_artist_cache() -> ArtistCache:
+    """Returns the process-wide `ArtistCache` over `ARTIST_CACHE_PATH`."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ArtistCache()
+        return _shared_cache
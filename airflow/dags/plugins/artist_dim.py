@@ -0,0 +1,302 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from plugins.artist_cache import artist_name_keys
+
+# Snowflake artist_dim 의 로컬 사본. 차트 DAG 는 Spotify 대신 이 파일에서 장르를 찾는다
+ARTIST_DIM_PATH = os.getenv(
+    "ARTIST_DIM_PATH",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "artist_dim.sqlite3"),
+)
+ARTIST_DIM_TABLE = "RAW_DATA.ARTIST_DIM"
+# 장르를 다시 조회해야 하는 기간 (초)
+DEFAULT_STALE_AFTER = 7 * 24 * 60 * 60
+# 로컬 사본을 Snowflake 에서 다시 받아오는 간격 (초)
+DEFAULT_SYNC_INTERVAL = 60 * 60
+# 장르가 없거나 artist_dim 에 없는 아티스트의 장르 (기존 CSV 와 같은 값)
+UNKNOWN_GENRES = ["Unknown"]
+
+CREATE_ARTIST_DIM_SQL = f"""
+CREATE TABLE IF NOT EXISTS {ARTIST_DIM_TABLE} (
+    artist_id STRING PRIMARY KEY,
+    name STRING,
+    name_keys ARRAY,
+    genres ARRAY,
+    updated_at TIMESTAMP_NTZ
+)
+"""
+
+# executemany 로 한 행씩 MERGE 한다 (artist_dim 은 하루 수십~수백 행만 바뀐다)
+MERGE_ARTIST_DIM_SQL = f"""
+MERGE INTO {ARTIST_DIM_TABLE} d
+USING (
+    SELECT
+        %s AS artist_id,
+        %s AS name,
+        PARSE_JSON(%s)::ARRAY AS name_keys,
+        PARSE_JSON(%s)::ARRAY AS genres,
+        TO_TIMESTAMP_NTZ(%s) AS updated_at
+) s
+ON d.artist_id = s.artist_id
+WHEN MATCHED THEN UPDATE SET
+    name = s.name, name_keys = s.name_keys, genres = s.genres, updated_at = s.updated_at
+WHEN NOT MATCHED THEN INSERT (artist_id, name, name_keys, genres, updated_at)
+    VALUES (s.artist_id, s.name, s.name_keys, s.genres, s.updated_at)
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artist_dim (
+    artist_id TEXT PRIMARY KEY,
+    name TEXT,
+    genres TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artist_dim_keys (
+    name_key TEXT PRIMARY KEY,
+    artist_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artist_dim_keys_artist ON artist_dim_keys (artist_id);
+CREATE TABLE IF NOT EXISTS artist_dim_sync (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    synced_at REAL NOT NULL,
+    watermark REAL NOT NULL
+);
+"""
+
+_shared_dim = None
+_shared_dim_lock = threading.Lock()
+
+
+def _snowflake_options():
+    from plugins.variables import SNOWFLAKE_PROPERTIES
+
+    return dict(SNOWFLAKE_PROPERTIES, schema="RAW_DATA")
+
+
+class ArtistDim:
+    """The artist dimension: Spotify artist ID, normalized name keys and genres.
+    The source of truth is the `RAW_DATA.ARTIST_DIM` table in Snowflake, maintained once a day by
+    `scripts.update_artist_dim`; this class keeps a local SQLite mirror of it, so chart DAGs can
+    attach genres to a chart by name without calling Spotify.
+    Attributes:
+        path: The SQLite mirror. (default: `ARTIST_DIM_PATH`)
+        staleAfter: Seconds after which an artist's genres are fetched again. (default: 7 days)
+        syncInterval: Seconds between incremental pulls from Snowflake in `sync()`. (default: 1 hour)
+        stats: `{"hits", "misses"}` name lookups for this process.
+    """
+
+    def __init__(
+        self,
+        path: str = ARTIST_DIM_PATH,
+        staleAfter: float = DEFAULT_STALE_AFTER,
+        syncInterval: float = DEFAULT_SYNC_INTERVAL,
+    ):
+        self.path = path
+        self.staleAfter = staleAfter
+        self.syncInterval = syncInterval
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM artist_dim").fetchone()[0]
+
+    def summary(self) -> str:
+        return "artists={} hits={hits} misses={misses}".format(len(self), **self.stats)
+
+    def lookup(self, names: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Returns `{name: {"artistId", "name", "genres"}}`, with `None` for names not in the dimension.
+        A name matches through its most specific `artist_name_keys()` key that is indexed.
+        """
+        return {name: artist for name, (_, artist) in self._match(names).items()}
+
+    def genresFor(self, names: Iterable[str]) -> List[List[str]]:
+        """Returns the genre list of every name, in order; unknown artists get `["Unknown"]`."""
+        return self.genresAndKeys(names)[0]
+
+    def genresAndKeys(self, names: Iterable[str]) -> Tuple[List[List[str]], List[Optional[str]]]:
+        """Returns the genre list and the artist key of every name, in order.
+        The artist key is the `artist_name_keys()` key the name matched by, or its most specific key
+        when the artist is unknown (the key `scripts.update_artist_dim` indexes it under). Chart rows
+        store it as `artist_key`, so Snowflake joins on `name_keys` without normalizing names in SQL.
+        """
+        names = list(names)
+        matches = self._match(names)
+        genres, keys = [], []
+        for name in names:
+            key, artist = matches[name]
+            genres.append((artist["genres"] or UNKNOWN_GENRES) if artist else UNKNOWN_GENRES)
+            keys.append(key)
+        return genres, keys
+
+    def _match(self, names):
+        # {name: (매칭된 키 또는 가장 구체적인 키, 아티스트 dict 또는 None)}
+        names = list(dict.fromkeys(names))
+        keysByName = {name: artist_name_keys(name) if isinstance(name, str) else [] for name in names}
+        allKeys = list(dict.fromkeys(key for keys in keysByName.values() for key in keys))
+
+        with self._lock:
+            conn = self._connect()
+            idByKey = {}
+            for start in range(0, len(allKeys), 500):
+                chunk = allKeys[start:start + 500]
+                idByKey.update(conn.execute(
+                    "SELECT name_key, artist_id FROM artist_dim_keys WHERE name_key IN ({})".format(
+                        ", ".join("?" * len(chunk))),
+                    chunk,
+                ).fetchall())
+            artistIds = list(set(idByKey.values()))
+            artists = {}
+            for start in range(0, len(artistIds), 500):
+                chunk = artistIds[start:start + 500]
+                for artistId, name, genres in conn.execute(
+                    "SELECT artist_id, name, genres FROM artist_dim WHERE artist_id IN ({})".format(
+                        ", ".join("?" * len(chunk))),
+                    chunk,
+                ):
+                    artists[artistId] = {"artistId": artistId, "name": name, "genres": json.loads(genres)}
+
+        result = {}
+        for name, keys in keysByName.items():
+            key = next((key for key in keys if key in idByKey), None)
+            artist = artists.get(idByKey[key]) if key else None
+            result[name] = (key if artist else (keys[0] if keys else None), artist)
+            self.stats["hits" if artist else "misses"] += 1
+        return result
+
+    def unknownNames(self, names: Iterable[str]) -> List[str]:
+        """Returns the names no artist in the dimension answers to."""
+        return [name for name, artist in self.lookup(names).items() if artist is None and name]
+
+    def staleArtistIds(self) -> List[str]:
+        """Returns the artists whose genres are older than `staleAfter`."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT artist_id FROM artist_dim WHERE updated_at < ?",
+                (time.time() - self.staleAfter,),
+            ).fetchall()
+        return [artistId for (artistId,) in rows]
+
+    def nameKeys(self, artistId: str) -> List[str]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT name_key FROM artist_dim_keys WHERE artist_id = ?", (artistId,)
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def upsert(self, rows: Iterable[dict]):
+        """Writes `{"artistId", "name", "nameKeys", "genres", "updatedAt"}` rows into the local mirror."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._upsert(conn, rows)
+
+    def push(self, rows: List[dict]):
+        """MERGEs the rows into the Snowflake `ARTIST_DIM` table."""
+        from plugins.snowflake_utils import execute_snowflake_query
+
+        if not rows:
+            return
+        options = _snowflake_options()
+        execute_snowflake_query(CREATE_ARTIST_DIM_SQL, options)
+        execute_snowflake_query(
+            MERGE_ARTIST_DIM_SQL,
+            options,
+            data=[
+                (
+                    row["artistId"],
+                    row["name"],
+                    json.dumps(row["nameKeys"], ensure_ascii=False),
+                    json.dumps(row["genres"], ensure_ascii=False),
+                    int(row["updatedAt"]),
+                )
+                for row in rows
+            ],
+        )
+
+    def pull(self) -> int:
+        """Copies the Snowflake rows changed since the last pull into the mirror and returns their number."""
+        from plugins.snowflake_utils import execute_snowflake_query
+
+        with self._lock:
+            row = self._connect().execute("SELECT watermark FROM artist_dim_sync").fetchone()
+        watermark = row[0] if row else 0.0
+
+        df = execute_snowflake_query(
+            f"""
+            SELECT artist_id, name, name_keys, genres, DATE_PART(epoch_second, updated_at) AS updated_at
+            FROM {ARTIST_DIM_TABLE}
+            WHERE updated_at > TO_TIMESTAMP_NTZ(%s)
+            """,
+            _snowflake_options(),
+            data=(int(watermark),),
+            fetch=True,
+        )
+        rows = [
+            {
+                "artistId": r["ARTIST_ID"],
+                "name": r["NAME"],
+                "nameKeys": json.loads(r["NAME_KEYS"] or "[]"),
+                "genres": json.loads(r["GENRES"] or "[]"),
+                "updatedAt": float(r["UPDATED_AT"]),
+            }
+            for r in df.to_dict("records")
+        ]
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._upsert(conn, rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO artist_dim_sync (id, synced_at, watermark) VALUES (0, ?, ?)",
+                    (time.time(), max([watermark] + [r["updatedAt"] for r in rows])),
+                )
+        return len(rows)
+
+    def sync(self):
+        """Pulls from Snowflake if the mirror is older than `syncInterval`; the mirror is used as is if that fails."""
+        with self._lock:
+            row = self._connect().execute("SELECT synced_at FROM artist_dim_sync").fetchone()
+        if row and time.time() - row[0] < self.syncInterval:
+            return
+        try:
+            print(f"🔄 artist_dim 동기화: {self.pull()}명 갱신")
+        except Exception as e:
+            print(f"⚠️ artist_dim 동기화 실패, 로컬 사본을 그대로 사용: {e!r}")
+
+    def _upsert(self, conn, rows):
+        for row in rows:
+            artistId = row["artistId"]
+            conn.execute(
+                "INSERT OR REPLACE INTO artist_dim (artist_id, name, genres, updated_at) VALUES (?, ?, ?, ?)",
+                (artistId, row["name"], json.dumps(row["genres"], ensure_ascii=False), row["updatedAt"]),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO artist_dim_keys (name_key, artist_id) VALUES (?, ?)",
+                [(key, artistId) for key in row["nameKeys"]],
+            )
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+def get_artist_dim() -> ArtistDim:
+    """Returns the process-wide `ArtistDim` over `ARTIST_DIM_PATH`."""
+    global _shared_dim
+    with _shared_dim_lock:
+        if _shared_dim is None:
+            _shared_dim = ArtistDim()
+        return _shared_dim
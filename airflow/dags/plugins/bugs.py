@@ -1,12 +1,25 @@
-import json
-import sys
 from datetime import datetime
+from typing import NamedTuple
 
 import requests
+from plugins.chart_base import BaseChartData, ChartColumns, ChartEntry
+from plugins.chart_http import get_shared_session
+
+# ChartEntry 는 chart_base 로 옮겨졌지만 `from plugins.bugs import ChartEntry` 를 위해 다시 내보낸다
+__all__ = [
+    "BugsChartParseException",
+    "BugsChartPeriod",
+    "BugsChartRequestException",
+    "BugsChartSpec",
+    "BugsChartType",
+    "ChartData",
+    "ChartEntry",
+]
 
 _USER_AGENT = "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Mobile Safari/537.36"
 _IMAGE_PREFIX_URL = "https://image.bugsm.co.kr/album/images"
 _CHART_API_URL = "https://m.bugs.co.kr/api/getChartTrack"
+_DEFAULT_PAGE_SIZE = 100
 
 
 class BugsChartType:
@@ -21,6 +34,15 @@ class BugsChartPeriod:
     Weekly = "week"
 
 
+class BugsChartSpec(NamedTuple):
+    """Identifies one page of a Bugs chart for batch fetching. (see `chart_fetcher.fetch_bugs_batch()`)"""
+
+    chartPeriod: str = BugsChartPeriod.Realtime
+    chartType: int = BugsChartType.All
+    page: int = 1
+    pageSize: int = _DEFAULT_PAGE_SIZE
+
+
 class BugsChartRequestException(Exception):
     pass
 
@@ -29,139 +51,85 @@ class BugsChartParseException(Exception):
     pass
 
 
-class ChartEntry:
-    """Represents an entry on a chart.
-    Attributes:
-        title: The title of the track
-        artist: The name of the artist.
-        image: The URL of the cover image for the track
-        peakPos: The track's peak position on the chart.
-        lastPos: The track's last position on the previous period.
-        rank: The track's current rank position on the chart.
-    """
-
-    def __init__(
-            self,
-            title: str,
-            artist: str,
-            image: str,
-            peakPos: int,
-            lastPos: int,
-            rank: int):
-        self.title = title
-        self.artist = artist
-        self.image = image
-        self.peakPos = peakPos
-        self.lastPos = lastPos
-        self.rank = rank
-
-    def __repr__(self):
-        return "{}.{}(title={!r}, artist={!r})".format(
-            self.__class__.__module__, self.__class__.__name__, self.title, self.artist)
-
-    def __str__(self):
-        """Returns a string of the form 'TITLE by ARTIST'."""
-        if self.title:
-            s = "'%s' by %s" % (self.title, self.artist)
-        else:
-            s = "%s" % self.artist
-
-        if sys.version_info.major < 3:
-            return s.encode(getattr(sys.stdout, "encoding", "") or "utf8")
-        else:
-            return s
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
-
-
-class ChartData:
+class ChartData(BaseChartData):
     """Represents a particular Bugs chart by a particular period.
     Attributes:
         date: The chart date.
         chartType: The chart type.
         chartPeriod: The period for the chart.
         imageSize: The size of cover image for the track. (default: 256)
+        page: The page of the chart to retrieve, starting from 1. (default: 1)
+        pageSize: The number of entries per page. (default: 100)
         fetch: A boolean value that indicates whether to retrieve the chart data immediately. If set to `False`, you can fetch the data later using the `fetchEntries()` method.
+        session: The `requests.Session` used for HTTP calls, so connections can be pooled and reused. (default: `chart_http.get_shared_session()`)
     """
 
+    provider = "bugs"
+    ENTRY_FIELDS = ("rank", "title", "artist", "lastPos", "peakPos", "image")
+    _ITEMS_PATH = ("list",)
+    _META_PATHS = (("ret_code",), ("ret_msg",), ("info", "end_dt"))
+    _OPTIONAL_META_PATHS = (("ret_msg",),)
+    _requestException = BugsChartRequestException
+    _parseException = BugsChartParseException
+
     def __init__(
         self,
         chartType: BugsChartType = BugsChartType.All,
         chartPeriod: BugsChartPeriod = BugsChartPeriod.Realtime,
         imageSize: int = 256,
         fetch: bool = True,
+        session: requests.Session = None,
+        page: int = 1,
+        pageSize: int = _DEFAULT_PAGE_SIZE,
     ):
         self.chartType = chartType
         self.chartPeriod = chartPeriod
         self.imageSize = imageSize
-        self.entries = []
+        self.page = page
+        self.pageSize = pageSize
+        self.columns = ChartColumns()
+        self._session = session or get_shared_session()
 
         if fetch:
             self.fetchEntries()
 
-    def __getitem__(self, key):
-        return self.entries[key]
-
-    def __len__(self):
-        return len(self.entries)
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
+    @property
+    def cacheKey(self):
+        return super().cacheKey + (self.page, self.pageSize)
 
-    def fetchEntries(self):
-        headers = {"User-Agent": _USER_AGENT}
+    def _request(self, headers, stream=False):
+        headers = {"User-Agent": _USER_AGENT, **headers}
 
         data = {
             "period_tp": self.chartPeriod,
             "svc_type": self.chartType,
-            "size": 100,
+            "size": self.pageSize,
+            "page": self.page,
         }
 
-        res = requests.post(_CHART_API_URL, headers=headers, data=data)
-
-        if res.status_code != 200:
-            message = f"Request is invalid. response status code={res.status_code}"
-            raise BugsChartRequestException(message)
+        return self._session.post(
+            _CHART_API_URL, headers=headers, data=data, stream=stream
+        )
 
-        data = res.json()
-        if int(data.get("ret_code")) > 0:
-            message = f"Request is invalid. response message=${data.get('ret_msg')}"
+    def _parseMeta(self, meta):
+        if int(meta.get(("ret_code",))) > 0:
+            message = f"Request is invalid. response message=${meta.get(('ret_msg',))}"
             raise BugsChartRequestException(message)
 
-        self._parseEntries(data)
-
-    def _parseEntries(self, data):
-        try:
-            self.date = self._parseDate(int(data["info"]["end_dt"]))
-            list = data["list"]
-            for item in list:
-                entry = ChartEntry(
-                    title=item["track_title"],
-                    artist=item["artists"][0]["artist_nm"],
-                    image=f"{_IMAGE_PREFIX_URL}/{self.imageSize}{item['album']['image']['path']}",
-                    rank=int(
-                        item["list_attr"]["rank"]),
-                    peakPos=int(
-                        item["list_attr"]["rank_peak"]),
-                    lastPos=int(
-                        item["list_attr"]["rank_last"]),
-                )
-                self.entries.append(entry)
-        except Exception as e:
-            raise BugsChartParseException(e)
+        self.date = self._parseDate(int(meta[("info", "end_dt")]))
+
+    def _parseItem(self, item, index):
+        self.columns.append(
+            title=item["track_title"],
+            artist=item["artists"][0]["artist_nm"],
+            image=f"{_IMAGE_PREFIX_URL}/{self.imageSize}{item['album']['image']['path']}",
+            rank=int(
+                item["list_attr"]["rank"]),
+            peakPos=int(
+                item["list_attr"]["rank_peak"]),
+            lastPos=int(
+                item["list_attr"]["rank_last"]),
+        )
 
     def _parseDate(self, timestamp_ms):
         timestamp_s = timestamp_ms / 1000
@@ -0,0 +1,545 @@
+import asyncio
+import hashlib
+import json
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from functools import partial
+
+from plugins.chart_state import ChartFetchState
+from plugins.chart_stream import META, iter_json_items, lookup
+
+# 정수 컬럼에서 "값 없음"을 나타내는 값 (예: melon 의 peakPos, genie 의 isNew)
+_MISSING = -1
+# streaming 파싱 시 한 번에 읽는 응답 크기 (bytes)
+_STREAM_CHUNK_SIZE = 16 * 1024
+# contentDigest() 에서 None 문자열 값을 나타내는 표시
+_NULL_MARKER = "\x00"
+
+
+class ChartEntry:
+    """Represents an entry on a chart.
+    Attributes:
+        title: The title of the track
+        artist: The name of the artist.
+        image: The URL of the cover image for the track
+        rank: The track's current rank position on the chart.
+        lastPos: The track's last position on the previous period.
+        peakPos: The track's peak position on the chart, or `None` if the provider does not report it.
+        isNew: Whether the track is new to the chart, or `None` if the provider does not report it.
+    """
+
+    __slots__ = ("title", "artist", "image", "rank", "lastPos", "peakPos", "isNew")
+
+    def __init__(
+        self,
+        title: str,
+        artist: str,
+        image: str,
+        rank: int,
+        lastPos: int,
+        peakPos: int = None,
+        isNew: bool = None,
+    ):
+        self.title = title
+        self.artist = artist
+        self.image = image
+        self.rank = rank
+        self.lastPos = lastPos
+        self.peakPos = peakPos
+        self.isNew = isNew
+
+    def __repr__(self):
+        return "{}.{}(title={!r}, artist={!r})".format(
+            self.__class__.__module__, self.__class__.__name__, self.title, self.artist)
+
+    def __str__(self):
+        """Returns a string of the form 'TITLE by ARTIST'."""
+        if self.title:
+            s = "'%s' by %s" % (self.title, self.artist)
+        else:
+            s = "%s" % self.artist
+
+        if sys.version_info.major < 3:
+            return s.encode(getattr(sys.stdout, "encoding", "") or "utf8")
+        else:
+            return s
+
+    def asDict(self):
+        """Returns the entry as a dict, leaving out fields the provider does not report."""
+        return {
+            field: getattr(self, field)
+            for field in self.__slots__
+            if getattr(self, field) is not None
+        }
+
+    def json(self):
+        return json.dumps(
+            self.asDict(),
+            sort_keys=True,
+            indent=4,
+            ensure_ascii=False,
+        )
+
+
+class ChartColumns:
+    """Column-oriented storage for the entries of a chart.
+    Numeric fields are kept in typed `array.array` buffers and string fields in plain lists,
+    so a chart costs a handful of containers instead of one Python object per entry.
+    Attributes:
+        rank, lastPos, peakPos: `array('i')` columns. Missing values are stored as -1.
+        isNew: `array('b')` column holding 1, 0, or -1 for missing.
+        title, artist, image: `list` columns of strings.
+    """
+
+    INT_FIELDS = ("rank", "lastPos", "peakPos")
+    STR_FIELDS = ("title", "artist", "image")
+    FIELDS = ChartEntry.__slots__
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.title = []
+        self.artist = []
+        self.image = []
+        self.rank = array("i")
+        self.lastPos = array("i")
+        self.peakPos = array("i")
+        self.isNew = array("b")
+
+    def __len__(self):
+        return len(self.rank)
+
+    def append(
+        self,
+        title: str,
+        artist: str,
+        image: str,
+        rank: int,
+        lastPos: int,
+        peakPos: int = None,
+        isNew: bool = None,
+    ):
+        self.title.append(title)
+        self.artist.append(artist)
+        self.image.append(image)
+        self.rank.append(rank)
+        self.lastPos.append(lastPos)
+        self.peakPos.append(_MISSING if peakPos is None else peakPos)
+        self.isNew.append(_MISSING if isNew is None else int(isNew))
+
+    def extend(self, other: "ChartColumns"):
+        """Appends every row of `other`, e.g. to stack several days of the same chart."""
+        for field in self.FIELDS:
+            getattr(self, field).extend(getattr(other, field))
+
+    def row(self, index: int) -> ChartEntry:
+        peakPos = self.peakPos[index]
+        isNew = self.isNew[index]
+        return ChartEntry(
+            title=self.title[index],
+            artist=self.artist[index],
+            image=self.image[index],
+            rank=self.rank[index],
+            lastPos=self.lastPos[index],
+            peakPos=None if peakPos == _MISSING else peakPos,
+            isNew=None if isNew == _MISSING else bool(isNew),
+        )
+
+    def sortByRank(self):
+        order = sorted(range(len(self)), key=self.rank.__getitem__)
+        for field in self.FIELDS:
+            column = getattr(self, field)
+            values = [column[i] for i in order]
+            if isinstance(column, array):
+                values = array(column.typecode, values)
+            setattr(self, field, values)
+
+    def hasValues(self, field: str) -> bool:
+        """Returns whether any row has a value for `field`."""
+        column = getattr(self, field)
+        if isinstance(column, array):
+            return any(v != _MISSING for v in column)
+        return True
+
+    def toDict(self, fields=None):
+        """Returns `{field: list}` for JSON/XCom friendly output.
+        Args:
+            fields: The fields to include. (default: every field the provider reports)
+        """
+        if fields is None:
+            fields = [f for f in self.FIELDS if self.hasValues(f)]
+
+        result = {}
+        for field in fields:
+            column = getattr(self, field)
+            if field == "isNew":
+                result[field] = [None if v == _MISSING else v == 1 for v in column]
+            elif isinstance(column, array):
+                # 결측값이 없으면 C 수준의 tolist() 로 한 번에 변환
+                if _MISSING in column:
+                    result[field] = [None if v == _MISSING else v for v in column]
+                else:
+                    result[field] = column.tolist()
+            else:
+                result[field] = list(column)
+        return result
+
+    @classmethod
+    def fromDict(cls, data):
+        """Builds columns from `toDict()` output. Fields missing from `data` are stored as missing."""
+        columns = cls()
+        size = len(next(iter(data.values()), ()))
+        for field in cls.FIELDS:
+            values = data.get(field)
+            if field in cls.STR_FIELDS:
+                setattr(columns, field, list(values) if values is not None else [None] * size)
+                continue
+
+            typecode = "b" if field == "isNew" else "i"
+            if values is None:
+                column = array(typecode, [_MISSING]) * size
+            elif None in values:
+                column = array(typecode, [_MISSING if v is None else int(v) for v in values])
+            else:
+                column = array(typecode, values)
+            setattr(columns, field, column)
+        return columns
+
+    def to_arrow(self):
+        """Returns a `pyarrow.Table`. Integer columns share memory with the `array` buffers."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        size = len(self)
+        arrays = {}
+        for field in self.INT_FIELDS:
+            values = pa.Array.from_buffers(
+                pa.int32(), size, [None, pa.py_buffer(getattr(self, field))]
+            )
+            arrays[field] = _withMissingAsNull(values, pc)
+
+        flags = pa.Array.from_buffers(pa.int8(), size, [None, pa.py_buffer(self.isNew)])
+        arrays["isNew"] = pc.if_else(
+            pc.equal(flags, _MISSING), pa.scalar(None, pa.bool_()), pc.equal(flags, 1)
+        )
+        for field in self.STR_FIELDS:
+            arrays[field] = pa.array(getattr(self, field), type=pa.string())
+
+        return pa.table({field: arrays[field] for field in self.FIELDS})
+
+    def to_pandas(self):
+        """Returns a `pandas.DataFrame` built column by column from the `array` buffers."""
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for field in self.FIELDS:
+            column = getattr(self, field)
+            if field in self.STR_FIELDS:
+                data[field] = pd.array(column, dtype="string")
+                continue
+
+            dtype = np.int8 if field == "isNew" else np.intc
+            values = np.frombuffer(column, dtype=dtype)
+            mask = values == _MISSING
+            if field == "isNew":
+                data[field] = pd.arrays.BooleanArray(values == 1, mask)
+            else:
+                data[field] = pd.arrays.IntegerArray(values.astype(np.int32, copy=False), mask)
+
+        return pd.DataFrame(data, copy=False)
+
+
+def _withMissingAsNull(values, pc):
+    # 결측값(-1)이 있을 때만 validity bitmap 을 붙이고, 값 버퍼는 그대로 공유한다
+    isMissing = pc.equal(values, _MISSING)
+    if not pc.any(isMissing).as_py():
+        return values
+
+    import pyarrow as pa
+
+    validity = pc.invert(isMissing).buffers()[1]
+    return pa.Array.from_buffers(
+        values.type, len(values), [validity, values.buffers()[1]]
+    )
+
+
+class _ChartEntries(Sequence):
+    # ChartColumns 위의 읽기 전용 view. 접근할 때만 ChartEntry 를 만든다
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns: ChartColumns):
+        self._columns = columns
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._columns.row(i) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("chart entry index out of range")
+        return self._columns.row(key)
+
+
+def _jsonDefault(o):
+    # chart.date 는 datetime 이므로 isoformat 문자열로 변환하고, _session 같은 private 속성은 제외
+    if isinstance(o, datetime):
+        return o.isoformat()
+    if isinstance(o, ChartEntry):
+        return o.asDict()
+    if isinstance(o, BaseChartData):
+        result = {
+            k: v
+            for k, v in o.__dict__.items()
+            if not k.startswith("_") and k != "columns"
+        }
+        result["entries"] = list(o.entries)
+        return result
+    return {k: v for k, v in o.__dict__.items() if not k.startswith("_")}
+
+
+class BaseChartData:
+    """Behaviour shared by the provider `ChartData` classes (melon, genie, bugs, flo, vibe).
+    Subclasses implement `_request(headers, stream)`, `_parseMeta(meta)` and `_parseItem(item, index)`
+    and set `_ITEMS_PATH`/`_META_PATHS` to the JSON keys of the entry list and of the chart metadata
+    (`_OPTIONAL_META_PATHS` lists the meta paths `_parseMeta()` can do without);
+    `fetchEntries()` and `streamEntries()` drive them and append the parsed rows to `self.columns`.
+    Attributes:
+        provider: The short provider name used as a key across the chart plugins.
+        columns: The `ChartColumns` holding the chart entries.
+        entries: A read-only sequence of `ChartEntry` views over `columns`.
+        changed: Whether the last `fetchEntries()` call returned a chart different from the stored fetch state.
+    """
+
+    provider = None
+    changed = None
+    # provider 가 채우는 entry 필드 (순서대로). None 이면 값이 있는 필드를 매번 계산
+    ENTRY_FIELDS = None
+    _ITEMS_PATH = ()
+    _META_PATHS = ()
+    # 응답에 없을 수도 있는 메타데이터. limit 스트리밍은 이 경로를 기다리지 않는다
+    _OPTIONAL_META_PATHS = ()
+    _requestException = Exception
+    _parseException = Exception
+
+    @property
+    def entries(self):
+        return _ChartEntries(self.columns)
+
+    @property
+    def cacheKey(self):
+        """The `(provider, chartType, chartPeriod, imageSize)` tuple identifying this chart."""
+        return (
+            self.provider,
+            getattr(self, "chartType", None),
+            getattr(self, "chartPeriod", None),
+            getattr(self, "imageSize", None),
+        )
+
+    @property
+    def entryFields(self):
+        """The entry fields this chart reports, in output order."""
+        if self.ENTRY_FIELDS is not None:
+            return self.ENTRY_FIELDS
+        return tuple(f for f in self.columns.FIELDS if self.columns.hasValues(f))
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def __len__(self):
+        return len(self.columns)
+
+    def json(self):
+        return json.dumps(
+            self,
+            default=_jsonDefault,
+            sort_keys=True,
+            indent=4,
+            ensure_ascii=False,
+        )
+
+    def to_arrow(self):
+        return self.columns.to_arrow()
+
+    def to_pandas(self):
+        return self.columns.to_pandas()
+
+    def contentDigest(self) -> str:
+        """Returns a hash of the chart date and every entry, used to detect unchanged charts."""
+        digest = hashlib.sha256()
+        date = getattr(self, "date", None)
+        digest.update(str(date).encode("utf-8"))
+        for field in self.columns.FIELDS:
+            column = getattr(self.columns, field)
+            if isinstance(column, array):
+                digest.update(column.tobytes())
+            else:
+                # 값이 없는 칸은 빈 문자열과 구분되도록 NUL 로 표시한다
+                digest.update(
+                    "\x1f".join(_NULL_MARKER if v is None else v for v in column).encode("utf-8")
+                )
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+
+    def fetchEntries(
+        self, conditional: bool = False, saveState: bool = True, limit: int = None
+    ) -> bool:
+        """Requests the chart and parses its entries into `self.columns`.
+        Args:
+            conditional: Compare against the fetch state stored by the previous conditional fetch.
+                `ETag`/`Last-Modified` are sent when the server supplied them, and a content hash of
+                the chart date and entries is compared otherwise.
+            saveState: Store the new fetch state right away. Pass `False` to store it later with
+                `saveFetchState()`, once the rest of the pipeline has processed the chart.
+            limit: Parse only the top `limit` entries, reading the body incrementally and
+                closing the response once they (and the chart metadata) have been read.
+        Returns:
+            `False` when `conditional` is set and the chart has not changed, otherwise `True`.
+        """
+        state = ChartFetchState.load(self.cacheKey) if conditional else None
+
+        res = self._request(
+            state.conditionalHeaders() if state else {},
+            stream=limit is not None)
+        if state is not None and res.status_code == 304:
+            res.close()
+            self.changed = False
+            return self.changed
+
+        if limit is None:
+            data = self._decode(res)
+            self.columns = ChartColumns()
+            self._parseEntries(data)
+        else:
+            for _ in self._streamEntries(res, limit):
+                pass
+        self.changed = True
+
+        if state is not None:
+            digest = self.contentDigest()
+            self.changed = digest != state.digest
+            state.update(res.headers, digest)
+            self._fetchState = state
+            if saveState:
+                self.saveFetchState()
+
+        return self.changed
+
+    def saveFetchState(self):
+        """Stores the fetch state of the last conditional `fetchEntries()` call."""
+        state = getattr(self, "_fetchState", None)
+        if state is not None:
+            state.save()
+
+    def fetchCached(self, ttl: float = None, cache=None) -> bool:
+        """Fills the chart from the on-disk snapshot cache shared by every process on the worker,
+        and only requests the provider when no snapshot is fresher than `ttl` seconds.
+        Args:
+            ttl: The maximum snapshot age in seconds. (default: the cache's `ttl`)
+            cache: The `chart_cache.ChartCache` to use. (default: `chart_cache.get_shared_cache()`)
+        Returns:
+            `True` if the chart was served from the cache.
+        """
+        from plugins.chart_cache import get_shared_cache
+
+        return (cache or get_shared_cache()).load(self, ttl)
+
+    async def fetchEntriesAsync(
+        self, executor=None, conditional: bool = False, cacheTtl: float = None
+    ):
+        """Runs `fetchEntries()` without blocking the event loop.
+        Args:
+            executor: The `concurrent.futures.Executor` to run the request on. (default: the loop's default executor)
+            conditional: Passed through to `fetchEntries()`.
+            cacheTtl: Use `fetchCached(cacheTtl)` instead of `fetchEntries()`.
+        """
+        if cacheTtl is not None:
+            fetch = partial(self.fetchCached, cacheTtl)
+        else:
+            fetch = partial(self.fetchEntries, conditional=conditional)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fetch)
+
+    def streamEntries(self, limit: int = None):
+        """Requests the chart and yields each `ChartEntry` as soon as it has been read from the body.
+        `name`/`date` are set once the generator is exhausted.
+        Args:
+            limit: Stop reading the response after the top `limit` entries.
+        """
+        res = self._request({}, stream=True)
+        yield from self._streamEntries(res, limit)
+
+    def _streamEntries(self, res, limit):
+        try:
+            self._checkStatus(res)
+            self.columns = ChartColumns()
+            meta = {}
+            required = set(self._META_PATHS) - set(self._OPTIONAL_META_PATHS)
+            events = iter_json_items(
+                res.iter_content(chunk_size=_STREAM_CHUNK_SIZE),
+                self._ITEMS_PATH,
+                self._META_PATHS,
+            )
+            try:
+                for kind, path, value in events:
+                    if kind == META:
+                        meta[path] = value
+                        required.discard(path)
+                    elif limit is None or len(self.columns) < limit:
+                        self._parseItem(value, len(self.columns))
+                        yield self.columns.row(len(self.columns) - 1)
+
+                    # 상위 limit 개와 필수 메타데이터를 읽었으면 나머지 본문은 받지 않는다.
+                    # 목록 뒤에 오는 선택 메타데이터는 기다리지 않는다
+                    if limit is not None and len(self.columns) >= limit and not required:
+                        break
+                self._parseMeta(meta)
+            except (self._requestException, self._parseException):
+                raise
+            except Exception as e:
+                raise self._parseException(e)
+        finally:
+            res.close()
+
+    def _checkStatus(self, res):
+        if res.status_code != 200:
+            message = f"Request is invalid. response status code={res.status_code}"
+            raise self._requestException(message)
+
+    def _decode(self, res):
+        self._checkStatus(res)
+        return res.json()
+
+    def _parseEntries(self, data):
+        try:
+            meta = {}
+            for path in self._META_PATHS:
+                try:
+                    meta[path] = lookup(data, path)
+                except (KeyError, IndexError, TypeError):
+                    pass
+            self._parseMeta(meta)
+
+            for index, item in enumerate(lookup(data, self._ITEMS_PATH)):
+                self._parseItem(item, index)
+        except (self._requestException, self._parseException):
+            raise
+        except Exception as e:
+            raise self._parseException(e)
+
+    def _request(self, headers, stream=False):
+        """Sends the chart request with the extra `headers` and returns the response."""
+        raise NotImplementedError
+
+    def _parseMeta(self, meta):
+        """Sets chart-level attributes such as `date` from a `{path: value}` dict of `_META_PATHS`."""
+        raise NotImplementedError
+
+    def _parseItem(self, item, index):
+        """Appends one element of the `_ITEMS_PATH` list to `self.columns`."""
+        raise NotImplementedError
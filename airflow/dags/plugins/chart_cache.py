@@ -0,0 +1,170 @@
+import fcntl
+import gzip
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from plugins.chart_serializers import (ChartSerializeException, dumps_json,
+                                       loads_json)
+from plugins.chart_state import chart_key_name
+
+# 차트 스냅샷을 저장하는 디렉터리. 같은 worker 의 모든 프로세스가 공유한다
+CHART_CACHE_DIR = os.getenv(
+    "CHART_CACHE_DIR",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "chart_cache"),
+)
+DEFAULT_TTL = 10 * 60
+# 이보다 오래된 스냅샷은 evict() 가 지운다. get() 에 더 긴 ttl 을 주는 호출도 있으므로 ttl 과 따로 둔다
+# (chart_ingest_dag 는 바뀌지 않은 차트를 전날 스냅샷으로 채우므로 하루보다 길게 둔다)
+DEFAULT_MAX_AGE = 2 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SUFFIX = ".json.gz"
+_COMPRESS_LEVEL = 6
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+class ChartCache:
+    """A compressed on-disk cache of chart snapshots, keyed by `ChartData.cacheKey`.
+    Snapshots are written atomically, so any process on the worker can read them while another
+    one refreshes them; a per-key file lock makes concurrent misses fetch the chart only once.
+    Attributes:
+        directory: Where the snapshots are stored. (default: `CHART_CACHE_DIR`)
+        ttl: How many seconds a snapshot stays fresh when `get()`/`load()` are not given a ttl. (default: 600)
+        maxAge: How many seconds a snapshot is kept on disk, whatever ttl it is read with. (default: 2 days)
+        maxBytes: The total size the snapshots may take before the oldest ones are evicted. (default: 64MB)
+    """
+
+    def __init__(
+        self,
+        directory: str = CHART_CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        maxBytes: int = DEFAULT_MAX_BYTES,
+        maxAge: float = DEFAULT_MAX_AGE,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.maxBytes = maxBytes
+        self.maxAge = max(maxAge, ttl)
+
+    def path(self, key):
+        return os.path.join(self.directory, chart_key_name(key) + _SUFFIX)
+
+    def get(self, key, ttl: float = None):
+        """Returns the stored `ChartSnapshot` for `key`, or `None` if there is none fresher than `ttl` seconds."""
+        ttl = self.ttl if ttl is None else ttl
+        path = self.path(key)
+        try:
+            if time.time() - os.stat(path).st_mtime > ttl:
+                return None
+            with gzip.open(path, "rb") as f:
+                return loads_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, ChartSerializeException):
+            # 깨진 스냅샷은 지우고 miss 로 처리
+            self._remove(path)
+            return None
+
+    def put(self, chart):
+        """Stores `chart` under its `cacheKey`, then evicts old snapshots if the cache is over `maxBytes`."""
+        os.makedirs(self.directory, exist_ok=True)
+        data = gzip.compress(dumps_json(chart).encode("utf-8"), _COMPRESS_LEVEL)
+
+        # 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        path = self.path(chart.cacheKey)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def load(self, chart, ttl: float = None) -> bool:
+        """Fills `chart` from a fresh snapshot, or fetches it and stores a new snapshot.
+        Only one process fetches a given chart at a time; the others wait for it and reuse its snapshot.
+        Returns:
+            `True` if the chart was served from the cache.
+        """
+        key = chart.cacheKey
+        snapshot = self.get(key, ttl)
+        if snapshot is None:
+            with self._lock(key):
+                snapshot = self.get(key, ttl)
+                if snapshot is None:
+                    chart.fetchEntries()
+                    self.put(chart)
+                    return False
+
+        chart.columns = snapshot.columns
+        for field in ("name", "date"):
+            if hasattr(snapshot, field):
+                setattr(chart, field, getattr(snapshot, field))
+        return True
+
+    def evict(self, keep: str = None):
+        """Removes snapshots older than `maxAge`, then the oldest ones until the cache fits in `maxBytes`.
+        Args:
+            keep: A snapshot path that must not be evicted, e.g. the one just written.
+        """
+        now = time.time()
+        snapshots = []
+        for entry in self._scan():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # 같은 디렉터리를 쓰는 다른 프로세스가 방금 지운 스냅샷
+                continue
+            if now - stat.st_mtime > self.maxAge:
+                self._remove(entry.path)
+            else:
+                snapshots.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in snapshots)
+        for _, size, path in sorted(snapshots):
+            if total <= self.maxBytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for entry in self._scan():
+            self._remove(entry.path)
+
+    def _scan(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [e for e in entries if e.name.endswith(_SUFFIX)]
+        except FileNotFoundError:
+            return []
+
+    @contextmanager
+    def _lock(self, key):
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = os.path.join(self.directory, chart_key_name(key) + ".lock")
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_shared_cache() -> ChartCache:
+    """Returns the process-wide `ChartCache` over `CHART_CACHE_DIR`."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ChartCache()
+        return _shared_cache
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import product
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import requests
+from plugins import bugs, flo, genie, melon, vibe
+from plugins.chart_http import get_shared_session
+
+# 소스별 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 30.0
+# 배치 조회 시 동시에 보내는 최대 요청 수
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# provider 이름 -> fetch=False 상태의 ChartData 를 만드는 factory
+CHART_PROVIDERS = {
+    "melon": partial(melon.ChartData, fetch=False),
+    "genie": partial(
+        genie.ChartData,
+        chartPeriod=genie.GenieChartPeriod.Realtime,
+        fetch=False),
+    "bugs": partial(
+        bugs.ChartData,
+        chartType=bugs.BugsChartType.All,
+        chartPeriod=bugs.BugsChartPeriod.Realtime,
+        fetch=False,
+    ),
+    "flo": partial(flo.ChartData, fetch=False),
+    "vibe": partial(vibe.ChartData, fetch=False),
+}
+
+
+class ChartFetchTimeout(Exception):
+    pass
+
+
+class ChartFetchResult:
+    """Represents the outcome of fetching one provider's chart.
+    Attributes:
+        source: The provider name. (e.g. "melon")
+        chart: The `ChartData` instance that was fetched.
+        elapsed: Wall-clock seconds spent on the fetch.
+        error: The exception raised while fetching, or `None` on success.
+    """
+
+    def __init__(self, source: str, chart, elapsed: float, error=None):
+        self.source = source
+        self.chart = chart
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def changed(self):
+        return self.ok and self.chart.changed is not False
+
+    @property
+    def entries(self):
+        return self.chart.entries if self.changed else []
+
+    def __repr__(self):
+        status = "ok" if self.ok else repr(self.error)
+        return "{}(source={!r}, entries={}, elapsed={:.3f}s, {})".format(
+            self.__class__.__name__, self.source, len(self.entries), self.elapsed, status)
+
+
+def _timeout_for(source: str, timeout: Union[float, Dict[str, float], None]):
+    if isinstance(timeout, dict):
+        return timeout.get(source, DEFAULT_TIMEOUT)
+    return timeout
+
+
+async def _fetch_one(
+    source: str,
+    chart,
+    executor,
+    timeout: Optional[float],
+    conditional: bool,
+    cacheTtl: Optional[float],
+):
+    started = time.perf_counter()
+    error = None
+    try:
+        await asyncio.wait_for(
+            chart.fetchEntriesAsync(
+                executor, conditional=conditional, cacheTtl=cacheTtl),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        error = ChartFetchTimeout(f"{source} chart fetch exceeded {timeout}s")
+    except Exception as e:
+        error = e
+    return ChartFetchResult(
+        source,
+        chart,
+        time.perf_counter() - started,
+        error)
+
+
+async def fetch_all_charts_async(
+    sources: Optional[Iterable[str]] = None,
+    timeout: Union[float, Dict[str, float], None] = DEFAULT_TIMEOUT,
+    session: requests.Session = None,
+    conditional: bool = False,
+    cacheTtl: Optional[float] = None,
+) -> Dict[str, ChartFetchResult]:
+    """Fetches several provider charts at the same time.
+    Args:
+        sources: The provider names to fetch. (default: every key of `CHART_PROVIDERS`)
+        timeout: Seconds allowed per source, either one value for all sources or a `{source: seconds}` dict.
+        session: The `requests.Session` shared by every source. (default: `chart_http.get_shared_session()`)
+        conditional: Only parse charts that changed since the last conditional fetch. (see `BaseChartData.fetchEntries()`)
+        cacheTtl: Reuse snapshots from the shared chart cache that are at most `cacheTtl` seconds old. (see `BaseChartData.fetchCached()`)
+    Returns:
+        A `{source: ChartFetchResult}` dict in the order the sources were given.
+    """
+    sources = list(sources or CHART_PROVIDERS)
+    session = session or get_shared_session()
+    charts = {
+        source: CHART_PROVIDERS[source](session=session) for source in sources
+    }
+    return await _fetch_charts(charts, timeout, conditional, len(charts), cacheTtl)
+
+
+async def _fetch_charts(
+    charts: dict,
+    timeout,
+    conditional: bool,
+    maxConcurrency: int,
+    cacheTtl: Optional[float] = None,
+):
+    # 블로킹 requests 호출을 최대 maxConcurrency 개의 스레드에서 동시에 실행
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(maxConcurrency, len(charts))),
+        thread_name_prefix="chart-fetch",
+    )
+    try:
+        results = await asyncio.gather(
+            *[
+                _fetch_one(
+                    key,
+                    chart,
+                    executor,
+                    _timeout_for(key, timeout),
+                    conditional,
+                    cacheTtl,
+                )
+                for key, chart in charts.items()
+            ]
+        )
+    finally:
+        # 타임아웃 난 요청 스레드는 기다리지 않는다
+        executor.shutdown(wait=False)
+
+    return {result.source: result for result in results}
+
+
+def fetch_all_charts(
+    sources: Optional[Iterable[str]] = None,
+    timeout: Union[float, Dict[str, float], None] = DEFAULT_TIMEOUT,
+    raise_on_error: bool = False,
+    session: requests.Session = None,
+    conditional: bool = False,
+    cacheTtl: Optional[float] = None,
+) -> Dict[str, ChartFetchResult]:
+    """Blocking wrapper around `fetch_all_charts_async()`.
+    Total wall-clock time is roughly that of the slowest source instead of the sum of all of them.
+    Args:
+        sources: The provider names to fetch. (default: every key of `CHART_PROVIDERS`)
+        timeout: Seconds allowed per source, either one value for all sources or a `{source: seconds}` dict.
+        raise_on_error: Re-raise the first per-source error instead of returning it in the result.
+        session: The `requests.Session` shared by every source. (default: `chart_http.get_shared_session()`)
+        conditional: Only parse charts that changed since the last conditional fetch. (see `BaseChartData.fetchEntries()`)
+        cacheTtl: Reuse snapshots from the shared chart cache that are at most `cacheTtl` seconds old. (see `BaseChartData.fetchCached()`)
+    """
+    results = asyncio.run(
+        fetch_all_charts_async(sources, timeout, session, conditional, cacheTtl)
+    )
+
+    for result in results.values():
+        print(f"⏱️ {result!r}")
+        if raise_on_error and not result.ok:
+            raise result.error
+
+    return results
+
+
+def fetch_chart_batch(
+    factory: Callable,
+    specs: Iterable[tuple],
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    session: requests.Session = None,
+    maxConcurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> Dict[tuple, ChartFetchResult]:
+    """Fetches one chart per spec concurrently over a single connection pool.
+    Args:
+        factory: Builds an unfetched `ChartData` from a spec, e.g. `lambda spec, session: ...`.
+        specs: The specs (e.g. `GenieChartSpec`, `BugsChartSpec`) to fetch. Duplicates are fetched once.
+        timeout: Seconds allowed per spec. Queueing behind `maxConcurrency` counts towards it.
+        session: The `requests.Session` shared by every request. (default: `chart_http.get_shared_session()`)
+        maxConcurrency: The maximum number of requests in flight at once.
+    Returns:
+        A `{spec: ChartFetchResult}` dict in the order the specs were given.
+    """
+    session = session or get_shared_session()
+    charts = {spec: factory(spec, session) for spec in dict.fromkeys(specs)}
+    results = asyncio.run(_fetch_charts(charts, timeout, False, maxConcurrency))
+
+    for result in results.values():
+        print(f"⏱️ {result!r}")
+
+    return results
+
+
+def fetch_genie_batch(
+    specs: Iterable[genie.GenieChartSpec], **kwargs
+) -> Dict[genie.GenieChartSpec, ChartFetchResult]:
+    """`fetch_chart_batch()` for Genie, e.g. `[GenieChartSpec(GenieChartPeriod.Daily, page=2)]`."""
+    return fetch_chart_batch(
+        lambda spec, session: genie.ChartData(
+            chartPeriod=spec.chartPeriod,
+            page=spec.page,
+            pageSize=spec.pageSize,
+            fetch=False,
+            session=session,
+        ),
+        specs,
+        **kwargs,
+    )
+
+
+def fetch_bugs_batch(
+    specs: Iterable[bugs.BugsChartSpec], **kwargs
+) -> Dict[bugs.BugsChartSpec, ChartFetchResult]:
+    """`fetch_chart_batch()` for Bugs, e.g. `bugs_chart_grid()` for every type and period at once."""
+    return fetch_chart_batch(
+        lambda spec, session: bugs.ChartData(
+            chartType=spec.chartType,
+            chartPeriod=spec.chartPeriod,
+            page=spec.page,
+            pageSize=spec.pageSize,
+            fetch=False,
+            session=session,
+        ),
+        specs,
+        **kwargs,
+    )
+
+
+def bugs_chart_grid(
+    periods: Iterable[str] = (
+        bugs.BugsChartPeriod.Realtime,
+        bugs.BugsChartPeriod.Daily,
+        bugs.BugsChartPeriod.Weekly,
+    ),
+    chartTypes: Iterable[int] = (
+        bugs.BugsChartType.All,
+        bugs.BugsChartType.Domestic,
+        bugs.BugsChartType.International,
+    ),
+    pages: Iterable[int] = (1,),
+) -> List[bugs.BugsChartSpec]:
+    """Returns a `BugsChartSpec` for every period x type x page combination."""
+    return [
+        bugs.BugsChartSpec(chartPeriod=period, chartType=chartType, page=page)
+        for period, chartType, page in product(periods, chartTypes, pages)
+    ]
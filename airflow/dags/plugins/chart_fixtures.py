@@ -0,0 +1,309 @@
+import json
+import os
+from itertools import cycle, islice
+from urllib.parse import quote
+
+import requests
+from plugins.chart_fetcher import CHART_PROVIDERS
+
+# 녹화한 provider 응답을 저장하는 디렉터리
+CHART_FIXTURE_DIR = os.getenv(
+    "CHART_FIXTURE_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "benchmarks",
+        "fixtures",
+    ),
+)
+# 손으로 작성한 provider 별 응답 (녹화본이 아니다). 실제 응답의 구조만 흉내 내며 테스트에 쓴다
+SYNTHETIC_FIXTURE_DIR = os.path.join(CHART_FIXTURE_DIR, "synthetic")
+
+# 본문을 풀어서 저장하므로 전송 관련 헤더는 녹화하지 않는다
+_TRANSPORT_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+
+class ChartFixtureException(Exception):
+    pass
+
+
+class ChartFixture:
+    """A raw provider response captured for offline replay.
+    Attributes:
+        status: The HTTP status code.
+        headers: The response headers.
+        body: The raw response body.
+    """
+
+    def __init__(self, status: int, headers: dict, body: bytes):
+        self.status = status
+        self.headers = dict(headers)
+        self.body = body
+
+    @classmethod
+    def path(cls, provider: str, directory: str = CHART_FIXTURE_DIR):
+        return os.path.join(directory, f"{provider}.json")
+
+    @classmethod
+    def load(cls, provider: str, directory: str = CHART_FIXTURE_DIR):
+        try:
+            with open(cls.path(provider, directory), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            raise ChartFixtureException(f"No recorded fixture for {provider!r} in {directory}")
+        return cls(stored["status"], stored["headers"], stored["body"].encode("utf-8"))
+
+    def save(self, provider: str, directory: str = CHART_FIXTURE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path(provider, directory), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "status": self.status,
+                    "headers": self.headers,
+                    "body": self.body.decode("utf-8"),
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+    def response(self) -> requests.Response:
+        """Returns a fresh `requests.Response` serving this fixture, usable with and without `stream=True`."""
+        res = requests.Response()
+        res.status_code = self.status
+        res.headers.update(self.headers)
+        res.encoding = "utf-8"
+        res._content = self.body
+        res._content_consumed = True
+        return res
+
+
+class RecordingSession(requests.Session):
+    """A session that performs real requests and keeps the last response as a `ChartFixture`."""
+
+    def __init__(self, session: requests.Session = None):
+        super().__init__()
+        self._inner = session or requests.Session()
+        self.fixture = None
+
+    def request(self, method, url, **kwargs):
+        res = self._inner.request(method, url, **kwargs)
+        # stream=True 요청이어도 본문을 읽어두면 iter_content() 는 저장된 본문에서 동작한다
+        headers = {
+            k: v for k, v in res.headers.items() if k.lower() not in _TRANSPORT_HEADERS
+        }
+        self.fixture = ChartFixture(res.status_code, headers, res.content)
+        return res
+
+
+class ReplaySession(requests.Session):
+    """A session that answers every request with the same `ChartFixture` instead of the network.
+    Attributes:
+        fixture: The response to serve.
+        calls: The number of requests served so far.
+    """
+
+    def __init__(self, fixture: ChartFixture):
+        super().__init__()
+        self.fixture = fixture
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.fixture.response()
+
+
+def record_fixture(provider: str, directory: str = CHART_FIXTURE_DIR) -> ChartFixture:
+    """Fetches one provider's chart over the network and saves the raw response for replay."""
+    session = RecordingSession()
+    chart = CHART_PROVIDERS[provider](session=session)
+    chart.fetchEntries()
+    session.fixture.save(provider, directory)
+    return session.fixture
+
+
+def replay_chart(provider: str, fixture: ChartFixture = None, **kwargs):
+    """Builds the provider's `ChartData` on a `ReplaySession`. Call `fetchEntries()` or `streamEntries()` on it.
+    Args:
+        fixture: The response to serve. (default: the recorded fixture in `CHART_FIXTURE_DIR`)
+    """
+    fixture = fixture or ChartFixture.load(provider)
+    return CHART_PROVIDERS[provider](session=ReplaySession(fixture), **kwargs)
+
+
+# --- synthetic payloads -----------------------------------------------------
+# 실제 응답과 같은 구조와 비슷한 크기의 항목을 만든다 (파싱에 쓰이지 않는 필드도 포함)
+
+
+def _melon_item(i):
+    return {
+        "SONGID": str(30000000 + i),
+        "SONGNAME": f"노래 제목 {i}",
+        "ALBUMID": str(11000000 + i),
+        "ALBUMNAME": f"앨범 {i}",
+        "ARTISTLIST": [{"ARTISTID": str(900000 + i % 97), "ARTISTNAME": f"아티스트 {i % 97}"}],
+        "PLAYTIME": "195",
+        "ISSUEDATE": "20250301",
+        "ALBUMIMG": f"https://cdnimg.melon.co.kr/cm2/album/images/111/{i:05d}/{i}_500.jpg/melon/resize/120/quality/80/optimize",
+        "CURRANK": str(i + 1),
+        "PASTRANK": str(i + 1 + (i % 7) - 3),
+        "RANKGAP": str((i % 7) - 3),
+        "RANKTYPE": "NEW" if i % 13 == 0 else "UP",
+        "ISSERVICE": True,
+        "ISADULT": False,
+        "ISFREE": False,
+    }
+
+
+def _melon_payload(items):
+    return {
+        "response": {
+            "PAGE": "TOP100",
+            "RANKDAY": "2025.03.01",
+            "RANKHOUR": "11:00",
+            "SONGLIST": items,
+        }
+    }
+
+
+def _genie_item(i):
+    return {
+        "SONG_ID": str(100000000 + i),
+        "SONG_NAME": quote(f"노래 제목 {i}"),
+        "ARTIST_ID": str(80000000 + i % 97),
+        "ARTIST_NAME": quote(f"아티스트 {i % 97}"),
+        "ALBUM_ID": str(81000000 + i),
+        "ALBUM_NAME": quote(f"앨범 {i}"),
+        "ALBUM_IMG_PATH": quote(f"https://image.genie.co.kr/Y/IMAGE/IMG_ALBUM/081/{i:06d}/{i}_1_140x140.JPG"),
+        "RANK_NO": str(i + 1),
+        "PRE_RANK_NO": str(i + 1 + (i % 7) - 3),
+        "TOP_RANK_NO": str(max(1, i - 2)),
+        "DURATION": "195",
+        "HOLD_BACK": "N",
+    }
+
+
+def _genie_payload(items):
+    return {
+        "Result": {"RetCode": "0", "RetMsg": "success"},
+        "PageInfo": {"ChartTime": "11:00", "TotCount": str(len(items))},
+        "DataSet": {"DATA": items},
+    }
+
+
+def _bugs_item(i):
+    return {
+        "track_id": 6000000 + i,
+        "track_title": f"노래 제목 {i}",
+        "artists": [{"artist_id": 80000 + i % 97, "artist_nm": f"아티스트 {i % 97}"}],
+        "album": {
+            "album_id": 4000000 + i,
+            "title": f"앨범 {i}",
+            "image": {"path": f"/40{i % 100:02d}/{4000000 + i}.jpg"},
+        },
+        "list_attr": {
+            "rank": i + 1,
+            "rank_peak": max(1, i - 2),
+            "rank_last": i + 1 + (i % 7) - 3,
+        },
+        "len": "03:15",
+        "adult_yn": False,
+    }
+
+
+def _bugs_payload(items):
+    return {
+        "ret_code": 0,
+        "ret_msg": "success",
+        "info": {"end_dt": 1740826800000},
+        "list": items,
+    }
+
+
+def _flo_item(i):
+    return {
+        "id": 500000000 + i,
+        "name": f"노래 제목 {i}",
+        "representationArtist": {"id": 80000000 + i % 97, "name": f"아티스트 {i % 97}"},
+        "album": {
+            "id": 400000000 + i,
+            "title": f"앨범 {i}",
+            "imgList": [
+                {"size": 350, "url": f"https://cdn.music-flo.com/image/album/{i % 1000:03d}/{i}.jpg?1&/dims/resize/350x350/quality/90"}
+            ],
+        },
+        "rank": {"rankBadge": (i % 7) - 3, "newYn": "Y" if i % 13 == 0 else "N"},
+        "playTime": "03:15",
+        "adultAuthYn": "N",
+    }
+
+
+def _flo_payload(items):
+    return {"code": "2000000", "data": {"name": "FLO 차트", "trackList": items}}
+
+
+def _vibe_item(i):
+    return {
+        "trackId": 90000000 + i,
+        "trackTitle": f"노래 제목 {i}",
+        "artists": [{"artistId": 7000000 + i % 97, "artistName": f"아티스트 {i % 97}"}],
+        "album": {
+            "albumId": 30000000 + i,
+            "albumTitle": f"앨범 {i}",
+            "imageUrl": f"https://musicmeta-phinf.pstatic.net/album/030/{i:06d}/{i}.jpg?type=r480Fll&v=20250301",
+        },
+        "rank": {
+            "currentRank": i + 1,
+            "rankVariation": (i % 7) - 3,
+            "isNew": i % 13 == 0,
+        },
+        "playTime": "03:15",
+        "isStreamingAvailable": True,
+    }
+
+
+def _vibe_payload(items):
+    return {
+        "response": {
+            "result": {
+                "chart": {
+                    "title": "VIBE 오늘 Top 100",
+                    "date": 1740826800000,
+                    "chartTotalCount": len(items),
+                    "items": {"tracks": items},
+                }
+            }
+        }
+    }
+
+
+# provider 이름 -> (항목 생성 함수, 항목 목록을 감싸는 함수)
+_SYNTHETIC = {
+    "melon": (_melon_item, _melon_payload),
+    "genie": (_genie_item, _genie_payload),
+    "bugs": (_bugs_item, _bugs_payload),
+    "flo": (_flo_item, _flo_payload),
+    "vibe": (_vibe_item, _vibe_payload),
+}
+
+
+def synthetic_fixture(provider: str, size: int = 100) -> ChartFixture:
+    """Returns a `ChartFixture` shaped like the provider's chart response with `size` entries."""
+    makeItem, wrap = _SYNTHETIC[provider]
+    body = json.dumps(wrap([makeItem(i) for i in range(size)]), ensure_ascii=False)
+    return ChartFixture(200, {"Content-Type": "application/json"}, body.encode("utf-8"))
+
+
+def inflate_fixture(provider: str, fixture: ChartFixture, size: int) -> ChartFixture:
+    """Returns a copy of a recorded fixture whose entry list is repeated up to `size` entries."""
+    chartClass = CHART_PROVIDERS[provider].func
+    data = json.loads(fixture.body)
+
+    parent = data
+    for key in chartClass._ITEMS_PATH[:-1]:
+        parent = parent[key]
+    items = parent[chartClass._ITEMS_PATH[-1]]
+    if not items:
+        raise ChartFixtureException(f"The {provider!r} fixture has no entries to inflate.")
+    parent[chartClass._ITEMS_PATH[-1]] = list(islice(cycle(items), size))
+
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return ChartFixture(fixture.status, fixture.headers, body)
@@ -0,0 +1,95 @@
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) 타임아웃 (초)
+DEFAULT_TIMEOUT = (3.05, 15)
+DEFAULT_POOL_SIZE = 16
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_BACKOFF_MAX = 30
+_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+class _JitteredRetry(Retry):
+    """`Retry` with "full jitter" exponential backoff.
+    Retry-After headers on 413/429/503 responses still take precedence over the computed backoff.
+    """
+
+    backoffMax = DEFAULT_BACKOFF_MAX
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.backoffMax = self.backoffMax
+        return retry
+
+    def get_backoff_time(self):
+        backoff = min(super().get_backoff_time(), self.backoffMax)
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class ChartSession(requests.Session):
+    """A keep-alive `requests.Session` shared by the chart clients.
+    Attributes:
+        timeout: The default `(connect, read)` timeout applied when a request does not pass one.
+        poolSize: The number of connections kept alive per host.
+        maxRetries: How many times a failed connection or a 429/5xx response is retried.
+        backoffFactor: The base of the exponential backoff between retries, in seconds.
+        backoffMax: The upper bound of a single backoff sleep, in seconds.
+        retryStatusCodes: The response codes retried by the session itself.
+    """
+
+    def __init__(
+        self,
+        timeout=DEFAULT_TIMEOUT,
+        poolSize: int = DEFAULT_POOL_SIZE,
+        maxRetries: int = DEFAULT_MAX_RETRIES,
+        backoffFactor: float = DEFAULT_BACKOFF_FACTOR,
+        backoffMax: float = DEFAULT_BACKOFF_MAX,
+        retryStatusCodes=_RETRY_STATUS_CODES,
+    ):
+        super().__init__()
+        self.timeout = timeout
+
+        retry = _JitteredRetry(
+            total=maxRetries,
+            connect=maxRetries,
+            read=maxRetries,
+            status=maxRetries,
+            status_forcelist=retryStatusCodes,
+            # 차트 API 는 POST 조회(genie, bugs)도 멱등이므로 모든 메서드를 재시도한다
+            allowed_methods=None,
+            backoff_factor=backoffFactor,
+            respect_retry_after_header=True,
+            # 재시도 소진 시 마지막 응답을 그대로 돌려주고, 상태 코드 검사는 각 ChartData 에 맡긴다
+            raise_on_status=False,
+        )
+        retry.backoffMax = backoffMax
+
+        adapter = HTTPAdapter(
+            pool_connections=poolSize,
+            pool_maxsize=poolSize,
+            max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_shared_session() -> ChartSession:
+    """Returns the process-wide `ChartSession`, creating it on first use."""
+    global _shared_session
+
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = ChartSession()
+    return _shared_session
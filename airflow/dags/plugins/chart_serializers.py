@@ -0,0 +1,205 @@
+import json
+import sys
+from array import array
+from datetime import datetime
+from typing import Iterable, Union
+
+from plugins.chart_base import _MISSING, BaseChartData, ChartColumns, ChartEntry
+
+# 차트 단위로 저장하는 메타데이터 (없는 속성은 생략)
+META_FIELDS = ("provider", "name", "date", "chartType", "chartPeriod", "imageSize")
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+_DECODER = json.JSONDecoder()
+
+
+class ChartSerializeException(Exception):
+    pass
+
+
+class ChartSnapshot(BaseChartData):
+    """A chart restored by one of the loaders in this module.
+    It has the same read API as the provider `ChartData` classes (`entries`, `columns`, `to_pandas()`, ...)
+    but cannot fetch.
+    Attributes:
+        provider: The provider the chart was fetched from.
+        date: The chart date.
+        columns: The `ChartColumns` holding the chart entries.
+        name, chartType, chartPeriod, imageSize: Set when the serialized chart had them.
+    """
+
+    def __init__(self, meta: dict, columns: ChartColumns, fields=None):
+        for key, value in meta.items():
+            setattr(self, key, value)
+        if "date" in meta and isinstance(meta["date"], str):
+            self.date = datetime.fromisoformat(meta["date"])
+        self.columns = columns
+        if fields is not None:
+            self.ENTRY_FIELDS = tuple(fields)
+
+    def _request(self, headers, stream=False):
+        raise ChartSerializeException("A ChartSnapshot cannot be fetched.")
+
+
+def chart_meta(chart: BaseChartData) -> dict:
+    """Returns the JSON friendly chart metadata listed in `META_FIELDS`."""
+    meta = {}
+    for field in META_FIELDS:
+        value = getattr(chart, field, None)
+        if value is None:
+            continue
+        meta[field] = value.isoformat() if isinstance(value, datetime) else value
+    return meta
+
+
+def _header(chart: BaseChartData):
+    return {"meta": chart_meta(chart), "fields": list(chart.entryFields)}
+
+
+# --- compact JSON -----------------------------------------------------------
+
+
+def dumps_json(chart: BaseChartData) -> str:
+    """Serializes the chart as one compact, column-oriented JSON document:
+    `{"meta": {...}, "fields": [...], "columns": {field: [values]}}`.
+    """
+    payload = _header(chart)
+    payload["columns"] = chart.columns.toDict(payload["fields"])
+    return _ENCODER.encode(payload)
+
+
+def loads_json(text: Union[str, bytes]) -> ChartSnapshot:
+    data = json.loads(text)
+    try:
+        return ChartSnapshot(
+            data["meta"], ChartColumns.fromDict(data["columns"]), data["fields"]
+        )
+    except (KeyError, TypeError) as e:
+        raise ChartSerializeException(f"Invalid chart JSON: {e!r}")
+
+
+# --- NDJSON -----------------------------------------------------------------
+
+
+def iter_ndjson(chart: BaseChartData):
+    """Yields NDJSON lines (without the newline): a `{"meta": ..., "fields": ...}` header,
+    then one `{field: value}` object per entry in rank order.
+    """
+    header = _header(chart)
+    fields = header["fields"]
+    yield _ENCODER.encode(header)
+
+    values = chart.columns.toDict(fields)
+    encode = _ENCODER.encode
+    for row in zip(*(values[f] for f in fields)):
+        yield encode(dict(zip(fields, row)))
+
+
+def dumps_ndjson(chart: BaseChartData) -> str:
+    return "\n".join(iter_ndjson(chart)) + "\n"
+
+
+def dump_ndjson_entries(entries: Iterable[ChartEntry], fp, fields=None):
+    """Writes `ChartEntry` rows to the text file `fp` as they arrive, e.g. from `chart.streamEntries()`.
+    Args:
+        fields: The fields to write. (default: every field the entry has a value for)
+    """
+    encode = _ENCODER.encode
+    for entry in entries:
+        if fields is None:
+            fp.write(encode(entry.asDict()))
+        else:
+            fp.write(encode({f: getattr(entry, f) for f in fields}))
+        fp.write("\n")
+
+
+def loads_ndjson(lines: Union[str, bytes, Iterable]) -> ChartSnapshot:
+    """Loads `dumps_ndjson()` output. Accepts the whole text or an iterable of lines (e.g. an open file)."""
+    if isinstance(lines, bytes):
+        lines = lines.decode("utf-8")
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+
+    decode = _DECODER.decode
+    lines = iter(lines)
+    try:
+        header = decode(next(lines))
+        fields = header["fields"]
+        meta = header["meta"]
+    except (StopIteration, KeyError, TypeError, ValueError) as e:
+        raise ChartSerializeException(f"Invalid chart NDJSON header: {e!r}")
+
+    values = {field: [] for field in fields}
+    appends = [(field, values[field].append) for field in fields]
+    for number, line in enumerate(lines, 2):
+        if not line.strip():
+            continue
+        try:
+            row = decode(line)
+            for field, append in appends:
+                append(row.get(field))
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ChartSerializeException(f"Invalid chart NDJSON row at line {number}: {e!r}")
+
+    return ChartSnapshot(meta, ChartColumns.fromDict(values), fields)
+
+
+# --- msgpack ----------------------------------------------------------------
+
+
+def dumps_msgpack(chart: BaseChartData) -> bytes:
+    """Serializes the chart with msgpack. Integer columns are stored as their raw `array` bytes,
+    so packing and unpacking them is a single memory copy.
+    """
+    import msgpack
+
+    header = _header(chart)
+    columns = chart.columns
+    packed = {}
+    for field in header["fields"]:
+        column = getattr(columns, field)
+        packed[field] = column.tobytes() if isinstance(column, array) else column
+
+    header["size"] = len(columns)
+    header["byteorder"] = sys.byteorder
+    header["columns"] = packed
+    return msgpack.packb(header, use_bin_type=True)
+
+
+def loads_msgpack(data: bytes) -> ChartSnapshot:
+    import msgpack
+
+    try:
+        payload = msgpack.unpackb(data, raw=False)
+        size = payload["size"]
+        packed = payload["columns"]
+    except (ValueError, KeyError, TypeError, msgpack.UnpackException) as e:
+        raise ChartSerializeException(f"Invalid chart msgpack: {e!r}")
+
+    columns = ChartColumns()
+    swap = payload.get("byteorder", sys.byteorder) != sys.byteorder
+    for field in ChartColumns.FIELDS:
+        current = getattr(columns, field)
+        value = packed.get(field)
+        if not isinstance(current, array):
+            setattr(columns, field, value if value is not None else [None] * size)
+            continue
+
+        if value is None:
+            column = array(current.typecode, [_MISSING]) * size
+        else:
+            column = array(current.typecode)
+            column.frombytes(value)
+            if swap:
+                column.byteswap()
+        setattr(columns, field, column)
+
+    return ChartSnapshot(payload["meta"], columns, payload["fields"])
+
+
+# 형식 이름 -> (dumps, loads)
+FORMATS = {
+    "json": (dumps_json, loads_json),
+    "ndjson": (dumps_ndjson, loads_ndjson),
+    "msgpack": (dumps_msgpack, loads_msgpack),
+}
@@ -0,0 +1,92 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from plugins.chart_base import BaseChartData
+
+
+class ChartStagingException(Exception):
+    pass
+
+
+@contextmanager
+def _atomic_open(path, mode="w", **kwargs):
+    # 다 쓴 뒤에 이름을 바꿔서, 재시도 중인 다른 태스크가 쓰다 만 파일을 읽지 않도록 한다
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmpPath, mode, **kwargs) as f:
+            yield f
+        os.replace(tmpPath, path)
+    finally:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+
+
+def chart_schema():
+    """Returns the `pyarrow.Schema` shared by the raw chart Parquet files of every provider.
+    `scripts/S3_Spark_SnowFlake_ELT.py` reads the files with the matching Spark `CHART_SCHEMA`.
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("rank", pa.int32()),
+            ("title", pa.string()),
+            ("artist", pa.string()),
+            ("artist_key", pa.string()),
+            ("genres", pa.list_(pa.string())),
+            ("lastPos", pa.int32()),
+            ("image", pa.string()),
+            ("peakPos", pa.int32()),
+            ("isNew", pa.bool_()),
+            ("source", pa.string()),
+            ("date", pa.date32()),
+        ]
+    )
+
+
+def chart_table(chart: BaseChartData, genres: List[List[str]], artistKeys: List[Optional[str]], date: str):
+    """Returns the chart as a `chart_schema()` `pyarrow.Table`, built from `chart.columns.to_arrow()`.
+    Fields the provider does not report (e.g. `peakPos` for melon) are nulls.
+    Args:
+        genres: The genre list of every entry, in chart order.
+        artistKeys: The normalized artist key of every entry, in chart order. (see `ArtistDim.genresAndKeys()`)
+        date: The chart date as `YYYY-MM-DD`.
+    """
+    import pyarrow as pa
+
+    table = chart.columns.to_arrow()
+    size = table.num_rows
+    if len(genres) != size or len(artistKeys) != size:
+        raise ChartStagingException(
+            f"Expected {size} genre lists and artist keys, got {len(genres)} and {len(artistKeys)}")
+
+    schema = chart_schema()
+    extra = {
+        "genres": pa.array(genres, type=pa.list_(pa.string())),
+        "artist_key": pa.array(artistKeys, type=pa.string()),
+        "source": pa.array([chart.provider] * size, type=pa.string()),
+        "date": pa.array([datetime.strptime(date, "%Y-%m-%d").date()] * size, type=pa.date32()),
+    }
+    return pa.Table.from_arrays(
+        [extra[name] if name in extra else table.column(name) for name in schema.names],
+        schema=schema,
+    )
+
+
+def write_chart_parquet(
+    chart: BaseChartData,
+    genres: List[List[str]],
+    artistKeys: List[Optional[str]],
+    parquetPath: str,
+    date: str,
+) -> str:
+    """Writes `chart_table()` to `parquetPath` (zstd compressed) and returns `parquetPath`."""
+    import pyarrow.parquet as pq
+
+    table = chart_table(chart, genres, artistKeys, date)
+    with _atomic_open(parquetPath, "wb") as f:
+        pq.write_table(table, f, compression="zstd")
+    return parquetPath
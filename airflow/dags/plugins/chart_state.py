@@ -0,0 +1,91 @@
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+
+# 차트별 마지막 fetch 상태(ETag, Last-Modified, content hash)를 저장하는 디렉터리
+CHART_STATE_DIR = os.getenv(
+    "CHART_STATE_DIR",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "chart_state"),
+)
+
+
+def chart_key_name(key) -> str:
+    """Turns a `ChartData.cacheKey` tuple into a file-name friendly string. (e.g. "bugs-20151-realtime-256")"""
+    return "-".join(re.sub(r"[^0-9A-Za-z_.]", "_", str(part)) for part in key)
+
+
+class ChartFetchState:
+    """The validators stored after the last successful fetch of one chart.
+    Attributes:
+        key: The `ChartData.cacheKey` the state belongs to.
+        etag: The `ETag` response header, if the server sent one.
+        lastModified: The `Last-Modified` response header, if the server sent one.
+        digest: The content hash of the chart date and entries. (see `BaseChartData.contentDigest()`)
+        updatedAt: When the state was last written.
+    """
+
+    def __init__(
+        self,
+        key,
+        etag: str = None,
+        lastModified: str = None,
+        digest: str = None,
+        updatedAt: str = None,
+        directory: str = CHART_STATE_DIR,
+    ):
+        self.key = tuple(key)
+        self.etag = etag
+        self.lastModified = lastModified
+        self.digest = digest
+        self.updatedAt = updatedAt
+        self.directory = directory
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{chart_key_name(self.key)}.json")
+
+    @classmethod
+    def load(cls, key, directory: str = CHART_STATE_DIR):
+        state = cls(key, directory=directory)
+        try:
+            with open(state.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return state
+
+        state.etag = stored.get("etag")
+        state.lastModified = stored.get("lastModified")
+        state.digest = stored.get("digest")
+        state.updatedAt = stored.get("updatedAt")
+        return state
+
+    def conditionalHeaders(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.lastModified:
+            headers["If-Modified-Since"] = self.lastModified
+        return headers
+
+    def update(self, responseHeaders, digest: str):
+        # 서버가 validator 를 주지 않으면 이전 값을 지워서 잘못된 304 를 받지 않도록 한다
+        self.etag = responseHeaders.get("ETag")
+        self.lastModified = responseHeaders.get("Last-Modified")
+        self.digest = digest
+        self.updatedAt = datetime.now().isoformat()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        payload = {
+            "etag": self.etag,
+            "lastModified": self.lastModified,
+            "digest": self.digest,
+            "updatedAt": self.updatedAt,
+        }
+        # 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,148 @@
+import codecs
+import json
+from typing import Iterable, Iterator, Tuple
+
+# 이벤트 종류
+ITEM = "item"
+META = "meta"
+
+_WHITESPACE = " \t\n\r"
+# 이미 소비한 버퍼 앞부분을 잘라내는 기준 (문자 수)
+_COMPACT_THRESHOLD = 1 << 16
+
+
+class ChartStreamException(Exception):
+    pass
+
+
+class _Reader:
+    """A growing text buffer over an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum: int = 1) -> bool:
+        """Reads at least `minimum` more characters. Returns `False` once the body is exhausted."""
+        if self.eof:
+            return False
+
+        if self.pos > _COMPACT_THRESHOLD:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        target = len(self.buf) + minimum
+        parts = [self.buf]
+        size = len(self.buf)
+        while size < target:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._decoder.decode(b"", final=True))
+                self.eof = True
+                break
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+        self.buf = "".join(parts)
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ChartStreamException("Unexpected end of JSON body.")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ChartStreamException(
+                f"Expected {char!r} at offset {self.pos}, found {self.buf[self.pos]!r}."
+            )
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value with the C decoder, reading more of the body as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 값이 아직 다 도착하지 않았으면 남은 길이만큼 더 읽고 다시 시도
+                if not self.fill(max(len(self.buf) - self.pos, 4096)):
+                    raise
+                continue
+            # 숫자가 청크 경계에서 잘렸을 수 있으므로 버퍼 끝에서 끝난 값은 한 번 더 읽어서 확인
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(
+    chunks: Iterable[bytes],
+    itemsPath: Tuple[str, ...],
+    metaPaths: Iterable[Tuple[str, ...]] = (),
+) -> Iterator[tuple]:
+    """Incrementally walks a JSON document and yields the parts a chart client needs.
+    Only objects on the way to `itemsPath` or a `metaPaths` entry are descended into; every other
+    value is decoded in one C call and dropped.
+    Args:
+        chunks: The response body, e.g. `res.iter_content(chunk_size=16384)`.
+        itemsPath: The object keys leading to the array of chart items.
+        metaPaths: The object keys leading to scalar values such as the chart date.
+    Yields:
+        `(ITEM, itemsPath, item)` for each element of the items array, as soon as it has been read,
+        and `(META, path, value)` for each meta path found.
+    """
+    reader = _Reader(chunks)
+    itemsPath = tuple(itemsPath)
+    metaPaths = {tuple(path) for path in metaPaths}
+    prefixes = {path[:i] for path in metaPaths | {itemsPath} for i in range(len(path))}
+    yield from _walk(reader, (), itemsPath, metaPaths, prefixes)
+
+
+def _walk(reader: _Reader, path, itemsPath, metaPaths, prefixes):
+    if path == itemsPath and reader.peek() == "[":
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.pos += 1
+            return
+        while True:
+            yield ITEM, path, reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("]")
+            return
+
+    if path in prefixes and reader.peek() == "{":
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            yield from _walk(reader, path + (key,), itemsPath, metaPaths, prefixes)
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            return
+
+    value = reader.value()
+    if path in metaPaths:
+        yield META, path, value
+
+
+def lookup(data, path: Tuple[str, ...]):
+    """Returns `data[path[0]][path[1]]...`, raising `KeyError` like plain indexing."""
+    for key in path:
+        data = data[key]
+    return data
@@ -0,0 +1,187 @@
+import heapq
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from plugins.chart_base import ChartColumns
+from plugins.chart_fetcher import CHART_PROVIDERS
+from plugins.chart_http import get_shared_session
+
+# 변경 종류
+NEW = "new"
+MOVE = "move"
+DROP = "drop"
+
+# provider 별 실시간 차트 갱신 주기 (초). 모두 매시 정각 기준으로 갱신된다
+POLL_INTERVALS = {
+    "melon": 60 * 60,
+    "genie": 60 * 60,
+    "bugs": 60 * 60,
+    "flo": 60 * 60,
+    "vibe": 60 * 60,
+}
+# 차트가 아직 갱신되지 않았을 때 다시 확인하기까지의 간격 (초)
+DEFAULT_RETRY_INTERVAL = 5 * 60
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def diff_charts(
+    provider: str, previous: Optional[ChartColumns], current: ChartColumns, date=None
+) -> List[dict]:
+    """Compares two snapshots of the same chart and returns one record per changed position.
+    Entries are matched by (title, artist). Unchanged positions produce no record.
+    Args:
+        provider: The provider name written to every record.
+        previous: The previous snapshot, or `None` to report every current entry as new.
+        current: The latest snapshot.
+        date: The chart date of `current`.
+    Returns:
+        Records of the form `{"provider", "date", "kind", "title", "artist", "rank", "prevRank"}`
+        where `kind` is "new", "move" or "drop"; `rank` is `None` for drops and `prevRank` for new entries.
+    """
+    date = date.isoformat() if hasattr(date, "isoformat") else date
+    # toDict() 가 결측 순위(-1)를 None 으로 바꿔준다
+    fields = ["title", "artist", "rank"]
+    before = {}
+    if previous is not None:
+        prev = previous.toDict(fields)
+        before = dict(zip(zip(prev["title"], prev["artist"]), prev["rank"]))
+
+    changes = []
+    seen = set()
+    cur = current.toDict(fields)
+    for title, artist, rank in zip(cur["title"], cur["artist"], cur["rank"]):
+        key = (title, artist)
+        seen.add(key)
+        if key in before and before[key] == rank:
+            continue
+        prevRank = before.get(key)
+        kind = MOVE if key in before else NEW
+        changes.append(_record(provider, date, kind, title, artist, rank, prevRank))
+
+    for (title, artist), prevRank in before.items():
+        if (title, artist) not in seen:
+            changes.append(_record(provider, date, DROP, title, artist, None, prevRank))
+
+    return changes
+
+
+def _record(provider, date, kind, title, artist, rank, prevRank):
+    return {
+        "provider": provider,
+        "date": date,
+        "kind": kind,
+        "title": title,
+        "artist": artist,
+        "rank": rank,
+        "prevRank": prevRank,
+    }
+
+
+def next_publish_delay(interval: float, now: float = None) -> float:
+    """Returns the seconds until the next multiple of `interval` on the wall clock, e.g. the next top of the hour."""
+    now = time.time() if now is None else now
+    return interval - now % interval
+
+
+def encode_record(record: dict) -> bytes:
+    """Encodes a change record as compact UTF-8 JSON."""
+    return _ENCODER.encode(record).encode("utf-8")
+
+
+class ChartPoll(NamedTuple):
+    """The result of one `ChartWatcher.poll()` that found a changed chart."""
+
+    changes: List[dict]
+    columns: ChartColumns
+    digest: str
+
+
+class ChartWatcher:
+    """Polls the realtime chart of each provider and reports only the positions that changed.
+    Every provider is polled on its own cadence (`POLL_INTERVALS`), aligned to the wall clock so a
+    changed chart is polled again at the next publish boundary (e.g. the top of the hour); when a
+    poll finds the chart unchanged, it is checked again after `retryInterval` until the new chart is published.
+    The first successful poll of a provider reports every entry as new, so consumers can build
+    their state from the stream alone.
+    Attributes:
+        sources: The provider names to watch. (default: every key of `CHART_PROVIDERS`)
+        sink: Called with `(provider, records)` whenever a poll found changes.
+        intervals: `{provider: seconds}` overriding `POLL_INTERVALS`.
+        retryInterval: Seconds to wait before re-polling an unchanged or failed chart. (default: 300)
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[str, List[dict]], None],
+        sources: Optional[Iterable[str]] = None,
+        intervals: Optional[Dict[str, float]] = None,
+        retryInterval: float = DEFAULT_RETRY_INTERVAL,
+    ):
+        self.sink = sink
+        self.sources = list(sources or CHART_PROVIDERS)
+        self.intervals = {**POLL_INTERVALS, **(intervals or {})}
+        self.retryInterval = retryInterval
+        self._session = get_shared_session()
+        self._columns = {}
+        self._digests = {}
+        self._stopped = threading.Event()
+
+    def poll(self, source: str) -> Optional[ChartPoll]:
+        """Fetches one provider's chart and returns its changes, or `None` if the chart has not changed.
+        The new chart is not remembered until `commit()`, so changes the sink failed to deliver are reported again.
+        """
+        chart = CHART_PROVIDERS[source](session=self._session)
+        chart.fetchEntries()
+
+        digest = chart.contentDigest()
+        if self._digests.get(source) == digest:
+            return None
+
+        changes = diff_charts(
+            source, self._columns.get(source), chart.columns, getattr(chart, "date", None)
+        )
+        return ChartPoll(changes, chart.columns, digest)
+
+    def commit(self, source: str, result: ChartPoll):
+        """Remembers a polled chart as the state the next poll is compared against."""
+        self._columns[source] = result.columns
+        self._digests[source] = result.digest
+
+    def step(self, source: str) -> float:
+        """Polls one provider, sends its changes to the sink and returns the seconds until its next poll.
+        Fetch and sink errors are printed and retried after `retryInterval`.
+        """
+        try:
+            result = self.poll(source)
+            if result is not None:
+                if result.changes:
+                    self.sink(source, result.changes)
+                self.commit(source, result)
+        except Exception as e:
+            print(f"❌ {source} 차트 조회/전송 실패: {e!r}")
+            return self.retryInterval
+
+        if result is None:
+            return self.retryInterval
+        print(f"📈 {source}: {len(result.changes)}건 변경")
+        # 조회 시점부터 interval 을 세면 점점 밀리므로, 다음 갱신 시각(매시 정각)에 맞춘다
+        return next_publish_delay(self.intervals.get(source, DEFAULT_RETRY_INTERVAL))
+
+    def run(self):
+        """Polls until `stop()` is called. Fetch and sink errors are printed and retried; they never stop the loop."""
+        schedule = [(time.monotonic(), source) for source in self.sources]
+        heapq.heapify(schedule)
+
+        while schedule and not self._stopped.is_set():
+            due, source = heapq.heappop(schedule)
+            if self._stopped.wait(max(0.0, due - time.monotonic())):
+                break
+
+            delay = self.step(source)
+            heapq.heappush(schedule, (time.monotonic() + delay, source))
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+# 로컬 journal 파일을 두는 디렉터리
+CHECKPOINT_DIR = os.getenv(
+    "CHECKPOINT_DIR",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "checkpoints"),
+)
+# "s3" 이면 재시도가 다른 worker 에서 실행되어도 이어서 할 수 있도록 journal 을 S3 에도 올린다
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "local")
+CHECKPOINT_S3_BUCKET = os.getenv("CHECKPOINT_S3_BUCKET", "de5-s4tify")
+CHECKPOINT_S3_PREFIX = os.getenv("CHECKPOINT_S3_PREFIX", "checkpoints")
+CHECKPOINT_S3_CONN_ID = os.getenv("CHECKPOINT_S3_CONN_ID", "S4tify_S3")
+# S3 journal 은 이만큼 기록이 쌓이거나 시간이 지나면 업로드한다
+DEFAULT_SYNC_EVERY = 50
+DEFAULT_SYNC_INTERVAL = 10.0
+
+# journal 에 없는 key 를 조회했을 때 반환하는 값
+MISS = object()
+
+
+def _key(section, key):
+    # tuple key 는 JSON 에서 list 가 되므로 파일에서 읽은 key 와 같은 문자열이 되도록 맞춘다
+    if isinstance(key, tuple):
+        key = list(key)
+    return json.dumps([section, key], ensure_ascii=False)
+
+
+class CheckpointJournal:
+    """An append-only JSON-lines journal of the keys an enrichment stage has finished.
+    Each completed key is written as soon as its result is known, so when Airflow retries a task
+    that failed half-way, `run()` only calls `func` for the keys that are not in the journal yet.
+    Used as a context manager, the journal is removed when the block succeeds and kept when it raises.
+    Attributes:
+        name: The journal name, e.g. "melon_chart/202610170100". Retries must use the same name.
+        path: The local journal file, `{directory}/{name}.jsonl`.
+        stats: `{"resumed", "recorded"}` counters: keys served from the journal and keys written to it.
+    """
+
+    def __init__(self, name: str, directory: str = CHECKPOINT_DIR):
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self.stats = {"resumed": 0, "recorded": 0}
+        self._lock = threading.Lock()
+        self._entries = None
+        self._file = None
+
+    def __enter__(self):
+        self._load()
+        return self
+
+    def __exit__(self, excType, *exc):
+        if excType is None:
+            self.complete()
+        else:
+            self.close()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not MISS
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def get(self, key, section: str = ""):
+        """Returns the recorded result of `key`, or `MISS`."""
+        return self._load().get(_key(section, key), MISS)
+
+    def getMany(self, keys: Iterable, section: str = "") -> Dict:
+        """Returns `{key: result}` for the keys that are already recorded."""
+        entries = self._load()
+        found = {}
+        for key in keys:
+            value = entries.get(_key(section, key), MISS)
+            if value is not MISS:
+                found[key] = value
+        self.stats["resumed"] += len(found)
+        return found
+
+    def put(self, key, value, section: str = ""):
+        self.putMany({key: value}, section)
+
+    def putMany(self, results: Dict, section: str = ""):
+        """Records every `{key: result}` pair; the file is flushed before returning."""
+        if not results:
+            return
+        entries = self._load()
+        with self._lock:
+            lines = []
+            for key, value in results.items():
+                entries[_key(section, key)] = value
+                lines.append(json.dumps([section, key, value], ensure_ascii=False) + "\n")
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.writelines(lines)
+            self._file.flush()
+            self.stats["recorded"] += len(results)
+        self._recorded(len(results))
+
+    def run(self, func: Callable, items: Iterable, mapper: Callable = None, section: str = "") -> List:
+        """Returns `[func(item) for item in items]`, calling `func` only for items not in the journal.
+        Args:
+            mapper: Runs `func` over the pending items, e.g. `enrich` for concurrent calls. (default: `map`)
+            section: Separates the keys of different stages sharing one journal.
+        Returns:
+            The results in the order of `items`. `None` results are returned but not recorded,
+            so the item is tried again on the next attempt.
+        """
+        items = list(items)
+        done = self.getMany(dict.fromkeys(items), section)
+        pending = [item for item in dict.fromkeys(items) if item not in done]
+
+        def call(item):
+            value = func(item)
+            if value is not None:
+                self.put(item, value, section)
+            return value
+
+        done.update(zip(pending, (mapper or map)(call, pending)))
+        return [done[item] for item in items]
+
+    def summary(self) -> str:
+        return f"{self.name}: resumed={self.stats['resumed']} recorded={self.stats['recorded']}"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def complete(self):
+        """Removes the journal once the stage has finished, so the next run starts from scratch."""
+        self.close()
+        print(f"✅ checkpoint 완료: {self.summary()}")
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _recorded(self, count):
+        pass
+
+    def _load(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._read()
+                    if self._entries:
+                        print(f"♻️ checkpoint 에서 이어서 진행: {self.name} ({len(self._entries)}건 완료)")
+        return self._entries
+
+    def _read(self):
+        entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        section, key, value = json.loads(line)
+                    except ValueError:
+                        # 기록 도중 프로세스가 죽어 잘린 마지막 줄은 버린다
+                        continue
+                    entries[_key(section, key)] = value
+        except FileNotFoundError:
+            pass
+        return entries
+
+
+class S3CheckpointJournal(CheckpointJournal):
+    """A `CheckpointJournal` mirrored to S3, so a retry scheduled on another worker resumes as well.
+    Records are appended locally and the whole file is uploaded every `syncEvery` records or
+    `syncInterval` seconds, and when the journal is closed.
+    Attributes:
+        bucket: The S3 bucket. (default: `CHECKPOINT_S3_BUCKET`)
+        key: The object key, `{CHECKPOINT_S3_PREFIX}/{name}.jsonl`.
+        awsConnId: The Airflow connection used by `S3Hook`. (default: `CHECKPOINT_S3_CONN_ID`)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str = CHECKPOINT_DIR,
+        bucket: str = CHECKPOINT_S3_BUCKET,
+        awsConnId: str = CHECKPOINT_S3_CONN_ID,
+        syncEvery: int = DEFAULT_SYNC_EVERY,
+        syncInterval: float = DEFAULT_SYNC_INTERVAL,
+    ):
+        super().__init__(name, directory)
+        self.bucket = bucket
+        self.key = f"{CHECKPOINT_S3_PREFIX}/{name}.jsonl"
+        self.awsConnId = awsConnId
+        self.syncEvery = syncEvery
+        self.syncInterval = syncInterval
+        self._unsynced = 0
+        self._syncedAt = time.monotonic()
+        self._syncLock = threading.Lock()
+        self._hook = None
+
+    def sync(self):
+        """Uploads the local journal to S3."""
+        with self._syncLock:
+            with self._lock:
+                self._unsynced = 0
+                self._syncedAt = time.monotonic()
+                if not os.path.exists(self.path):
+                    return
+                with open(self.path, encoding="utf-8") as f:
+                    data = f.read()
+            try:
+                self._s3().load_string(data, key=self.key, bucket_name=self.bucket, replace=True)
+            except Exception as e:
+                # 업로드 실패는 로컬 journal 로 계속 진행하고 다음 sync 에서 다시 시도한다
+                print(f"⚠️ checkpoint S3 업로드 실패: {self.key}, {e!r}")
+
+    def close(self):
+        super().close()
+        if self._unsynced:
+            self.sync()
+
+    def complete(self):
+        # 곧 지울 journal 이므로 close() 에서 다시 올리지 않는다
+        self._unsynced = 0
+        super().complete()
+        try:
+            self._s3().delete_objects(bucket=self.bucket, keys=[self.key])
+        except Exception as e:
+            print(f"⚠️ checkpoint S3 삭제 실패: {self.key}, {e!r}")
+
+    def _recorded(self, count):
+        with self._lock:
+            self._unsynced += count
+            due = (
+                self._unsynced >= self.syncEvery
+                or time.monotonic() - self._syncedAt >= self.syncInterval
+            )
+        if due:
+            self.sync()
+
+    def _read(self):
+        # 로컬에 없으면 (다른 worker 에서 실패한 경우) S3 의 journal 을 받아온다
+        if not os.path.exists(self.path):
+            try:
+                hook = self._s3()
+                if hook.check_for_key(self.key, bucket_name=self.bucket):
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self.path, "w", encoding="utf-8") as f:
+                        f.write(hook.read_key(self.key, bucket_name=self.bucket))
+            except Exception as e:
+                print(f"⚠️ checkpoint S3 다운로드 실패: {self.key}, {e!r}")
+        return super()._read()
+
+    def _s3(self):
+        if self._hook is None:
+            from airflow.providers.amazon.aws.hooks.s3 import S3Hook
+
+            self._hook = S3Hook(aws_conn_id=self.awsConnId)
+        return self._hook
+
+
+def open_journal(name: str) -> CheckpointJournal:
+    """Returns the journal for `name` on the backend selected by `CHECKPOINT_BACKEND` ("local" or "s3")."""
+    if CHECKPOINT_BACKEND == "s3":
+        return S3CheckpointJournal(name)
+    return CheckpointJournal(name)
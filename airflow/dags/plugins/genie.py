@@ -1,14 +1,26 @@
-import json
-import sys
 from datetime import datetime
+from typing import NamedTuple
 from urllib.parse import unquote
 
 import requests
+from plugins.chart_base import BaseChartData, ChartColumns, ChartEntry
+from plugins.chart_http import get_shared_session
+
+# ChartEntry 는 chart_base 로 옮겨졌지만 `from plugins.genie import ChartEntry` 를 위해 다시 내보낸다
+__all__ = [
+    "ChartData",
+    "ChartEntry",
+    "GenieChartParseException",
+    "GenieChartPeriod",
+    "GenieChartRequestException",
+    "GenieChartSpec",
+]
 
 _CONTENT_TYPE = "application/x-www-form-urlencoded"
 _REALTIME_CHART_API_URL = "https://app.genie.co.kr/chart/j_RealTimeRankSongList.json"
 _ALLTIME_CHART_API_URL = "https://app.genie.co.kr/chart/j_RankSongListAlltime.json"
 _CHART_API_URL = "https://app.genie.co.kr/chart/j_RankSongList.json"
+_DEFAULT_PAGE_SIZE = 200
 
 
 class GenieChartPeriod:
@@ -19,6 +31,14 @@ class GenieChartPeriod:
     Monthly = "M"
 
 
+class GenieChartSpec(NamedTuple):
+    """Identifies one page of a Genie chart for batch fetching. (see `chart_fetcher.fetch_genie_batch()`)"""
+
+    chartPeriod: str = GenieChartPeriod.Realtime
+    page: int = 1
+    pageSize: int = _DEFAULT_PAGE_SIZE
+
+
 class GenieChartRequestException(Exception):
     pass
 
@@ -27,94 +47,52 @@ class GenieChartParseException(Exception):
     pass
 
 
-class ChartEntry:
-    """Represents an entry on a chart.
-    Attributes:
-        title: The title of the track
-        artist: The name of the artist.
-        image: The URL of the cover image for the track
-        peakPos: The track's peak position on the chart.
-        lastPos: The track's last position on the previous period.
-        rank: The track's current rank position on the chart.
-    """
-
-    def __init__(
-            self,
-            title: str,
-            artist: str,
-            image: str,
-            peakPos: int,
-            lastPos: int,
-            rank: int):
-        self.title = title
-        self.artist = artist
-        self.image = image
-        self.peakPos = peakPos
-        self.lastPos = lastPos
-        self.rank = rank
-
-    def __repr__(self):
-        return "{}.{}(title={!r}, artist={!r})".format(
-            self.__class__.__module__, self.__class__.__name__, self.title, self.artist)
-
-    def __str__(self):
-        """Returns a string of the form 'TITLE by ARTIST'."""
-        if self.title:
-            s = "'%s' by %s" % (self.title, self.artist)
-        else:
-            s = "%s" % self.artist
-
-        if sys.version_info.major < 3:
-            return s.encode(getattr(sys.stdout, "encoding", "") or "utf8")
-        else:
-            return s
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
-
-
-class ChartData:
+class ChartData(BaseChartData):
     """Represents a particular Bugs chart by a particular period.
     Attributes:
         date: The chart date.
         chartType: The chart type.
         chartPeriod: The period for the chart. (default: GenieChartPeriod.Realtime)
+        page: The page of the chart to retrieve, starting from 1. (default: 1)
+        pageSize: The number of entries per page. (default: 200)
         fetch: A boolean value that indicates whether to retrieve the chart data immediately. If set to `False`, you can fetch the data later using the `fetchEntries()` method.
+        session: The `requests.Session` used for HTTP calls, so connections can be pooled and reused. (default: `chart_http.get_shared_session()`)
     """
 
+    provider = "genie"
+    ENTRY_FIELDS = ("rank", "title", "artist", "lastPos", "peakPos", "image")
+    _ITEMS_PATH = ("DataSet", "DATA")
+    _META_PATHS = (
+        ("Result", "RetCode"),
+        ("Result", "RetMsg"),
+        ("PageInfo", "ChartTime"),
+    )
+    _OPTIONAL_META_PATHS = (("Result", "RetMsg"),)
+    _requestException = GenieChartRequestException
+    _parseException = GenieChartParseException
+
     def __init__(
         self,
         chartPeriod: GenieChartPeriod = GenieChartPeriod.Realtime,
         fetch: bool = True,
+        session: requests.Session = None,
+        page: int = 1,
+        pageSize: int = _DEFAULT_PAGE_SIZE,
     ):
         self.chartPeriod = chartPeriod
-        self.entries = []
+        self.page = page
+        self.pageSize = pageSize
+        self.columns = ChartColumns()
+        self._session = session or get_shared_session()
 
         if fetch:
             self.fetchEntries()
 
-    def __getitem__(self, key):
-        return self.entries[key]
-
-    def __len__(self):
-        return len(self.entries)
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
+    @property
+    def cacheKey(self):
+        return super().cacheKey + (self.page, self.pageSize)
 
-    def fetchEntries(self):
+    def _request(self, headers, stream=False):
         """headers = {
             "Content-Type": _CONTENT_TYPE
         }"""
@@ -131,6 +109,7 @@ class ChartData:
         headers = {
             "Content-Type": _CONTENT_TYPE,
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36",
+            **headers,
         }
 
         if (
@@ -139,7 +118,9 @@ class ChartData:
         ):
             data = {"ditc": self.chartPeriod}
         else:
-            data = {"pgSize": "200"}
+            data = {}
+        data["pg"] = str(self.page)
+        data["pgSize"] = str(self.pageSize)
 
         if self.chartPeriod == GenieChartPeriod.Realtime:
             url = _REALTIME_CHART_API_URL
@@ -148,25 +129,7 @@ class ChartData:
         else:
             url = _CHART_API_URL
 
-        res = requests.post(url, headers=headers, data=data)
-
-        # 응답 상태 코드와 응답 내용 확인
-        # print(f"Response Status Code: {res.status_code}")
-        # print(f"Response Content: {res.text[:500]}")  # 처음 500자만 출력 (내용이 길면
-        # 일부만 보기)
-
-        if res.status_code != 200:
-            message = f"Request is invalid. response status code={res.status_code}"
-            raise GenieChartParseException(message)
-
-        data = res.json()
-        if int(data["Result"]["RetCode"]) > 0:
-            message = (
-                f"Request is invalid. response message=${data['Result']['RetMsg']}"
-            )
-            raise GenieChartParseException(message)
-
-        self._parseEntries(data)
+        return self._session.post(url, headers=headers, data=data, stream=stream)
 
     """def fetchEntries(self):
         headers = {
@@ -192,22 +155,24 @@ class ChartData:
         return data
 """
 
-    def _parseEntries(self, data):
-        try:
-            self.date = self._parseDate(data["PageInfo"].get("ChartTime"))
-            for item in data["DataSet"]["DATA"]:
-                entry = ChartEntry(
-                    title=unquote(item["SONG_NAME"]),
-                    artist=unquote(item["ARTIST_NAME"]),
-                    image=unquote(item["ALBUM_IMG_PATH"]),
-                    peakPos=int(item.get("TOP_RANK_NO") or 0),
-                    lastPos=int(item["PRE_RANK_NO"]),
-                    rank=int(item["RANK_NO"]),
-                )
-                self.entries.append(entry)
-            pass
-        except Exception as e:
-            raise GenieChartParseException(e)
+    def _parseMeta(self, meta):
+        if int(meta[("Result", "RetCode")]) > 0:
+            message = (
+                f"Request is invalid. response message=${meta.get(('Result', 'RetMsg'))}"
+            )
+            raise GenieChartParseException(message)
+
+        self.date = self._parseDate(meta.get(("PageInfo", "ChartTime")))
+
+    def _parseItem(self, item, index):
+        self.columns.append(
+            title=unquote(item["SONG_NAME"]),
+            artist=unquote(item["ARTIST_NAME"]),
+            image=unquote(item["ALBUM_IMG_PATH"]),
+            peakPos=int(item.get("TOP_RANK_NO") or 0),
+            lastPos=int(item["PRE_RANK_NO"]),
+            rank=int(item["RANK_NO"]),
+        )
 
     def _parseDate(self, time):
         now = datetime.now()
@@ -1,28 +1,41 @@
-import requests
-from scripts.get_access_token import get_token
+from typing import Dict
 
-from airflow.models import Variable
+from plugins.artist_cache import MISS, artist_search_name, get_artist_cache
+from plugins.rate_limit import get_rate_limiter
+from plugins.spotify_client import (MAX_ARTIST_BATCH, ArtistBatchResolver,
+                                    SpotifyRequestException, enrich,
+                                    get_artist_resolver, get_spotify_client)
 
-# Spotify API 설정
+# Spotify API 설정 (토큰은 get_spotify_client() 가 메모리에서 관리)
 SPOTIFY_API_URL = "https://api.spotify.com/v1"
-SPOTIFY_TOKEN = Variable.get("SPOTIFY_ACCESS_TOKEN", default_var=None)
 
 
 # Spotify API에서 아티스트 ID 검색
 def search_artist_id(artist_name):
-    SPOTIFY_TOKEN = Variable.get("SPOTIFY_ACCESS_TOKEN", default_var=None)
+    # 최근에 조회한 아티스트는 캐시에서 바로 반환 (찾지 못한 결과도 캐시됨)
+    cache = get_artist_cache()
+    artist_id = cache.getArtistId(artist_name)
+    if artist_id is not MISS:
+        return artist_id
 
-    url = f"{SPOTIFY_API_URL}/search"
-    headers = {"Authorization": f"Bearer {SPOTIFY_TOKEN}"}
-    params = {"q": artist_name, "type": "artist", "limit": 1}
-    response = requests.get(url, headers=headers, params=params)
+    # 다른 차트에서 다르게 표기된 같은 아티스트("IVE (아이브)" / "IVE")는 별칭 인덱스로 바로 찾는다
+    artist_id = cache.getAliasId(artist_name)
+    if artist_id is not MISS:
+        print(f"🔗 별칭으로 찾은 아티스트: {artist_name} -> ID: {artist_id}")
+        cache.putArtistId(artist_name, artist_id)
+        return artist_id
 
-    print("headers : ", headers)
+    # 요청 속도 제한과 429 Retry-After 처리는 공유 client 가 담당
+    params = {"q": artist_search_name(artist_name), "type": "artist", "limit": 1}
+    response = get_spotify_client().get("/search", params=params)
 
     if response.status_code == 200:
         artists = response.json().get("artists", {}).get("items", [])
         artist_id = artists[0]["id"] if artists else None
         print(f"🔍 검색된 아티스트: {artist_name} -> ID: {artist_id}")
+        cache.putArtistId(artist_name, artist_id)
+        if artist_id:
+            cache.putAliases([artist_name, artists[0].get("name", "")], artist_id)
         return artist_id
     else:
         print(
@@ -31,24 +44,91 @@ def search_artist_id(artist_name):
     return None
 
 
+# 여러 아티스트의 ID 를 동시에 검색 (입력 순서대로 반환)
+# journal 을 주면 찾은 ID 를 바로 기록하고, 재시도 때는 기록된 아티스트를 건너뛴다
+def search_artist_ids(artist_names, journal=None):
+    if journal is None:
+        artist_ids = enrich(search_artist_id, artist_names)
+    else:
+        artist_ids = journal.run(search_artist_id, artist_names, enrich, section="artist_id")
+    print(f"🚦 Spotify 요청 사용률: {get_rate_limiter('spotify').utilization()}")
+    return artist_ids
+
+
 # Spotify API에서 아티스트 장르 가져오기
 def get_artist_genre(artist_id):
     if not artist_id:
         return "Unknown"
 
-    SPOTIFY_TOKEN = Variable.get("SPOTIFY_ACCESS_TOKEN", default_var=None)
+    return get_artist_genres([artist_id]).get(artist_id, "Unknown")
 
-    url = f"{SPOTIFY_API_URL}/artists/{artist_id}"
-    headers = {"Authorization": f"Bearer {SPOTIFY_TOKEN}"}
-    response = requests.get(url, headers=headers)
 
-    if response.status_code == 200:
-        genres = response.json().get("genres", [])
-        genre_str = ", ".join(genres) if genres else "Unknown"
-        print(f"🎵 장르 검색: ID {artist_id} -> {genre_str}")
-        return genre_str
-    else:
-        print(
-            f"❌ 장르 검색 실패: ID {artist_id}, 상태 코드: {response.status_code}, 응답: {response.json()}"
-        )
-    return "Unknown"
+# 여러 아티스트의 장르를 /v1/artists?ids= 로 최대 50명씩 묶어서 가져오기
+def get_artist_genres(artist_ids, journal=None):
+    cache = get_artist_cache()
+    artist_ids = list(dict.fromkeys(filter(None, artist_ids)))
+    genre_map = journal.getMany(artist_ids, section="genre") if journal else {}
+    missing = []
+    for artist_id in artist_ids:
+        if artist_id in genre_map:
+            continue
+        genres = cache.getGenres(artist_id)
+        if genres is MISS:
+            missing.append(artist_id)
+        else:
+            genre_map[artist_id] = ", ".join(genres) if genres else "Unknown"
+
+    if not missing:
+        return genre_map
+
+    # 공유 resolver 를 쓰므로 여러 thread 에서 동시에 부른 한 명짜리 조회도 같은 배치로 묶인다
+    resolver = get_artist_resolver()
+    # 한 배치가 끝날 때마다 결과를 기록해서, 중간에 실패해도 끝난 배치는 다시 요청하지 않는다
+    for start in range(0, len(missing), MAX_ARTIST_BATCH):
+        batch = missing[start:start + MAX_ARTIST_BATCH]
+        try:
+            artists = resolver.resolve(batch)
+        except SpotifyRequestException as e:
+            print(f"❌ 장르 검색 실패: {len(missing) - start}명, {e}")
+            break
+
+        batch_genres = {}
+        for artist_id, artist in artists.items():
+            # Spotify 가 null 을 준 ID 는 존재하지 않으므로 다시 조회하지 않도록 기억해 둔다
+            genres = artist.get("genres", []) if artist else None
+            cache.putGenres(artist_id, genres)
+            genre_str = ", ".join(genres) if genres else "Unknown"
+            print(f"🎵 장르 검색: ID {artist_id} -> {genre_str}")
+            batch_genres[artist_id] = genre_str
+        if journal:
+            journal.putMany(batch_genres, section="genre")
+        genre_map.update(batch_genres)
+    return genre_map
+
+
+# 아티스트 이름과 장르를 /v1/artists?ids= 로 50명씩 조회 ({아티스트 ID: {"name", "genres"}})
+def fetch_artist_info(artist_ids, journal) -> Dict[str, dict]:
+
+    artist_ids = list(dict.fromkeys(artist_ids))
+    artists = journal.getMany(artist_ids)
+    missing = [id for id in artist_ids if id not in artists]
+
+    with ArtistBatchResolver() as resolver:
+        # 배치가 끝날 때마다 기록해서 재시도 시 남은 아티스트만 요청한다
+        for start in range(0, len(missing), MAX_ARTIST_BATCH):
+            try:
+                batch = resolver.resolve(missing[start:start + MAX_ARTIST_BATCH])
+            except SpotifyRequestException as e:
+                # 조회하지 못한 아티스트는 결과에서 빠지고, 호출하는 쪽에서 건너뛴다
+                print(f"❌ 아티스트 조회 실패: {len(missing) - start}명, {e}")
+                break
+            found = {
+                id: {"name": artist["name"], "genres": artist["genres"]}
+                for id, artist in batch.items()
+                if artist
+            }
+            journal.putMany(found)
+            artists.update(found)
+    print(f"🎵 아티스트 {len(artists)}명 조회 (journal {len(artist_ids) - len(missing)}명), 요청 {resolver.requests}회")
+
+    return artists
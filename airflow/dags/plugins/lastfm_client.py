@@ -0,0 +1,192 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from plugins.artist_cache import MISS
+from plugins.chart_http import ChartSession
+from plugins.rate_limit import get_rate_limiter, parse_retry_after
+from plugins.track_tag_cache import get_track_tag_cache, track_key
+
+LASTFM_API_URL = "https://ws.audioscrobbler.com/2.0/"
+# 동시에 보내는 최대 요청 수. 실제 속도는 "lastfm" limiter 가 제한한다
+DEFAULT_CONCURRENCY = 4
+# rate limit 응답을 받았을 때 다시 시도하는 최대 횟수
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 3
+
+# https://www.last.fm/api/errorcodes
+_NOT_FOUND = 6
+_RATE_LIMITED = 29
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+class LastfmRequestException(Exception):
+    pass
+
+
+class LastfmClient:
+    """A rate-limited Last.fm client that looks up track tags through a persistent cache.
+    Attributes:
+        apiKey: The Last.fm API key. (default: `LAST_FM_API_KEY` env var)
+        session: The `requests.Session` used for HTTP calls. (default: a pooled `ChartSession` that leaves 429 to the client)
+        limiter: The `TokenBucket`/`SharedTokenBucket` every request waits on. (default: the worker-wide "lastfm" bucket)
+        cache: The `TrackTagCache` consulted before any request. (default: `get_track_tag_cache()`)
+        maxConcurrency: The maximum number of requests in flight. (default: 4)
+        maxRateLimitRetries: How many rate limit responses a single request may get before giving up. (default: 3)
+        requests: The number of `track.getInfo` requests sent so far.
+    """
+
+    def __init__(
+        self,
+        apiKey: str = None,
+        session: requests.Session = None,
+        limiter=None,
+        cache=None,
+        maxConcurrency: int = DEFAULT_CONCURRENCY,
+        maxRateLimitRetries: int = DEFAULT_MAX_RATE_LIMIT_RETRIES,
+    ):
+        self.apiKey = apiKey or os.getenv("LAST_FM_API_KEY")
+        self.session = session or ChartSession(
+            poolSize=maxConcurrency * 2, retryStatusCodes=(500, 502, 503, 504)
+        )
+        self.limiter = limiter or get_rate_limiter("lastfm")
+        self.cache = cache or get_track_tag_cache()
+        self.maxConcurrency = maxConcurrency
+        self.maxRateLimitRetries = maxRateLimitRetries
+        self.requests = 0
+        self._requestsLock = threading.Lock()
+
+    def trackTags(self, artist: str, track: str) -> Optional[List[str]]:
+        """Requests `track.getInfo` and returns the tag names, or `None` if Last.fm does not know the track.
+        Raises:
+            LastfmRequestException: The request failed for any other reason.
+        """
+        # params 로 넘겨야 "&", "#", 공백 등이 들어간 곡명도 올바르게 인코딩된다
+        params = {
+            "method": "track.getInfo",
+            "api_key": self.apiKey,
+            "artist": artist,
+            "track": track,
+            "autocorrect": 1,
+            "format": "json",
+        }
+
+        rateLimited = 0
+        while True:
+            self.limiter.acquire()
+            # executor 의 여러 thread 에서 호출되므로 lock 안에서 센다
+            with self._requestsLock:
+                self.requests += 1
+            try:
+                response = self.session.get(LASTFM_API_URL, params=params)
+                # 프록시나 CDN 이 보낸 429 는 본문이 JSON 이 아닐 수 있으므로 먼저 확인한다
+                data = {} if response.status_code == 429 else response.json()
+            except (requests.RequestException, ValueError) as e:
+                raise LastfmRequestException(f"track.getInfo failed: {artist} - {track}, {e!r}")
+
+            error = data.get("error")
+            if (response.status_code == 429 or error == _RATE_LIMITED) and rateLimited < self.maxRateLimitRetries:
+                rateLimited += 1
+                wait = parse_retry_after(response.headers.get("Retry-After"))
+                print(f"⏳ Last.fm rate limit, {wait:.1f}초 후 재시도: {artist} - {track}")
+                self.limiter.pause(wait)
+                continue
+
+            if error == _NOT_FOUND:
+                return None
+            if error is not None or response.status_code != 200:
+                raise LastfmRequestException(
+                    f"Request is invalid. response status code={response.status_code}, response={data}"
+                )
+
+            tags = data.get("track", {}).get("toptags", {}).get("tag", [])
+            # 태그가 하나뿐이면 배열이 아니라 객체로 온다
+            if isinstance(tags, dict):
+                tags = [tags]
+            return [tag["name"] for tag in tags]
+
+    async def fetchTrackTags(
+        self, keys: Iterable[Tuple[str, str]], journal=None
+    ) -> Dict[Tuple[str, str], List[str]]:
+        """Returns `{(artist, track): tags}` for every key, from the cache or up to `maxConcurrency` requests at a time.
+        Keys that normalize to the same track are requested once. Unknown tracks get `[]`;
+        keys whose request failed are left out of the result, and the error is printed.
+        Args:
+            journal: A `CheckpointJournal` each finished track is recorded to, so a retry resumes after it.
+        """
+        keys = list(dict.fromkeys(keys))
+        result = {}
+        # 정규화한 키 -> 해당 원본 키 목록
+        misses: Dict[tuple, list] = {}
+        for artist, track in keys:
+            if not isinstance(artist, str) or not isinstance(track, str):
+                result[(artist, track)] = []
+                continue
+            normalized = track_key(artist, track)
+            if normalized in misses:
+                misses[normalized].append((artist, track))
+                continue
+            tags = self.cache.getTags(artist, track)
+            if tags is MISS:
+                misses[normalized] = [(artist, track)]
+            else:
+                result[(artist, track)] = tags or []
+
+        if journal and misses:
+            for normalized, tags in journal.getMany(list(misses)).items():
+                for key in misses.pop(normalized):
+                    result[key] = tags or []
+
+        if not misses:
+            return result
+
+        def request(key):
+            tags = self.trackTags(*key)
+            # 끝난 곡은 바로 저장해서 중간에 실패해도 다음 시도에서 건너뛴다
+            self.cache.putTags(*key, tags)
+            if journal:
+                journal.put(track_key(*key), tags)
+            return tags
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.maxConcurrency)
+
+        async def fetch(key):
+            async with semaphore:
+                return await loop.run_in_executor(executor, request, key)
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.maxConcurrency, len(misses)), thread_name_prefix="lastfm"
+        ) as executor:
+            groups = list(misses.values())
+            responses = await asyncio.gather(
+                *(fetch(group[0]) for group in groups), return_exceptions=True
+            )
+
+        for group, tags in zip(groups, responses):
+            if isinstance(tags, Exception):
+                print(f"❌ Last.fm 태그 조회 실패: {group[0]}, {tags!r}")
+                continue
+            for key in group:
+                result[key] = tags or []
+        return result
+
+
+def get_lastfm_client() -> LastfmClient:
+    """Returns the process-wide `LastfmClient`, so every task in the process shares one session and cache."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = LastfmClient()
+        return _shared_client
+
+
+def get_track_tags(
+    keys: Iterable[Tuple[str, str]], client: LastfmClient = None, journal=None
+) -> Dict[Tuple[str, str], List[str]]:
+    """Synchronous `LastfmClient.fetchTrackTags()` for PythonOperator callables."""
+    return asyncio.run((client or get_lastfm_client()).fetchTrackTags(keys, journal))
@@ -1,9 +1,17 @@
-import json
 import re
-import sys
 from datetime import datetime
 
 import requests
+from plugins.chart_base import BaseChartData, ChartColumns, ChartEntry
+from plugins.chart_http import get_shared_session
+
+# ChartEntry 는 chart_base 로 옮겨졌지만 `from plugins.melon import ChartEntry` 를 위해 다시 내보낸다
+__all__ = [
+    "ChartData",
+    "ChartEntry",
+    "MelonChartParseException",
+    "MelonChartRequestException",
+]
 
 _APP_VERSION = "6.5.8.1"
 _CP_ID = "AS40"
@@ -19,129 +27,60 @@ class MelonChartParseException(Exception):
     pass
 
 
-class ChartEntry:
-    """Represents an entry on a chart.
-    Attributes:
-        title: The title of the track
-        artist: The name of the artist.
-        image: The URL of the cover image for the track
-        lastPos: The track's last position on the previous period.
-        rank: The track's current rank position on the chart.
-        isNew: Whether the track is new to the chart.
-    """
-
-    def __init__(
-            self,
-            title: str,
-            artist: str,
-            image: str,
-            lastPos: int,
-            rank: int,
-            isNew: bool):
-        self.title = title
-        self.artist = artist
-        self.image = image
-        self.lastPos = lastPos
-        self.rank = rank
-        self.isNew = isNew
-
-    def __repr__(self):
-        return "{}.{}(title={!r}, artist={!r})".format(
-            self.__class__.__module__, self.__class__.__name__, self.title, self.artist)
-
-    def __str__(self):
-        """Returns a string of the form 'TITLE by ARTIST'."""
-        if self.title:
-            s = "'%s' by %s" % (self.title, self.artist)
-        else:
-            s = "%s" % self.artist
-
-        if sys.version_info.major < 3:
-            return s.encode(getattr(sys.stdout, "encoding", "") or "utf8")
-        else:
-            return s
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
-
-
-class ChartData:
+class ChartData(BaseChartData):
     """Represents a particular Bugs chart by a particular period.
     Attributes:
         name: The chart name
         date: The chart date
         imageSize: The size of cover image for the track. (default: 256)
         fetch: A boolean value that indicates whether to retrieve the chart data immediately. If set to `False`, you can fetch the data later using the `fetchEntries()` method.
+        session: The `requests.Session` used for HTTP calls, so connections can be pooled and reused. (default: `chart_http.get_shared_session()`)
     """
 
-    def __init__(self, imageSize: int = 256, fetch: bool = True):
+    provider = "melon"
+    ENTRY_FIELDS = ("rank", "title", "artist", "lastPos", "isNew", "image")
+    _ITEMS_PATH = ("response", "SONGLIST")
+    _META_PATHS = (
+        ("response", "PAGE"),
+        ("response", "RANKDAY"),
+        ("response", "RANKHOUR"),
+    )
+    _requestException = MelonChartRequestException
+    _parseException = MelonChartParseException
+
+    def __init__(
+        self,
+        imageSize: int = 256,
+        fetch: bool = True,
+        session: requests.Session = None,
+    ):
         self.imageSize = imageSize
-        self.entries = []
+        self.columns = ChartColumns()
+        self._session = session or get_shared_session()
 
         if fetch:
             self.fetchEntries()
 
-    def __getitem__(self, key):
-        return self.entries[key]
-
-    def __len__(self):
-        return len(self.entries)
-
-    def json(self):
-        # return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True,
-        # indent=4, ensure_ascii=False)
-        """
-        에러의 원인은 datetime.datetime 객체를 JSON 직렬화하려고 할 때 발생합니다.
-        json.dumps()는 기본적으로 datetime 객체를 변환할 수 없으므로, 이를 문자열로 변환해야 합니다.
-
-        해결 방법
-        ChartData 클래스의 json() 메서드에서 datetime을 처리하는 방법을 수정하면 됩니다.
-        아래처럼 default 파라미터에 lambda를 사용하여 datetime을 문자열로 변환하세요.
-        """
-        return json.dumps(
-            self,
-            default=lambda o: o.isoformat() if isinstance(o, datetime) else o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
+    def _request(self, headers, stream=False):
+        headers = {"User-Agent": _USER_AGENT, **headers}
+
+        return self._session.get(_CHART_API_URL, headers=headers, stream=stream)
+
+    def _parseMeta(self, meta):
+        self.name = meta[("response", "PAGE")]
+        self.date = self._parseDate(
+            f"{meta[('response', 'RANKDAY')]} {meta[('response', 'RANKHOUR')]}"
         )
 
-    def fetchEntries(self):
-        headers = {"User-Agent": _USER_AGENT}
-
-        res = requests.get(_CHART_API_URL, headers=headers)
-
-        if res.status_code != 200:
-            message = f"Request is invalid. response status code={res.status_code}"
-            raise MelonChartRequestException(message)
-
-        data = res.json()
-        self._parseEntries(data)
-
-    def _parseEntries(self, data):
-        try:
-            self.name = data["response"]["PAGE"]
-            self.date = self._parseDate(
-                f"{data['response']['RANKDAY']} {data['response']['RANKHOUR']}"
-            )
-            for item in data["response"]["SONGLIST"]:
-                entry = ChartEntry(
-                    title=item["SONGNAME"],
-                    artist=item["ARTISTLIST"][0]["ARTISTNAME"],
-                    image=self._getResizedImage(item["ALBUMIMG"]),
-                    rank=int(item["CURRANK"]),
-                    lastPos=int(item["PASTRANK"]),
-                    isNew=item["RANKTYPE"] == "NEW",
-                )
-                self.entries.append(entry)
-        except Exception as e:
-            raise MelonChartParseException(e)
+    def _parseItem(self, item, index):
+        self.columns.append(
+            title=item["SONGNAME"],
+            artist=item["ARTISTLIST"][0]["ARTISTNAME"],
+            image=self._getResizedImage(item["ALBUMIMG"]),
+            rank=int(item["CURRANK"]),
+            lastPos=int(item["PASTRANK"]),
+            isNew=item["RANKTYPE"] == "NEW",
+        )
 
     def _parseDate(self, formatted):
         date_format = "%Y.%m.%d %H:%M"
@@ -0,0 +1,12 @@
+from airflow.datasets import Dataset
+
+# DAG 사이의 실행 순서는 시간 간격 대신 아래 Dataset 갱신으로 연결한다
+# (생산 태스크의 outlets 에 넣고, 소비 DAG 의 schedule 에 넣는다)
+
+# chart_ingest_dag 가 올린 provider 별 차트 Parquet (raw_data/{provider}_chart_data/)
+RAW_CHARTS_DATASET = Dataset("s3://de5-s4tify/raw_data/chart_data")
+
+# Snowflake 테이블
+MUSIC_CHARTS_DATASET = Dataset("snowflake://S4TIFY/RAW_DATA/MUSIC_CHARTS")
+ARTIST_DIM_DATASET = Dataset("snowflake://S4TIFY/RAW_DATA/ARTIST_DIM")
+EVENTSIM_LOG_DATASET = Dataset("snowflake://S4TIFY/RAW_DATA/EVENTSIM_LOG")
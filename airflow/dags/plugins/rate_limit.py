@@ -0,0 +1,229 @@
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Spotify Web API 는 30초 rolling window 기준으로 제한하므로 평균 속도를 보수적으로 잡는다
+SPOTIFY_RATE = 10.0
+SPOTIFY_BURST = 20
+# Last.fm 은 5분 평균 초당 5회를 넘지 않도록 요구한다
+LASTFM_RATE = 4.0
+LASTFM_BURST = 5
+# Retry-After 헤더가 없을 때 기다리는 시간 (초)
+DEFAULT_RETRY_AFTER = 5.0
+
+# API 이름 -> (초당 요청 수, burst)
+RATE_LIMITS = {
+    "spotify": (SPOTIFY_RATE, SPOTIFY_BURST),
+    "lastfm": (LASTFM_RATE, LASTFM_BURST),
+}
+# 같은 worker 의 모든 프로세스가 공유하는 rate limit 상태 파일
+RATE_LIMIT_PATH = os.getenv(
+    "RATE_LIMIT_PATH",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "rate_limit.sqlite3"),
+)
+# utilization 을 계산하는 구간 (초)
+UTILIZATION_WINDOW = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    api TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    paused_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS acquisitions (
+    api TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS acquisitions_api_at ON acquisitions (api, at);
+"""
+
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def parse_retry_after(value, default: float = DEFAULT_RETRY_AFTER) -> float:
+    """Returns the seconds to wait from a `Retry-After` header, which is either seconds or an HTTP date."""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """A thread-safe token bucket limiting how fast requests are sent.
+    Attributes:
+        rate: Tokens added per second, i.e. the sustained request rate.
+        capacity: The maximum number of tokens, i.e. the allowed burst.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._pausedUntil = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Blocks until `tokens` are available (and any `pause()` is over), then takes them."""
+        while True:
+            with self._lock:
+                wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stops every caller of `acquire()` for `seconds`, e.g. after a 429 response."""
+        with self._lock:
+            self._pausedUntil = max(self._pausedUntil, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def _reserve(self, tokens):
+        now = time.monotonic()
+        if now < self._pausedUntil:
+            return self._pausedUntil - now
+
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+
+class SharedTokenBucket:
+    """A token bucket whose state lives in SQLite, so every process on the worker draws from the same bucket.
+    It has the same `acquire()`/`pause()` interface as `TokenBucket`; a 429 seen by one DAG run
+    therefore pauses every other run that calls the same API.
+    Attributes:
+        api: The bucket key, e.g. "spotify" or "lastfm".
+        rate: Tokens added per second, shared by all processes.
+        capacity: The maximum number of tokens, i.e. the allowed burst.
+        path: The SQLite file. (default: `RATE_LIMIT_PATH`)
+    """
+
+    def __init__(self, api: str, rate: float, capacity: float = None, path: str = RATE_LIMIT_PATH):
+        self.api = api
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def acquire(self, tokens: float = 1.0):
+        """Blocks until `tokens` are available in the shared bucket (and any `pause()` is over), then takes them."""
+        while True:
+            with self._lock:
+                wait = self._transaction(self._reserve, tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stops every process acquiring from this bucket for `seconds`, e.g. after a 429 response."""
+        with self._lock:
+            self._transaction(self._pause, seconds)
+
+    def utilization(self) -> dict:
+        """Returns the current bucket state:
+        `{"api", "rate", "tokens", "pausedFor", "requestsPerSecond", "utilization"}`, where `utilization`
+        is the share of the allowed rate used over the last `UTILIZATION_WINDOW` seconds.
+        """
+        with self._lock:
+            return self._transaction(self._utilization)
+
+    def _transaction(self, func, *args):
+        conn = self._connect()
+        # BEGIN IMMEDIATE 로 다른 프로세스의 쓰기를 막고 읽기-수정-쓰기를 원자적으로 처리
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, time.time(), *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _state(self, conn, now):
+        row = conn.execute(
+            "SELECT tokens, updated_at, paused_until FROM buckets WHERE api = ?", (self.api,)
+        ).fetchone()
+        if row is None:
+            return self.capacity, 0.0
+        tokens, updatedAt, pausedUntil = row
+        tokens = min(self.capacity, tokens + max(0.0, now - updatedAt) * self.rate)
+        return tokens, pausedUntil
+
+    def _save(self, conn, now, tokens, pausedUntil):
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (api, tokens, updated_at, paused_until) VALUES (?, ?, ?, ?)",
+            (self.api, tokens, now, pausedUntil),
+        )
+
+    def _reserve(self, conn, now, tokens):
+        available, pausedUntil = self._state(conn, now)
+        if now < pausedUntil:
+            return pausedUntil - now
+
+        if available >= tokens:
+            self._save(conn, now, available - tokens, pausedUntil)
+            conn.execute("INSERT INTO acquisitions (api, at) VALUES (?, ?)", (self.api, now))
+            conn.execute(
+                "DELETE FROM acquisitions WHERE api = ? AND at < ?",
+                (self.api, now - UTILIZATION_WINDOW),
+            )
+            return 0.0
+        self._save(conn, now, available, pausedUntil)
+        return (tokens - available) / self.rate
+
+    def _pause(self, conn, now, seconds):
+        _, pausedUntil = self._state(conn, now)
+        self._save(conn, now, 0.0, max(pausedUntil, now + seconds))
+
+    def _utilization(self, conn, now):
+        tokens, pausedUntil = self._state(conn, now)
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM acquisitions WHERE api = ? AND at >= ?",
+            (self.api, now - UTILIZATION_WINDOW),
+        ).fetchone()
+        requestsPerSecond = count / UTILIZATION_WINDOW
+        return {
+            "api": self.api,
+            "rate": self.rate,
+            "tokens": round(tokens, 2),
+            "pausedFor": round(max(0.0, pausedUntil - now), 2),
+            "requestsPerSecond": round(requestsPerSecond, 2),
+            "utilization": round(requestsPerSecond / self.rate, 3),
+        }
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # isolation_level=None: 트랜잭션은 _transaction() 에서 직접 연다
+            conn = sqlite3.connect(
+                self.path, timeout=60, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+def get_rate_limiter(api: str) -> SharedTokenBucket:
+    """Returns the process-wide `SharedTokenBucket` for `api`, configured from `RATE_LIMITS`."""
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(api)
+        if limiter is None:
+            rate, capacity = RATE_LIMITS[api]
+            limiter = _shared_limiters[api] = SharedTokenBucket(api, rate, capacity)
+        return limiter
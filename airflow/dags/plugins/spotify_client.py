@@ -0,0 +1,281 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from plugins.chart_http import ChartSession
+from plugins.rate_limit import get_rate_limiter, parse_retry_after
+from plugins.spotify_token import get_token_manager
+
+SPOTIFY_API_URL = "https://api.spotify.com/v1"
+# /v1/artists?ids= 한 번에 조회할 수 있는 최대 ID 수
+MAX_ARTIST_BATCH = 50
+# 배치가 다 차지 않아도 첫 ID 제출 후 이 시간이 지나면 요청을 보낸다 (초)
+DEFAULT_FLUSH_DELAY = 0.2
+# enrichment 시 동시에 보내는 최대 요청 수
+DEFAULT_CONCURRENCY = 8
+# 429 응답을 받았을 때 다시 시도하는 최대 횟수
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 5
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+_shared_resolver = None
+_shared_resolver_lock = threading.Lock()
+
+
+class SpotifyRequestException(Exception):
+    pass
+
+
+def current_access_token() -> str:
+    return get_token_manager().getToken()
+
+
+def refresh_access_token(expiredToken: str = None) -> str:
+    return get_token_manager().invalidate(expiredToken)
+
+
+class SpotifyClient:
+    """A rate-limited Spotify Web API client shared by every enrichment worker.
+    Each request takes a token from `limiter` first. A 429 response pauses the limiter for its
+    `Retry-After`, so every worker backs off together, and the request is retried afterwards;
+    a 401 refreshes the access token once. 5xx responses are retried by the session.
+    Attributes:
+        session: The `requests.Session` used for HTTP calls. (default: a pooled `ChartSession` that leaves 429 to the client)
+        limiter: The `TokenBucket`/`SharedTokenBucket` every request waits on. (default: the worker-wide "spotify" bucket)
+        tokenProvider: Returns the current access token; called per request, so it must be cheap. (default: the process-wide `SpotifyTokenManager`)
+        onUnauthorized: Called with the rejected token when Spotify answers 401, to renew it. (default: `SpotifyTokenManager.invalidate()`)
+        maxRateLimitRetries: How many 429 responses a single request may get before giving up. (default: 5)
+        stats: `{"requests", "rateLimited", "unauthorized"}` counters.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session = None,
+        limiter=None,
+        tokenProvider: Callable[[], str] = current_access_token,
+        onUnauthorized: Optional[Callable[[str], None]] = refresh_access_token,
+        maxRateLimitRetries: int = DEFAULT_MAX_RATE_LIMIT_RETRIES,
+    ):
+        self.session = session or ChartSession(
+            poolSize=DEFAULT_CONCURRENCY * 2, retryStatusCodes=(500, 502, 503, 504)
+        )
+        self.limiter = limiter or get_rate_limiter("spotify")
+        self.tokenProvider = tokenProvider
+        self.onUnauthorized = onUnauthorized
+        self.maxRateLimitRetries = maxRateLimitRetries
+        self.stats = {"requests": 0, "rateLimited": 0, "unauthorized": 0}
+
+    def get(self, url: str, params: dict = None) -> requests.Response:
+        """Sends a GET request. `url` may be a path relative to `SPOTIFY_API_URL` (e.g. "/search")."""
+        if url.startswith("/"):
+            url = SPOTIFY_API_URL + url
+
+        refreshed = False
+        rateLimited = 0
+        while True:
+            self.limiter.acquire()
+            token = self.tokenProvider()
+            response = self.session.get(
+                url, headers={"Authorization": f"Bearer {token}"}, params=params
+            )
+            self.stats["requests"] += 1
+
+            if response.status_code == 429 and rateLimited < self.maxRateLimitRetries:
+                rateLimited += 1
+                self.stats["rateLimited"] += 1
+                wait = parse_retry_after(response.headers.get("Retry-After"))
+                print(f"⏳ Spotify rate limit, {wait:.1f}초 후 재시도: {url}")
+                self.limiter.pause(wait)
+                continue
+
+            if response.status_code == 401 and not refreshed and self.onUnauthorized:
+                refreshed = True
+                self.stats["unauthorized"] += 1
+                # 이미 다른 worker 가 갱신했다면 manager 가 새 요청 없이 현재 토큰을 돌려준다
+                self.onUnauthorized(token)
+                continue
+
+            return response
+
+    def json(self, url: str, params: dict = None) -> dict:
+        """`get()` that returns the decoded body, raising `SpotifyRequestException` unless the status is 200."""
+        response = self.get(url, params)
+        if response.status_code != 200:
+            raise SpotifyRequestException(
+                f"Request is invalid. response status code={response.status_code}, response={response.text}"
+            )
+        return response.json()
+
+
+def get_spotify_client() -> SpotifyClient:
+    """Returns the process-wide `SpotifyClient`, so every worker shares one limiter and token."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = SpotifyClient()
+        return _shared_client
+
+
+def enrich(
+    func: Callable,
+    items: Iterable,
+    maxConcurrency: int = DEFAULT_CONCURRENCY,
+    default=None,
+) -> List:
+    """Calls `func(item)` for every item on up to `maxConcurrency` threads and returns the results in order.
+    It replaces sequential `for item in items: func(item)` enrichment loops; the request rate is bounded
+    by the `SpotifyClient` limiter, not by the number of threads.
+    Args:
+        default: The result used for an item whose call raised; the error is printed.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            print(f"❌ enrichment 실패: {item!r}, {e!r}")
+            return default
+
+    with ThreadPoolExecutor(
+        max_workers=min(maxConcurrency, len(items)), thread_name_prefix="enrich"
+    ) as executor:
+        return list(executor.map(call, items))
+
+
+class ArtistBatchResolver:
+    """Resolves Spotify artist IDs through `/v1/artists?ids=`, up to 50 IDs per request.
+    IDs can be submitted one at a time from any thread; a background thread sends a batch as soon as
+    it is full or `flushDelay` seconds after its first ID, and fans the results back out to the callers.
+    Attributes:
+        batchSize: The number of IDs per request. (default: 50, the Spotify maximum)
+        flushDelay: Seconds an incomplete batch may wait for more IDs. (default: 0.2)
+        client: The `SpotifyClient` the batches are sent with. (default: `get_spotify_client()`)
+        requests: The number of batch requests sent so far.
+    """
+
+    def __init__(
+        self,
+        batchSize: int = MAX_ARTIST_BATCH,
+        flushDelay: float = DEFAULT_FLUSH_DELAY,
+        client: SpotifyClient = None,
+    ):
+        if not 0 < batchSize <= MAX_ARTIST_BATCH:
+            raise ValueError(f"batchSize must be between 1 and {MAX_ARTIST_BATCH}")
+        self.batchSize = batchSize
+        self.flushDelay = flushDelay
+        self.client = client or get_spotify_client()
+        self.requests = 0
+
+        self._pending: Dict[str, Future] = {}
+        self._deadline = None
+        self._flushNow = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(
+            target=self._run, name="spotify-artist-batch", daemon=True
+        )
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, artistId: str) -> Future:
+        """Queues one ID. The returned future resolves to the artist object, or `None` if Spotify does not know it."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ArtistBatchResolver is closed")
+            future = self._pending.get(artistId)
+            if future is None:
+                future = self._pending[artistId] = Future()
+                # 새 배치의 첫 ID 이면 마감 시간을 정하고, 대기 중인 worker 를 깨운다
+                if self._deadline is None:
+                    self._deadline = time.monotonic() + self.flushDelay
+                    self._cond.notify()
+                elif len(self._pending) >= self.batchSize:
+                    self._cond.notify()
+            return future
+
+    def flush(self):
+        """Sends the pending IDs right away instead of waiting for `flushDelay`."""
+        with self._cond:
+            self._flushNow = True
+            self._cond.notify()
+
+    def resolve(self, artistIds: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Resolves every ID and returns `{artistId: artist or None}`. Duplicates are requested once."""
+        futures = {artistId: self.submit(artistId) for artistId in artistIds if artistId}
+        self.flush()
+        return {artistId: future.result() for artistId, future in futures.items()}
+
+    def close(self):
+        """Sends whatever is pending and stops the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._flushNow and not self._pending:
+                        self._flushNow = False
+                    ready = len(self._pending) >= self.batchSize
+                    if self._pending and (self._flushNow or self._closed):
+                        ready = True
+                    if ready or (self._closed and not self._pending):
+                        break
+                    timeout = None
+                    if self._deadline is not None:
+                        timeout = self._deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+
+                if not self._pending:
+                    return
+                batch = dict(list(self._pending.items())[: self.batchSize])
+                for artistId in batch:
+                    del self._pending[artistId]
+                self._deadline = (
+                    time.monotonic() + self.flushDelay if self._pending else None
+                )
+                if not self._pending:
+                    self._flushNow = False
+
+            self._send(batch)
+
+    def _send(self, batch: Dict[str, Future]):
+        try:
+            artists = self._request(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+
+        # 응답 배열은 요청한 ID 순서를 따르고, 없는 ID 는 null 로 온다
+        artists = list(artists) + [None] * (len(batch) - len(artists))
+        for future, artist in zip(batch.values(), artists):
+            future.set_result(artist)
+
+    def _request(self, artistIds):
+        self.requests += 1
+        data = self.client.json("/artists", {"ids": ",".join(artistIds)})
+        return data.get("artists", [])
+
+
+def get_artist_resolver() -> ArtistBatchResolver:
+    """Returns the process-wide `ArtistBatchResolver`, so single-ID lookups from any thread share batches and one background thread."""
+    global _shared_resolver
+    with _shared_resolver_lock:
+        if _shared_resolver is None:
+            _shared_resolver = ArtistBatchResolver()
+        return _shared_resolver
@@ -0,0 +1,145 @@
+import asyncio
+import base64
+import os
+import threading
+import time
+
+import requests
+
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+# 다른 프로세스(DAG 외부 스크립트 등)와 공유하기 위해 갱신할 때마다 기록하는 Airflow Variable
+TOKEN_VARIABLE = "SPOTIFY_ACCESS_TOKEN"
+# 만료 이 시간 전에 미리 갱신한다 (초)
+DEFAULT_REFRESH_MARGIN = 300
+# 응답에 expires_in 이 없을 때 가정하는 유효 기간 (초)
+DEFAULT_EXPIRES_IN = 3600
+# (connect, read) 타임아웃 (초)
+_TIMEOUT = (3.05, 15)
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+class SpotifyTokenException(Exception):
+    pass
+
+
+class SpotifyTokenManager:
+    """Keeps a Spotify client-credentials access token in memory and refreshes it before it expires.
+    The token is requested once per process and then reused until `refreshMargin` seconds before its
+    `expires_in`; concurrent callers (threads or coroutines) wait for a single refresh. The Airflow
+    Variable is written only when a new token is issued, never read on the hot path.
+    Attributes:
+        clientId: The Spotify client ID. (default: `SPOTIFY_CLIENT_ID` env var)
+        clientSecret: The Spotify client secret. (default: `SPOTIFY_CLIENT_SECRET` env var)
+        refreshMargin: Seconds before expiry at which the token is renewed. (default: 300)
+        storeVariable: Whether a refreshed token is also written to the `SPOTIFY_ACCESS_TOKEN` Variable.
+        session: The `requests.Session` the token endpoint is called with.
+        refreshes: The number of tokens issued by this manager.
+    """
+
+    def __init__(
+        self,
+        clientId: str = None,
+        clientSecret: str = None,
+        refreshMargin: float = DEFAULT_REFRESH_MARGIN,
+        storeVariable: bool = True,
+        session: requests.Session = None,
+    ):
+        self.clientId = clientId or os.getenv("SPOTIFY_CLIENT_ID")
+        self.clientSecret = clientSecret or os.getenv("SPOTIFY_CLIENT_SECRET")
+        self.refreshMargin = refreshMargin
+        self.storeVariable = storeVariable
+        self.session = session or requests.Session()
+        self.refreshes = 0
+        self._token = None
+        self._expiresAt = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def expiresIn(self) -> float:
+        """Seconds until the cached token expires (0 if there is none)."""
+        return max(0.0, self._expiresAt - time.monotonic())
+
+    def getToken(self) -> str:
+        """Returns a valid access token, refreshing it first if it is missing or about to expire."""
+        token = self._validToken()
+        if token is not None:
+            return token
+
+        with self._lock:
+            # 락을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있다
+            token = self._validToken()
+            if token is None:
+                token = self._refresh()
+            return token
+
+    async def getTokenAsync(self) -> str:
+        """`getToken()` for coroutines; a refresh runs on the default executor so the event loop is not blocked."""
+        token = self._validToken()
+        if token is not None:
+            return token
+        return await asyncio.get_running_loop().run_in_executor(None, self.getToken)
+
+    def invalidate(self, expiredToken: str = None) -> str:
+        """Forces a refresh after Spotify rejected `expiredToken` with 401 and returns the new token.
+        If another caller already replaced that token, the current one is returned without a new request.
+        """
+        with self._lock:
+            if expiredToken is None or expiredToken == self._token:
+                return self._refresh()
+            return self._token
+
+    def _validToken(self):
+        token, expiresAt = self._token, self._expiresAt
+        if token is not None and time.monotonic() < expiresAt - self.refreshMargin:
+            return token
+        return None
+
+    def _refresh(self):
+        encoded = base64.b64encode(
+            f"{self.clientId}:{self.clientSecret}".encode("utf-8")
+        ).decode("ascii")
+        headers = {
+            "Authorization": f"Basic {encoded}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        response = self.session.post(
+            SPOTIFY_TOKEN_URL,
+            data={"grant_type": "client_credentials"},
+            headers=headers,
+            timeout=_TIMEOUT,
+        )
+        if response.status_code != 200:
+            raise SpotifyTokenException(
+                f"Token request failed. response status code={response.status_code}, response={response.text}"
+            )
+
+        data = response.json()
+        expiresIn = float(data.get("expires_in", DEFAULT_EXPIRES_IN))
+        self._token = data["access_token"]
+        self._expiresAt = time.monotonic() + expiresIn
+        self.refreshes += 1
+        print(f"🔑 Spotify access token 갱신 (유효 시간 {expiresIn:.0f}초)")
+
+        if self.storeVariable:
+            self._storeVariable(self._token)
+        return self._token
+
+    def _storeVariable(self, token):
+        try:
+            from airflow.models import Variable
+
+            Variable.set(TOKEN_VARIABLE, token)
+        except Exception as e:
+            # Variable 기록은 다른 소비자를 위한 것이므로 실패해도 토큰은 그대로 사용한다
+            print(f"⚠️ {TOKEN_VARIABLE} Variable 갱신 실패: {e!r}")
+
+
+def get_token_manager() -> SpotifyTokenManager:
+    """Returns the process-wide `SpotifyTokenManager`, so every task in the process shares one token."""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = SpotifyTokenManager()
+        return _shared_manager
@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from plugins.artist_cache import MISS, normalize_artist_name
+
+# (아티스트, 곡) -> Last.fm 태그 캐시 파일. 같은 worker 의 모든 프로세스가 공유한다
+TRACK_TAG_CACHE_PATH = os.getenv(
+    "TRACK_TAG_CACHE_PATH",
+    os.path.join(os.getenv("AIRFLOW_VAR_DATA_DIR", "/opt/airflow/data"), "track_tag_cache.sqlite3"),
+)
+# 캐시 유효 기간 (초). 곡의 태그는 거의 바뀌지 않는다
+DEFAULT_TAG_TTL = 14 * 24 * 60 * 60
+# Last.fm 이 모르는 곡을 기억하는 기간 (초)
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS track_tags (
+    artist TEXT NOT NULL,
+    track TEXT NOT NULL,
+    tags TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (artist, track)
+);
+"""
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def track_key(artist: str, track: str) -> tuple:
+    """Returns the cache key of a track: both names normalized like `normalize_artist_name()`."""
+    return normalize_artist_name(artist), normalize_artist_name(track)
+
+
+class TrackTagCache:
+    """A persistent SQLite cache of Last.fm `track.getInfo` tags, keyed by (artist, track).
+    Tracks Last.fm does not know are cached as `None` for `negativeTtl` seconds.
+    Attributes:
+        path: The SQLite file. (default: `TRACK_TAG_CACHE_PATH`)
+        ttl: Seconds a tag list stays valid. (default: 14 days)
+        negativeTtl: Seconds a not-found result stays valid. (default: 1 day)
+        stats: `{"hits", "misses", "negativeHits"}` counters for this process.
+    """
+
+    def __init__(
+        self,
+        path: str = TRACK_TAG_CACHE_PATH,
+        ttl: float = DEFAULT_TAG_TTL,
+        negativeTtl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negativeTtl = negativeTtl
+        self.stats = {"hits": 0, "misses": 0, "negativeHits": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def hitRatio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return "hits={hits} (negative={negativeHits}) misses={misses}".format(
+            **self.stats) + f" hit ratio={self.hitRatio:.1%}"
+
+    def getTags(self, artist: str, track: str):
+        """Returns the cached tag list of the track, `None` for a cached not-found, or `MISS`."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT tags, updated_at FROM track_tags WHERE artist = ? AND track = ?",
+                track_key(artist, track),
+            ).fetchone()
+
+            if row is not None:
+                tags, updatedAt = row
+                age = time.time() - updatedAt
+                if age <= (self.negativeTtl if tags is None else self.ttl):
+                    self.stats["hits"] += 1
+                    if tags is None:
+                        self.stats["negativeHits"] += 1
+                        return None
+                    return json.loads(tags)
+
+            self.stats["misses"] += 1
+            return MISS
+
+    def putTags(self, artist: str, track: str, tags):
+        # 태그 이름에 쉼표가 들어갈 수 있으므로 JSON 배열로 저장
+        value = None if tags is None else json.dumps(tags, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO track_tags (artist, track, tags, updated_at) VALUES (?, ?, ?, ?)",
+                    track_key(artist, track) + (value, time.time()),
+                )
+
+    def purge(self):
+        """Deletes every expired row."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM track_tags WHERE updated_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM track_tags WHERE tags IS NULL AND updated_at < ?",
+                    (now - self.negativeTtl,),
+                )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+def get_track_tag_cache() -> TrackTagCache:
+    """Returns the process-wide `TrackTagCache` over `TRACK_TAG_CACHE_PATH`."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TrackTagCache()
+        return _shared_cache
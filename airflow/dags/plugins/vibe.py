@@ -1,13 +1,24 @@
-import json
-import sys
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import requests
+from plugins.chart_base import BaseChartData, ChartColumns, ChartEntry
+from plugins.chart_http import get_shared_session
+
+# ChartEntry 는 chart_base 로 옮겨졌지만 `from plugins.vibe import ChartEntry` 를 위해 다시 내보낸다
+__all__ = [
+    "ChartData",
+    "ChartEntry",
+    "VibeChartParseException",
+    "VibeChartQueryException",
+    "VibeChartRequestException",
+]
 
 _USER_AGENT = "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Mobile Safari/537.36"
 _ACCEPT = "application/json"
 _CHART_API_URL = "https://apis.naver.com/vibeWeb/musicapiweb/vibe/v1/chart/track/total"
+_DEFAULT_PAGE_CONCURRENCY = 4
 
 
 class VibeChartRequestException(Exception):
@@ -22,59 +33,7 @@ class VibeChartQueryException(Exception):
     pass
 
 
-class ChartEntry:
-    """Represents an entry on a chart.
-    Attributes:
-        title: The title of the track
-        artist: The name of the artist.
-        image: The URL of the cover image for the track
-        lastPos: The track's last position on the previous period.
-        rank: The track's current rank position on the chart.
-        isNew: Whether the track is new to the chart.
-    """
-
-    def __init__(
-            self,
-            title: str,
-            artist: str,
-            image: str,
-            lastPos: int,
-            rank: int,
-            isNew: bool):
-        self.title = title
-        self.artist = artist
-        self.image = image
-        self.lastPos = lastPos
-        self.rank = rank
-        self.isNew = isNew
-
-    def __repr__(self):
-        return "{}.{}(title={!r}, artist={!r})".format(
-            self.__class__.__module__, self.__class__.__name__, self.title, self.artist)
-
-    def __str__(self):
-        """Returns a string of the form 'TITLE by ARTIST'."""
-        if self.title:
-            s = "'%s' by %s" % (self.title, self.artist)
-        else:
-            s = "%s" % self.artist
-
-        if sys.version_info.major < 3:
-            return s.encode(getattr(sys.stdout, "encoding", "") or "utf8")
-        else:
-            return s
-
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
-
-
-class ChartData:
+class ChartData(BaseChartData):
     """Represents a particular Bugs chart by a particular period.
     Attributes:
         name: The chart name
@@ -83,81 +42,128 @@ class ChartData:
         queryCount: The number of items to retrieve from the API response, starting from `queryStart`. (default: 100)
         imageSize: The size of cover image for the track. (default: 256)
         fetch: A boolean value that indicates whether to retrieve the chart data immediately. If set to `False`, you can fetch the data later using the `fetchEntries()` method.
+        paginate: Fetch every page up to `chartTotalCount` instead of a single `queryCount` window when `fetch` is set. (see `fetchAllEntries()`)
+        session: The `requests.Session` used for HTTP calls, so connections can be pooled and reused. (default: `chart_http.get_shared_session()`)
     """
 
+    provider = "vibe"
+    ENTRY_FIELDS = ("rank", "title", "artist", "lastPos", "isNew", "image")
+    _ITEMS_PATH = ("response", "result", "chart", "items", "tracks")
+    _META_PATHS = (
+        ("response", "result", "chart", "title"),
+        ("response", "result", "chart", "date"),
+        ("response", "result", "chart", "chartTotalCount"),
+    )
+    _requestException = VibeChartRequestException
+    _parseException = VibeChartParseException
+
     def __init__(
         self,
         queryStart: int = 1,
         queryCount: int = 100,
         imageSize: int = 256,
         fetch: bool = True,
+        session: requests.Session = None,
+        paginate: bool = False,
     ):
         self.maxQueryCount = 0
         self.queryStart = queryStart
         self.queryCount = queryCount
         self.imageSize = imageSize
-        self.entries = []
+        self.columns = ChartColumns()
+        self._session = session or get_shared_session()
 
         if fetch:
-            self.fetchEntries()
+            if paginate:
+                self.fetchAllEntries()
+            else:
+                self.fetchEntries()
 
-    def __getitem__(self, key):
-        return self.entries[key]
+    @property
+    def cacheKey(self):
+        # 같은 차트라도 조회 구간이 다르면 다른 스냅샷으로 취급
+        return super().cacheKey + (self.queryStart, self.queryCount)
 
-    def __len__(self):
-        return len(self.entries)
+    def fetchAllEntries(
+        self,
+        maxConcurrency: int = _DEFAULT_PAGE_CONCURRENCY,
+        conditional: bool = False,
+        saveState: bool = True,
+    ) -> bool:
+        """Fetches the whole chart, `queryCount` entries per request.
+        The first page goes through `fetchEntries()` and reveals `chartTotalCount`; the remaining pages
+        are then requested concurrently and merged into `self.columns` in rank order.
+        `queryStart`/`queryCount` (and so `cacheKey`) are left unchanged.
+        Args:
+            maxConcurrency: The maximum number of page requests in flight at once. (default: 4)
+            conditional: Skip the remaining pages when the first page has not changed. (see `fetchEntries()`)
+            saveState: Store the fetch state once every page has been fetched. (see `fetchEntries()`)
+        Returns:
+            `False` when `conditional` is set and the chart has not changed, otherwise `True`.
+        """
+        if not self.fetchEntries(conditional=conditional, saveState=False):
+            return False
+
+        pageSize = self.queryCount
+        starts = range(self.queryStart + pageSize, self.maxQueryCount + 1, pageSize)
+        pages = [
+            ChartData(
+                queryStart=start,
+                queryCount=min(pageSize, self.maxQueryCount - start + 1),
+                imageSize=self.imageSize,
+                fetch=False,
+                session=self._session,
+            )
+            for start in starts
+        ]
 
-    def json(self):
-        return json.dumps(
-            self,
-            default=lambda o: o.__dict__,
-            sort_keys=True,
-            indent=4,
-            ensure_ascii=False,
-        )
+        if pages:
+            with ThreadPoolExecutor(
+                max_workers=min(maxConcurrency, len(pages)),
+                thread_name_prefix="vibe-page",
+            ) as executor:
+                # 예외가 있으면 여기서 다시 발생한다
+                list(executor.map(lambda page: page.fetchEntries(), pages))
 
-    def fetchEntries(self):
-        headers = {"User-Agent": _USER_AGENT, "Accept": _ACCEPT}
+            for page in pages:
+                self.columns.extend(page.columns)
+            self.columns.sortByRank()
+
+        # 모든 페이지를 받은 뒤에만 fetch 상태를 저장해서, 중간에 실패하면 다음 실행에서 다시 받는다
+        if saveState:
+            self.saveFetchState()
+        return self.changed
+
+    def _request(self, headers, stream=False):
+        headers = {"User-Agent": _USER_AGENT, "Accept": _ACCEPT, **headers}
 
         if 0 < self.maxQueryCount < (self.queryCount + self.queryStart - 1):
             raise VibeChartQueryException(
                 f"Exceeded maximum query limit. (limit: {self.maxQueryCount})"
             )
 
-        res = requests.get(
+        return self._session.get(
             f"{_CHART_API_URL}?start={self.queryStart}&display={self.queryCount}",
             headers=headers,
+            stream=stream,
         )
 
-        if res.status_code != 200:
-            message = f"Request has been failed. {res.status_code}"
-            raise VibeChartRequestException(message)
-
-        data = res.json()
-
-        self._parseEntries(data)
-
-    def _parseEntries(self, data):
-        try:
-            c_data = data["response"]["result"]["chart"]
-            self.name = c_data["title"]
-            self.date = self._parseDate(c_data["date"])
-            self.maxQueryCount = int(c_data["chartTotalCount"])
-
-            for item in c_data["items"]["tracks"]:
-                entry = ChartEntry(
-                    title=item["trackTitle"],
-                    artist=item["artists"][0]["artistName"],
-                    image=self._getResizedImageUrl(item["album"]["imageUrl"]),
-                    rank=int(item["rank"]["currentRank"]),
-                    lastPos=0,
-                    isNew=item["rank"]["isNew"],
-                )
-                entry.lastPos = entry.rank + int(item["rank"]["rankVariation"])
-                self.entries.append(entry)
-
-        except Exception as e:
-            raise VibeChartParseException(e)
+    def _parseMeta(self, meta):
+        chart = ("response", "result", "chart")
+        self.name = meta[chart + ("title",)]
+        self.date = self._parseDate(meta[chart + ("date",)])
+        self.maxQueryCount = int(meta[chart + ("chartTotalCount",)])
+
+    def _parseItem(self, item, index):
+        rank = int(item["rank"]["currentRank"])
+        self.columns.append(
+            title=item["trackTitle"],
+            artist=item["artists"][0]["artistName"],
+            image=self._getResizedImageUrl(item["album"]["imageUrl"]),
+            rank=rank,
+            lastPos=rank + int(item["rank"]["rankVariation"]),
+            isNew=item["rank"]["isNew"],
+        )
 
     def _parseDate(self, timestamp_ms):
         timestamp_s = timestamp_ms / 1000
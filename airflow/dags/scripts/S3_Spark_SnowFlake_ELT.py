@@ -3,7 +3,9 @@ from datetime import datetime
 
 import snowflake.connector
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, count, lit, when
+from pyspark.sql.functions import col, count, to_json
+from pyspark.sql.types import (ArrayType, BooleanType, DateType, IntegerType,
+                               StringType, StructField, StructType)
 
 from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook
 
@@ -80,6 +82,7 @@ def check_and_create_table():
                 rank INT,
                 title STRING,
                 artist STRING,
+                artist_key STRING,  -- artist_dim.name_keys 와 조인하는 정규화된 아티스트 이름
                 genre STRING,  -- 🎵 genre 컬럼 추가
                 lastPos INT,
                 image STRING,
@@ -92,6 +95,10 @@ def check_and_create_table():
             cur.execute(create_table_query)
             print("✅ music_charts 테이블 생성 완료.")
         else:
+            # artist_key 컬럼이 추가되기 전에 만든 테이블
+            cur.execute(
+                f"ALTER TABLE {SNOWFLAKE_OPTIONS['schema']}.music_charts ADD COLUMN IF NOT EXISTS artist_key STRING"
+            )
             print("ℹ️ music_charts 테이블이 이미 존재합니다.")
 
         conn.commit()
@@ -121,6 +128,7 @@ def insert_data_into_snowflake(df, table_name):
             artist = (
                 escape_quotes(
                     row["artist"]) if row["artist"] is not None else "NULL")
+            artist_key = escape_quotes(row["artist_key"])
             genre = (
                 escape_quotes(
                     row["genre"]) if row["genre"] is not None else "NULL")  # 🎵 genre 추가
@@ -139,8 +147,8 @@ def insert_data_into_snowflake(df, table_name):
             date = f"'{row['date']}'"  # date 컬럼 추가
 
             query = f"""
-                INSERT INTO {table_name} (rank, title, artist, genre, lastPos, image, peakPos, isNew, source, date)
-                VALUES ({rank}, {title}, {artist}, {genre}, {lastPos}, {image}, {peakPos}, {isNew}, {source}, {date})
+                INSERT INTO {table_name} (rank, title, artist, artist_key, genre, lastPos, image, peakPos, isNew, source, date)
+                VALUES ({rank}, {title}, {artist}, {artist_key}, {genre}, {lastPos}, {image}, {peakPos}, {isNew}, {source}, {date})
             """
             cur.execute(query)
 
@@ -150,8 +158,9 @@ def insert_data_into_snowflake(df, table_name):
         print("✅ Data inserted into Snowflake successfully.")
 
     except Exception as e:
-        print(query)
         print(f"⚠️ Error inserting data into Snowflake: {e}")
+        # 적재 실패 시 Spark 작업을 실패시켜서 music_charts Dataset 이 갱신되지 않도록 한다
+        raise
 
 
 # Spark 세션 생성
@@ -161,24 +170,35 @@ spark = spark_session_builder("S3_to_Snowflake")
 TODAY = datetime.now().strftime("%Y-%m-%d")
 S3_BUCKET = "s3a://de5-s4tify"
 chart_sources = {
-    "bugs": f"{S3_BUCKET}/raw_data/bugs_chart_data/bugs_chart_{TODAY}.csv",
-    "flo": f"{S3_BUCKET}/raw_data/flo_chart_data/flo_chart_{TODAY}.csv",
-    "genie": f"{S3_BUCKET}/raw_data/genie_chart_data/genie_chart_{TODAY}.csv",
-    "melon": f"{S3_BUCKET}/raw_data/melon_chart_data/melon_chart_{TODAY}.csv",
-    "vibe": f"{S3_BUCKET}/raw_data/vibe_chart_data/vibe_chart_{TODAY}.csv",
+    "bugs": f"{S3_BUCKET}/raw_data/bugs_chart_data/bugs_chart_{TODAY}.parquet",
+    "flo": f"{S3_BUCKET}/raw_data/flo_chart_data/flo_chart_{TODAY}.parquet",
+    "genie": f"{S3_BUCKET}/raw_data/genie_chart_data/genie_chart_{TODAY}.parquet",
+    "melon": f"{S3_BUCKET}/raw_data/melon_chart_data/melon_chart_{TODAY}.parquet",
+    "vibe": f"{S3_BUCKET}/raw_data/vibe_chart_data/vibe_chart_{TODAY}.parquet",
 }
 
+# 차트 DAG 가 쓰는 Parquet 스키마 (plugins/chart_staging.py 의 chart_schema() 와 같은 순서/타입)
+CHART_SCHEMA = StructType(
+    [
+        StructField("rank", IntegerType(), True),
+        StructField("title", StringType(), True),
+        StructField("artist", StringType(), True),
+        StructField("artist_key", StringType(), True),
+        StructField("genres", ArrayType(StringType()), True),
+        StructField("lastPos", IntegerType(), True),
+        StructField("image", StringType(), True),
+        StructField("peakPos", IntegerType(), True),
+        StructField("isNew", BooleanType(), True),
+        StructField("source", StringType(), True),
+        StructField("date", DateType(), True),
+    ]
+)
+
 
 def read_chart_data(source, path):
     try:
-        df = (
-            spark.read.format("csv")
-            .option("header", True)
-            .option("inferSchema", True)
-            .load(path)
-        )
-        df.printSchema()  # 데이터 스키마 출력해서 `genre`와 `date` 확인
-        return df.withColumn("source", lit(source))
+        # 스키마를 지정해서 읽으므로 타입 추론이나 형 변환이 필요 없다
+        return spark.read.schema(CHART_SCHEMA).parquet(path)
     except Exception as e:
         print(f"⚠️ {source} 데이터 로드 실패: {e}")
         return None
@@ -188,32 +208,24 @@ def read_chart_data(source, path):
 dfs = [read_chart_data(source, path) for source, path in chart_sources.items()]
 dfs = [df for df in dfs if df is not None]
 
-for df in dfs:
-    df.show(40)
-
 if dfs:
     merged_df = dfs[0]
     for df in dfs[1:]:
-        merged_df = merged_df.unionByName(df, allowMissingColumns=True)
+        merged_df = merged_df.unionByName(df)
 
+    # genre 는 music_charts 의 STRING 컬럼에 JSON 배열 문자열로 저장
     final_df = merged_df.select(
-        when(col("rank").rlike("^[0-9]+$"),
-             col("rank").cast("int")).alias("rank"),
+        col("rank"),
         col("title"),
         col("artist"),
-        col("genre"),  # genre 컬럼 추가
-        when(col("lastPos").rlike("^[0-9]+$"), col("lastPos").cast("int")).alias(
-            "lastPos"
-        ),
+        col("artist_key"),
+        to_json(col("genres")).alias("genre"),
+        col("lastPos"),
         col("image"),
-        when(col("peakPos").rlike("^[0-9]+$"), col("peakPos").cast("int")).alias(
-            "peakPos"
-        ),
-        when(col("isNew").rlike("^(true|false)$"), col("isNew").cast("boolean")).alias(
-            "isNew"
-        ),
+        col("peakPos"),
+        col("isNew"),
         col("source"),
-        col("date"),  # date 컬럼 추가
+        col("date"),
     )
 
     final_df.show(40)
@@ -1,40 +1,31 @@
-import os
-
 import pandas as pd
-import requests
+from plugins.checkpoint import open_journal
+from plugins.lastfm_client import get_lastfm_client, get_track_tags
 from plugins.spark_snowflake_conn import *
 
-LAST_FM_API_KEY = os.getenv("LAST_FM_API_KEY")
-
 
-def add_song_genre(file_name, table_name):
+def track_keys(join_data):
+    return list(zip(join_data["artist"], join_data["title"]))
 
-    join_data = pd.read_csv(f"data/{file_name}")
-    song_genres = []
 
-    for _, row in join_data.iterrows():
+def fetch_song_genres(tables, journal=None):
+    # 두 테이블에 모두 나오는 곡은 한 번만 조회하도록 (아티스트, 곡) 키를 합쳐서 중복 제거
+    keys = dict.fromkeys(key for join_data in tables for key in track_keys(join_data))
+    client = get_lastfm_client()
+    song_genres = get_track_tags(keys, client, journal)
 
-        artist = row["artist"]
-        track = row["title"]
-        url = f"https://ws.audioscrobbler.com/2.0/?method=track.getInfo&api_key={LAST_FM_API_KEY}&artist={artist}&track={track}&format=json"
+    print(f"🏷️ Last.fm 태그 캐시: {client.cache.summary()}, 요청 {client.requests}회 ({len(keys)}곡)")
+    print(f"🚦 Last.fm 요청 사용률: {client.limiter.utilization()}")
+    return song_genres
 
-        try:
-            response = requests.get(url).json()
-            # API 응답에서 장르 정보 추출
-            genre = response.get("track", {}).get("toptags", {}).get("tag", [])
 
-            if genre:
-                genre_list = [g["name"] for g in genre]  # 장르 리스트로 변환
-                song_genres.append(", ".join(genre_list))  # 문자열로 저장
-            else:
-                song_genres.append("Unknown")
+def add_song_genre(join_data, table_name, song_genres):
 
-        except Exception as e:
-            print(f"Error fetching genre for {artist} - {track}: {e}")
-            song_genres.append("Error")
-
-    # 새로운 컬럼 추가
-    join_data["song_genre"] = song_genres
+    # 조회에 실패한 곡은 "Error", 태그가 없는 곡은 "Unknown"
+    join_data["song_genre"] = [
+        ", ".join(song_genres[key]) or "Unknown" if key in song_genres else "Error"
+        for key in track_keys(join_data)
+    ]
 
     # string으로 변경 되었던 아티스트 장르 다시 array 변경
     join_data["artist_genre"] = join_data["artist_genre"].apply(
@@ -47,9 +38,14 @@ def add_song_genre(file_name, table_name):
 
 
 def main(logical_date):
-    add_song_genre(
-        f"join_artist_info_track10_{logical_date}.csv",
-        "ARTIST_INFO_TOP10")
-    add_song_genre(
-        f"join_artsit_info_chart_{logical_date}.csv", "ARTIST_INFO_GLOBALTOP50"
-    )
+    tables = {
+        "ARTIST_INFO_TOP10": pd.read_csv(
+            f"data/join_artist_info_track10_{logical_date}.csv"),
+        "ARTIST_INFO_GLOBALTOP50": pd.read_csv(
+            f"data/join_artsit_info_chart_{logical_date}.csv"),
+    }
+
+    with open_journal(f"spotify_song_genre/{logical_date}") as journal:
+        song_genres = fetch_song_genres(tables.values(), journal)
+    for table_name, join_data in tables.items():
+        add_song_genre(join_data, table_name, song_genres)
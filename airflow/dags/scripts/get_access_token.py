@@ -1,39 +1,9 @@
-import base64
-import json
-import os
-
-import requests
-
-from airflow.models import Variable
-
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
-
-END_POINT = "https://accounts.spotify.com/api/token"
+from plugins.spotify_token import get_token_manager
 
 
 def get_token():
+    # 프로세스 공유 토큰 매니저로 새 토큰을 발급받고 airflow 변수도 갱신
+    # PythonOperator 의 반환값은 XCom 과 로그에 남으므로 토큰은 반환하지 않는다
+    get_token_manager().invalidate()
 
-    encoded = base64.b64encode(
-        f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}".encode("utf-8")
-    ).decode("ascii")
-
-    headers = {
-        "Authorization": f"Basic {encoded}",
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
-
-    payload = {"grant_type": "client_credentials"}
-
-    response = requests.post(END_POINT, data=payload, headers=headers)
-
-    if response.status_code == 200:
-        access_token = response.json()["access_token"]
-
-        # airflow 변수 갱신
-        Variable.set("SPOTIFY_ACCESS_TOKEN", access_token)
-
-        print("success to change the access token!")
-
-    else:
-        print(f"Error {response.status_code}: {response.text}")
+    print("success to change the access token!")
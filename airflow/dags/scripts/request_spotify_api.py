@@ -1,26 +1,19 @@
 import ast
 import os
-import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from itertools import chain
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import requests
-from scripts.get_access_token import get_token
+from plugins.artist_cache import get_artist_cache
+from plugins.checkpoint import open_journal
+from plugins.get_artist_data import fetch_artist_info
+from plugins.spotify_client import enrich, get_spotify_client
 from scripts.load_spotify_data import *
 
-from airflow.models import Variable
-
 TODAY = datetime.now().strftime("%Y-%m-%d")
 END_POINT = "https://api.spotify.com/v1"
 
-SPOTIFY_ACCESS_TOKEN = Variable.get("SPOTIFY_ACCESS_TOKEN", default_var=None)
-if not SPOTIFY_ACCESS_TOKEN:
-    print("⚠️ Access Token 없음. 새로운 토큰을 가져옵니다.")
-    get_token()
-    SPOTIFY_ACCESS_TOKEN = Variable.get(
-        "SPOTIFY_ACCESS_TOKEN", default_var=None)
-
 LAST_FM_API_KEY = os.getenv("LAST_FM_API_KEY")
 
 
@@ -28,39 +21,19 @@ LAST_FM_API_KEY = os.getenv("LAST_FM_API_KEY")
 def get_arti_top10(logical_date, **kwargs):
 
     task_instance = kwargs["ti"]
-    arti_top10_list = []
     dir_name = "artist_top10"
     object_name = f"spotify_artist_top10_{logical_date}.csv"
 
     # csv 파일 읽어오기
     song_info = read_crawling_csv(logical_date)
 
-    for _, row in song_info.iterrows():
-
-        artist_id = ast.literal_eval(row["artist_id"])
-
-        # 피처링 등의 이유로 아티스트가 2명 이상인 경우가 존재
-        for i in range(len(artist_id)):
-            id = artist_id[i]
-            end_point = END_POINT + f"/artists/{id}/top-tracks/"
-
-            top_10_info = extract(end_point)
-
-            try:
-                for track in top_10_info["tracks"]:
-                    arti_top10_list.append(
-                        {
-                            "album": track["album"]["name"],
-                            "artist_id": id,
-                            "song_id": track["id"],
-                            "title": track["name"],
-                        }
-                    )
-            except Exception as e:
-                print(f"error:{top_10_info}")
+    # 차트에 여러 번 나온 아티스트도 top-tracks 는 한 번만 요청
+    artist_ids = distinct_artist_ids(song_info)
+    with open_journal(f"spotify_artist_top10/{logical_date}") as journal:
+        top_tracks = fetch_top_tracks(artist_ids, logical_date, journal)
 
     # task_instance.xcom_push(key='artist_top10', value=arti_top10_list)
-    artist_top10_df = pd.DataFrame(arti_top10_list)
+    artist_top10_df = top_tracks_frame(top_tracks)
     artist_top10_df.to_csv(
         f"data/{object_name}",
         encoding="utf-8-sig",
@@ -72,6 +45,59 @@ def get_arti_top10(logical_date, **kwargs):
         print(f"error: {e}")
 
 
+# 크롤링 데이터의 아티스트 ID 를 처음 나온 순서대로 중복 없이 반환
+def distinct_artist_ids(song_info) -> List[str]:
+    # 피처링 등의 이유로 아티스트가 2명 이상인 경우가 존재
+    return list(dict.fromkeys(chain.from_iterable(song_info["artist_id"].map(ast.literal_eval))))
+
+
+# 아티스트별 top-tracks 를 [앨범, 곡 ID, 곡명] 목록으로 가져오기
+def fetch_top_tracks(artist_ids, day, journal=None) -> Dict[str, list]:
+
+    # 같은 날짜에 이미 받아 둔 아티스트는 재실행/재시도 시 다시 요청하지 않는다
+    # (journal 은 재시도가 다른 worker 에서 실행되어 로컬 캐시가 없을 때를 위한 것)
+    cache = get_artist_cache()
+    top_tracks = cache.getTopTracks(day, artist_ids)
+    if journal:
+        top_tracks.update(journal.getMany(id for id in artist_ids if id not in top_tracks))
+    missing = [id for id in artist_ids if id not in top_tracks]
+    print(
+        f"🎧 top-tracks: 아티스트 {len(artist_ids)}명 중 캐시 {len(top_tracks)}명, 요청 {len(missing)}명"
+    )
+
+    def fetch(id):
+        top_10_info = extract(END_POINT + f"/artists/{id}/top-tracks/")
+        if top_10_info is None:
+            return None
+        tracks = [
+            [track["album"]["name"], track["id"], track["name"]]
+            for track in top_10_info["tracks"]
+        ]
+        # 끝난 아티스트는 바로 저장해서 task 가 중간에 실패해도 다음 시도에서 건너뛴다
+        cache.putTopTracks(day, id, tracks)
+        if journal:
+            journal.put(id, tracks)
+        return tracks
+
+    # top-tracks 는 아티스트별 요청이므로 제한된 동시성으로 병렬 요청
+    for id, tracks in zip(missing, enrich(fetch, missing)):
+        if tracks is None:
+            print(f"error: top-tracks 조회 실패 {id}")
+        else:
+            top_tracks[id] = tracks
+
+    return {id: top_tracks[id] for id in artist_ids if id in top_tracks}
+
+
+# {아티스트 ID: top-tracks} 를 album, artist_id, song_id, title 컬럼의 DataFrame 으로 변환
+def top_tracks_frame(top_tracks) -> pd.DataFrame:
+
+    tracks = pd.Series(top_tracks, dtype=object).explode().dropna()
+    frame = pd.DataFrame(tracks.tolist(), columns=["album", "song_id", "title"])
+    frame.insert(1, "artist_id", tracks.index)
+    return frame
+
+
 # 아티스트 정보 가져오기
 def get_artist_info(logical_date, **kwargs):
 
@@ -83,26 +109,26 @@ def get_artist_info(logical_date, **kwargs):
     # csv 파일 읽어오기
     song_info = read_crawling_csv(logical_date)
 
+    # 피처링 등의 이유로 아티스트가 2명 이상인 경우가 존재
+    artist_ids = []
     for _, row in song_info.iterrows():
-        artist_id = ast.literal_eval(row["artist_id"])
-
-        for i in range(len(artist_id)):
-            id = artist_id[i]
-
-            try:
-                end_point = END_POINT + f"/artists/{id}"
-                artist_info = extract(end_point)
-                # print(artist_info['name'])
-                artist_info_list.append(
-                    {
-                        "artist": artist_info["name"],
-                        "artist_id": id,
-                        "artist_genre": artist_info["genres"],
-                    }
-                )
-            except Exception as e:
-                time.sleep(20)
-                print(f"error:{artist_info}")
+        artist_ids.extend(ast.literal_eval(row["artist_id"]))
+
+    with open_journal(f"spotify_artist_info/{logical_date}") as journal:
+        artists = fetch_artist_info(artist_ids, journal)
+
+    for id in artist_ids:
+        artist_info = artists.get(id)
+        if not artist_info:
+            print(f"error: 아티스트 정보 없음 {id}")
+            continue
+        artist_info_list.append(
+            {
+                "artist": artist_info["name"],
+                "artist_id": id,
+                "artist_genre": artist_info["genres"],
+            }
+        )
 
     # task_instance.xcom_push(key="artist_info", value=artist_info_list)
     artist_info_df = pd.DataFrame(artist_info_list)
@@ -130,29 +156,11 @@ def read_crawling_csv(execution_date) -> pd.DataFrame:
 # API 요청 함수
 def extract(url: str) -> Optional[Dict[str, Any]]:
 
-    access_token = SPOTIFY_ACCESS_TOKEN
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-    }
-
-    response = requests.get(url, headers=headers)
+    # 토큰 만료(401) 시 재발급, 429 Retry-After 대기, 요청 속도 제한은 공유 client 가 처리
+    response = get_spotify_client().get(url)
 
     if response.status_code == 200:
-        result = response.json()
-
-    elif (
-        response.status_code == 400 or response.status_code == 401
-    ):  # 토큰 만료시 재요청
-        time.sleep(3)
-        get_token()  # Variable에 저장된 token 변경
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-        }
-        response = requests.get(url, headers=headers)
-        result = response.json()
-
-    else:
-        print(response.text)
-
-    return result
+        return response.json()
+
+    print(response.text)
+    return None
@@ -0,0 +1,76 @@
+import time
+from collections import defaultdict
+
+from plugins.artist_cache import artist_name_keys
+from plugins.artist_dim import get_artist_dim
+from plugins.checkpoint import open_journal
+from plugins.get_artist_data import fetch_artist_info, search_artist_ids
+from plugins.snowflake_utils import execute_snowflake_query
+from plugins.variables import SNOWFLAKE_PROPERTIES
+
+# 최근 며칠 동안 차트에 나온 아티스트를 artist_dim 후보로 본다
+LOOKBACK_DAYS = 2
+
+
+# 최근 국내 차트에 나온 아티스트 이름 가져오기
+def chart_artist_names(lookback_days=LOOKBACK_DAYS):
+    df = execute_snowflake_query(
+        """
+        SELECT DISTINCT artist
+        FROM RAW_DATA.MUSIC_CHARTS
+        WHERE "DATE" >= DATEADD(day, -%s, CURRENT_DATE()) AND artist IS NOT NULL
+        """,
+        dict(SNOWFLAKE_PROPERTIES, schema="RAW_DATA"),
+        data=(lookback_days,),
+        fetch=True,
+    )
+    return df["ARTIST"].tolist() if not df.empty else []
+
+
+# 처음 보는 아티스트와 장르가 오래된 아티스트만 Spotify 에서 조회해서 artist_dim 갱신
+def update_artist_dim(logical_date, **kwargs):
+    dim = get_artist_dim()
+    dim.pull()
+
+    names = chart_artist_names()
+    new_names = dim.unknownNames(names)
+    stale_ids = dim.staleArtistIds()
+    print(f"🎤 차트 아티스트 {len(names)}명 중 신규 {len(new_names)}명, 장르 갱신 대상 {len(stale_ids)}명")
+
+    with open_journal(f"artist_dim/{logical_date}") as journal:
+        artist_ids = search_artist_ids(new_names, journal)
+
+        # 같은 아티스트의 여러 표기는 하나의 ID 아래 이름 키로 모은다
+        names_by_id = defaultdict(list)
+        for name, artist_id in zip(new_names, artist_ids):
+            if artist_id:
+                names_by_id[artist_id].append(name)
+
+        target_ids = list(dict.fromkeys(list(names_by_id) + stale_ids))
+        artists = fetch_artist_info(target_ids, journal)
+
+    updated_at = time.time()
+    rows = []
+    for artist_id in target_ids:
+        artist = artists.get(artist_id)
+        if not artist:
+            continue
+        name_keys = dim.nameKeys(artist_id) + [
+            key
+            for name in names_by_id.get(artist_id, []) + [artist["name"]]
+            for key in artist_name_keys(name)
+        ]
+        rows.append(
+            {
+                "artistId": artist_id,
+                "name": artist["name"],
+                "nameKeys": list(dict.fromkeys(name_keys)),
+                "genres": artist["genres"],
+                "updatedAt": updated_at,
+            }
+        )
+
+    # Snowflake 에 먼저 반영하고, 성공했을 때만 로컬 사본을 갱신한다
+    dim.push(rows)
+    dim.upsert(rows)
+    print(f"✅ artist_dim {len(rows)}명 갱신: {dim.summary()}")
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# DAG 폴더를 import 경로에 추가해서 Airflow 와 같은 방식으로 plugins 를 import 한다
+DAGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dags")
+sys.path.insert(0, DAGS_DIR)
+
+# fetch 상태, 캐시 파일이 /opt/airflow/data 대신 임시 디렉터리에 쓰이도록 한다
+os.environ.setdefault("AIRFLOW_VAR_DATA_DIR", tempfile.mkdtemp(prefix="s4tify-test-"))
@@ -0,0 +1,34 @@
+import pytest
+from plugins.artist_cache import (MISS, ArtistCache, artist_name_keys,
+                                  artist_search_name)
+
+
+@pytest.mark.parametrize(
+    "name, keys, search",
+    [
+        ("IVE (아이브)", ["ive (아이브)", "ive", "아이브"], "ive"),
+        (
+            "Kid Milli (키드밀리) (Feat. pH-1)",
+            ["kid milli (키드밀리) (feat. ph-1)", "kid milli (키드밀리)", "kid milli", "키드밀리"],
+            "kid milli",
+        ),
+        ("PSY (싸이) [with SUGA]", ["psy (싸이) [with suga]", "psy (싸이)", "psy", "싸이"], "psy"),
+        ("아이유 feat. 박명수", ["아이유 feat. 박명수", "아이유"], "아이유"),
+        ("(여자)아이들", ["(여자)아이들"], "(여자)아이들"),
+        # 같은 문자로 쓴 괄호는 별칭이 아니라 유닛/그룹 이름의 일부
+        ("WSG워너비 (가야G)", ["wsg워너비 (가야g)"], "wsg워너비 (가야g)"),
+        ("SUPER JUNIOR (D&E)", ["super junior (d&e)"], "super junior (d&e)"),
+    ],
+)
+def test_artist_name_keys(name, keys, search):
+    assert artist_name_keys(name) == keys
+    assert artist_search_name(name) == search
+
+
+def test_put_aliases_keeps_existing_artist(tmp_path):
+    cache = ArtistCache(str(tmp_path / "artist_cache.sqlite3"))
+    cache.putAliases(["IVE (아이브)"], "ive-id")
+    cache.putAliases(["아이브"], "other-id")
+
+    assert cache.getAliasId("아이브") == "ive-id"
+    assert cache.getAliasId("WSG워너비 (가야G)") is MISS
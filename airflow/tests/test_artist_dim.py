@@ -0,0 +1,17 @@
+from plugins.artist_dim import UNKNOWN_GENRES, ArtistDim
+
+
+def test_genres_and_keys(tmp_path):
+    dim = ArtistDim(str(tmp_path / "artist_dim.sqlite3"))
+    dim.upsert(
+        [
+            {"artistId": "iu", "name": "IU", "nameKeys": ["iu", "아이유"], "genres": ["k-pop"], "updatedAt": 0},
+            {"artistId": "ive", "name": "IVE", "nameKeys": ["ive", "아이브"], "genres": [], "updatedAt": 0},
+        ]
+    )
+
+    genres, keys = dim.genresAndKeys(["아이유 (Feat. 박명수)", "IVE (아이브)", "New Artist"])
+
+    assert genres == [["k-pop"], UNKNOWN_GENRES, UNKNOWN_GENRES]
+    # 매칭된 키, 또는 처음 보는 아티스트는 update_artist_dim 이 인덱싱할 가장 구체적인 키
+    assert keys == ["아이유", "ive", "new artist"]
@@ -0,0 +1,19 @@
+import json
+
+from plugins.chart_serializers import loads_ndjson
+
+
+def chart(*images):
+    header = {"meta": {"provider": "melon", "name": "TOP100", "date": "2026-10-17T01:00:00"},
+              "fields": ["rank", "title", "artist", "image"]}
+    rows = [{"rank": i + 1, "title": "노래", "artist": "아이유", "image": image} for i, image in enumerate(images)]
+    return loads_ndjson([json.dumps(header)] + [json.dumps(row) for row in rows])
+
+
+def test_content_digest_handles_missing_strings():
+    # API 가 null 을 보내거나 필드가 빠진 항목은 None 으로 저장된다
+    digest = chart(None, "a.jpg").contentDigest()
+
+    assert digest == chart(None, "a.jpg").contentDigest()
+    assert digest != chart("", "a.jpg").contentDigest()
+    assert digest != chart("a.jpg", None).contentDigest()
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+
+from plugins.chart_cache import ChartCache
+from plugins.chart_serializers import loads_ndjson
+
+
+def snapshot(provider):
+    header = {"meta": {"provider": provider, "name": "TOP100", "date": "2026-10-17T01:00:00"},
+              "fields": ["rank", "title", "artist"]}
+    return loads_ndjson([json.dumps(header), json.dumps({"rank": 1, "title": "노래", "artist": "아티스트"})])
+
+
+def test_put_keeps_snapshots_read_with_a_longer_ttl(tmp_path):
+    cache = ChartCache(str(tmp_path), ttl=600)
+    melon = snapshot("melon")
+    cache.put(melon)
+    old = time.time() - 1800
+    os.utime(cache.path(melon.cacheKey), (old, old))
+
+    # 다른 차트를 저장해도 기본 ttl 보다 오래된 스냅샷을 지우지 않는다
+    cache.put(snapshot("vibe"))
+
+    assert cache.get(melon.cacheKey) is None
+    assert cache.get(melon.cacheKey, ttl=3600) is not None
+
+
+def test_evict_removes_snapshots_older_than_max_age(tmp_path):
+    cache = ChartCache(str(tmp_path), ttl=600, maxAge=3600)
+    melon = snapshot("melon")
+    cache.put(melon)
+    old = time.time() - 7200
+    os.utime(cache.path(melon.cacheKey), (old, old))
+
+    cache.evict()
+
+    assert not os.path.exists(cache.path(melon.cacheKey))
+
+
+def test_evict_skips_snapshots_removed_by_another_process(tmp_path, monkeypatch):
+    cache = ChartCache(str(tmp_path))
+    cache.put(snapshot("melon"))
+    scanned = cache._scan()
+    # scan 과 stat 사이에 다른 worker 가 스냅샷을 지운 경우
+    cache.clear()
+    monkeypatch.setattr(cache, "_scan", lambda: scanned)
+
+    cache.put(snapshot("vibe"))
+
+    assert cache.get(snapshot("vibe").cacheKey) is not None
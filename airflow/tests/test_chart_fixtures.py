@@ -0,0 +1,43 @@
+import pytest
+from plugins.chart_fetcher import CHART_PROVIDERS
+from plugins.chart_fixtures import (SYNTHETIC_FIXTURE_DIR, ChartFixture,
+                                    replay_chart)
+
+# benchmarks/fixtures/synthetic 의 응답은 녹화본이 아니라 손으로 작성한 것이다.
+# provider 별 구조만 흉내 내고, 모든 provider 가 같은 5곡을 같은 순서로 담고 있다
+EXPECTED = [
+    ("나는 반딧불", "황가람", 1),
+    ("APT.", "로제 (ROSÉ)", 2),
+    ("HOME SWEET HOME (feat. 태양, 대성)", "G-DRAGON", 3),
+    ("오늘만 I LOVE YOU", "BOYNEXTDOOR", 4),
+    ("Whiplash", "aespa", 5),
+]
+# genie 는 피처링 아티스트를 ARTIST_NAME 한 필드에 같이 담아서 보낸다
+EXPECTED_GENIE = [
+    (title, "로제 (ROSÉ) & Bruno Mars" if title == "APT." else artist, rank)
+    for title, artist, rank in EXPECTED
+]
+
+
+def _rows(chart):
+    return [(e.title, e.artist, e.rank) for e in chart.entries]
+
+
+@pytest.mark.parametrize("provider", list(CHART_PROVIDERS))
+def test_replay_synthetic_fixture(provider):
+    chart = replay_chart(provider, ChartFixture.load(provider, SYNTHETIC_FIXTURE_DIR))
+    assert chart.fetchEntries() is True
+
+    assert _rows(chart) == (EXPECTED_GENIE if provider == "genie" else EXPECTED)
+    assert chart.date is not None
+
+
+@pytest.mark.parametrize("provider", list(CHART_PROVIDERS))
+def test_stream_matches_fetch(provider):
+    fixture = ChartFixture.load(provider, SYNTHETIC_FIXTURE_DIR)
+    fetched = replay_chart(provider, fixture)
+    fetched.fetchEntries()
+
+    streamed = replay_chart(provider, fixture)
+    assert [(e.title, e.artist, e.rank) for e in streamed.streamEntries()] == _rows(fetched)
+    assert streamed.columns.toDict() == fetched.columns.toDict()
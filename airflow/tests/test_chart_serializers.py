@@ -0,0 +1,21 @@
+import json
+
+import pytest
+from plugins.chart_serializers import ChartSerializeException, loads_ndjson
+
+HEADER = json.dumps({"meta": {"provider": "melon", "name": "TOP100", "date": "2026-10-17T01:00:00"},
+                     "fields": ["rank", "title"]})
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ["{not json"],
+        [HEADER, '{"rank": 1, "title": "노래"}', '{"rank": 2, "ti'],
+        [HEADER, '[1, "노래"]'],
+    ],
+)
+def test_loads_ndjson_raises_serialize_exception(lines):
+    # 헤더와 항목 모두 같은 예외로 실패한다
+    with pytest.raises(ChartSerializeException):
+        loads_ndjson(lines)
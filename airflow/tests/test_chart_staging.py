@@ -0,0 +1,39 @@
+import json
+from datetime import date
+
+import pytest
+from plugins.chart_serializers import loads_ndjson
+from plugins.chart_staging import (ChartStagingException, chart_schema,
+                                   write_chart_parquet)
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def melon_chart():
+    header = {"meta": {"provider": "melon", "name": "TOP100", "date": "2026-10-17T01:00:00"},
+              "fields": ["rank", "title", "artist", "lastPos", "isNew", "image"]}
+    rows = [
+        {"rank": 1, "title": "노래", "artist": "아이유", "lastPos": None, "isNew": True, "image": "a.jpg"},
+        {"rank": 2, "title": "Song, 2", "artist": "BTS", "lastPos": 1, "isNew": False, "image": "b.jpg"},
+    ]
+    return loads_ndjson([json.dumps(header)] + [json.dumps(row) for row in rows])
+
+
+def test_write_chart_parquet(tmp_path):
+    path = write_chart_parquet(
+        melon_chart(), [["k-pop"], ["Unknown"]], ["아이유", "bts"], str(tmp_path / "melon.parquet"), "2026-10-17"
+    )
+
+    table = pq.read_table(path)
+    assert table.schema.equals(chart_schema())
+    first, second = table.to_pylist()
+    assert first == {
+        "rank": 1, "title": "노래", "artist": "아이유", "artist_key": "아이유", "genres": ["k-pop"], "lastPos": None,
+        "image": "a.jpg", "peakPos": None, "isNew": True, "source": "melon", "date": date(2026, 10, 17),
+    }
+    assert second["lastPos"] == 1 and second["isNew"] is False
+
+
+def test_write_chart_parquet_checks_genres(tmp_path):
+    with pytest.raises(ChartStagingException):
+        write_chart_parquet(melon_chart(), [["k-pop"]], ["아이유"], str(tmp_path / "melon.parquet"), "2026-10-17")
@@ -0,0 +1,57 @@
+import json
+
+from plugins.bugs import ChartData as BugsChartData
+from plugins.chart_fixtures import (_bugs_item, _bugs_payload, _genie_item,
+                                    _genie_payload)
+from plugins.genie import ChartData as GenieChartData
+
+CHUNK_SIZE = 1024
+
+
+class StreamedResponse:
+    """A 200 response whose body is handed out in `CHUNK_SIZE` chunks, counting how many were read."""
+
+    status_code = 200
+
+    def __init__(self, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.chunks = [body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_limit_stops_without_optional_meta():
+    data = _genie_payload([_genie_item(i) for i in range(200)])
+    # RetMsg 가 없는 응답도 상위 limit 개를 읽으면 멈춘다
+    del data["Result"]["RetMsg"]
+    res = StreamedResponse(data)
+    chart = GenieChartData(fetch=False)
+
+    ranks = [entry.rank for entry in chart._streamEntries(res, 3)]
+
+    assert ranks == [1, 2, 3]
+    assert chart.date.strftime("%H:%M") == "11:00"
+    assert res.read < len(res.chunks) // 10
+    assert res.closed
+
+
+def test_limit_reads_on_for_required_meta_after_the_items():
+    data = _bugs_payload([_bugs_item(i) for i in range(200)])
+    # 필수 메타데이터가 목록 뒤에 오면 끝까지 읽어서라도 가져온다
+    data["info"] = data.pop("info")
+    res = StreamedResponse(data)
+    chart = BugsChartData(fetch=False)
+
+    ranks = [entry.rank for entry in chart._streamEntries(res, 3)]
+
+    assert ranks == [1, 2, 3]
+    assert chart.date is not None
+    assert res.read == len(res.chunks)
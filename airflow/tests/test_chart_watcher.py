@@ -0,0 +1,53 @@
+from plugins import chart_watcher
+from plugins.chart_base import ChartColumns
+from plugins.chart_fixtures import (SYNTHETIC_FIXTURE_DIR, ChartFixture,
+                                    replay_chart)
+from plugins.chart_watcher import (DROP, MOVE, NEW, ChartWatcher, diff_charts,
+                                   next_publish_delay)
+
+
+def columns(*rows):
+    # 순위가 없는 항목은 ChartColumns 안에서 -1 로 저장된다
+    titles, ranks = zip(*rows)
+    return ChartColumns.fromDict({"title": list(titles), "artist": ["아티스트"] * len(rows), "rank": list(ranks)})
+
+
+def test_diff_charts_reports_missing_rank_as_none():
+    previous = columns(("A", 1), ("B", 2), ("C", 3))
+    current = columns(("B", 1), ("A", 2), ("D", None))
+
+    changes = {(c["kind"], c["title"]): (c["rank"], c["prevRank"]) for c in diff_charts("melon", previous, current)}
+
+    assert changes == {
+        (MOVE, "B"): (1, 2),
+        (MOVE, "A"): (2, 1),
+        (NEW, "D"): (None, None),
+        (DROP, "C"): (None, 3),
+    }
+
+
+def test_next_publish_delay_aligns_to_the_hour():
+    assert next_publish_delay(3600, now=10 * 3600 + 125) == 3600 - 125
+    assert next_publish_delay(3600, now=10 * 3600) == 3600
+
+
+def test_changes_are_resent_when_the_sink_fails(monkeypatch):
+    fixture = ChartFixture.load("melon", SYNTHETIC_FIXTURE_DIR)
+    monkeypatch.setattr(chart_watcher, "CHART_PROVIDERS", {"melon": lambda session: replay_chart("melon", fixture)})
+    sent = []
+
+    def sink(provider, records):
+        if not sent:
+            sent.append(None)
+            raise ConnectionError("kafka is down")
+        sent.append(records)
+
+    watcher = ChartWatcher(sink, sources=["melon"], retryInterval=4242)
+
+    # 전송에 실패하면 루프를 멈추지 않고 retryInterval 뒤에 다시 시도한다
+    assert watcher.step("melon") == 4242
+    assert watcher.step("melon") != 4242
+    assert [(r["kind"], r["rank"]) for r in sent[1]] == [(NEW, rank) for rank in range(1, 6)]
+    # 전송에 성공한 차트는 기억되어 다시 보내지 않는다
+    assert watcher.step("melon") == 4242
+    assert len(sent) == 2
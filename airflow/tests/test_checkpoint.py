@@ -0,0 +1,134 @@
+import os
+
+import pytest
+from plugins.checkpoint import MISS, CheckpointJournal, S3CheckpointJournal
+
+
+class Calls:
+    def __init__(self, func):
+        self.func = func
+        self.items = []
+
+    def __call__(self, item):
+        self.items.append(item)
+        return self.func(item)
+
+
+def test_run_resumes_from_the_journal(tmp_path):
+    first = CheckpointJournal("melon_chart/202610170100", str(tmp_path))
+    # 두 번째 항목에서 실패한 시도
+    with pytest.raises(RuntimeError):
+        with first:
+            first.run(Calls(lambda item: item.upper() if item != "b" else _fail()), ["a", "b", "c"])
+
+    retry = CheckpointJournal("melon_chart/202610170100", str(tmp_path))
+    calls = Calls(str.upper)
+    with retry:
+        assert retry.run(calls, ["a", "b", "c", "a"]) == ["A", "B", "C", "A"]
+
+    # 이미 끝난 "a" 는 다시 호출하지 않고, 중복 항목도 한 번만 호출한다
+    assert calls.items == ["b", "c"]
+    assert retry.stats == {"resumed": 1, "recorded": 2}
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def test_run_does_not_record_none(tmp_path):
+    journal = CheckpointJournal("spotify", str(tmp_path))
+    assert journal.run(lambda item: None if item == "b" else item, ["a", "b"]) == ["a", None]
+    journal.close()
+
+    reopened = CheckpointJournal("spotify", str(tmp_path))
+    assert "a" in reopened
+    assert reopened.get("b") is MISS
+
+
+def test_tuple_keys_round_trip(tmp_path):
+    journal = CheckpointJournal("lastfm", str(tmp_path))
+    journal.put(("아이유", "love wins all"), ["k-pop"])
+    journal.put(("아이유", "love wins all"), ["ballad"], section="other")
+    journal.close()
+
+    reopened = CheckpointJournal("lastfm", str(tmp_path))
+    assert reopened.get(("아이유", "love wins all")) == ["k-pop"]
+    assert reopened.get(("아이유", "love wins all"), section="other") == ["ballad"]
+    assert reopened.getMany([("아이유", "love wins all"), ("bts", "dynamite")]) == {
+        ("아이유", "love wins all"): ["k-pop"]
+    }
+    calls = Calls(lambda key: ["pop"])
+    assert reopened.run(calls, [("아이유", "love wins all"), ("bts", "dynamite")]) == [["k-pop"], ["pop"]]
+    assert calls.items == [("bts", "dynamite")]
+
+
+def test_truncated_last_line_is_dropped(tmp_path):
+    journal = CheckpointJournal("vibe", str(tmp_path))
+    journal.putMany({"a": 1, "b": 2})
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('["", "c", ')
+
+    reopened = CheckpointJournal("vibe", str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.get("c") is MISS
+    assert reopened.run(lambda item: 3, ["c"]) == [3]
+
+
+def test_journal_is_kept_on_error_and_removed_on_success(tmp_path):
+    with pytest.raises(ValueError):
+        with CheckpointJournal("bugs", str(tmp_path)) as journal:
+            journal.put("a", 1)
+            raise ValueError
+    assert os.path.exists(journal.path)
+
+    with CheckpointJournal("bugs", str(tmp_path)) as journal:
+        assert journal.get("a") == 1
+    assert not os.path.exists(journal.path)
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+
+    def load_string(self, data, key, bucket_name, replace):
+        self.uploads += 1
+        self.objects[(bucket_name, key)] = data
+
+    def check_for_key(self, key, bucket_name):
+        return (bucket_name, key) in self.objects
+
+    def read_key(self, key, bucket_name):
+        return self.objects[(bucket_name, key)]
+
+    def delete_objects(self, bucket, keys):
+        for key in keys:
+            self.objects.pop((bucket, key), None)
+
+
+def s3_journal(directory, s3, **kwargs):
+    journal = S3CheckpointJournal("flo", str(directory), bucket="bucket", **kwargs)
+    journal._hook = s3
+    return journal
+
+
+def test_s3_journal_syncs_and_resumes_on_another_worker(tmp_path):
+    s3 = FakeS3()
+    journal = s3_journal(tmp_path / "worker1", s3, syncEvery=2, syncInterval=3600)
+    journal.put("a", 1)
+    assert s3.uploads == 0
+    journal.put("b", 2)
+    assert s3.uploads == 1
+    journal.put("c", 3)
+    # close() 는 아직 올리지 않은 기록을 업로드한다
+    journal.close()
+    assert s3.uploads == 2
+
+    # 로컬 journal 이 없는 다른 worker 에서 재시도
+    retry = s3_journal(tmp_path / "worker2", s3)
+    assert retry.getMany(["a", "b", "c", "d"]) == {"a": 1, "b": 2, "c": 3}
+
+    retry.complete()
+    assert s3.objects == {}
+    assert not os.path.exists(retry.path)
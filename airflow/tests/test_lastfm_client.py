@@ -0,0 +1,113 @@
+from plugins.artist_cache import MISS
+from plugins.checkpoint import CheckpointJournal
+from plugins.lastfm_client import LastfmClient, get_track_tags
+from plugins.rate_limit import TokenBucket
+from plugins.track_tag_cache import TrackTagCache, track_key
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Answers `track.getInfo` from `{track: tags}`; a track mapped to an exception fails the request."""
+
+    def __init__(self, tracks):
+        self.tracks = tracks
+        self.requested = []
+
+    def get(self, url, params):
+        self.requested.append((params["artist"], params["track"]))
+        tags = self.tracks.get(params["track"])
+        if isinstance(tags, Exception):
+            return FakeResponse({"error": 11, "message": "Service Offline"}, 503)
+        if tags is None:
+            return FakeResponse({"error": 6, "message": "Track not found"})
+        return FakeResponse({"track": {"toptags": {"tag": [{"name": tag} for tag in tags]}}})
+
+
+def client(tmp_path, tracks):
+    return LastfmClient(
+        apiKey="key",
+        session=FakeSession(tracks),
+        limiter=TokenBucket(rate=1000, capacity=1000),
+        cache=TrackTagCache(str(tmp_path / "track_tag_cache.sqlite3")),
+    )
+
+
+def test_fetch_track_tags_dedupes_by_track_key(tmp_path):
+    lastfm = client(tmp_path, {"Supernova": ["k-pop", "dance"], "Unknown Song": None})
+    keys = [("aespa", "Supernova"), ("AESPA", "supernova "), ("aespa", "Unknown Song"), (None, "Supernova")]
+
+    result = get_track_tags(keys, lastfm)
+
+    assert result == {
+        ("aespa", "Supernova"): ["k-pop", "dance"],
+        ("AESPA", "supernova "): ["k-pop", "dance"],
+        ("aespa", "Unknown Song"): [],
+        (None, "Supernova"): [],
+    }
+    assert sorted(lastfm.session.requested) == [("aespa", "Supernova"), ("aespa", "Unknown Song")]
+
+    # 두 번째 조회는 캐시에서 끝난다
+    assert get_track_tags(keys, lastfm) == result
+    assert lastfm.requests == 2
+
+
+def test_fetch_track_tags_resumes_from_the_journal(tmp_path):
+    journal = CheckpointJournal("spotify_song_genre/2026-10-17", str(tmp_path))
+    journal.put(track_key("IVE", "HEYA"), ["k-pop"])
+    lastfm = client(tmp_path, {"Magnetic": ["k-pop"]})
+
+    result = get_track_tags([("IVE", "HEYA"), ("ILLIT", "Magnetic")], lastfm, journal)
+
+    assert result == {("IVE", "HEYA"): ["k-pop"], ("ILLIT", "Magnetic"): ["k-pop"]}
+    assert lastfm.session.requested == [("ILLIT", "Magnetic")]
+    assert journal.get(track_key("ILLIT", "Magnetic")) == ["k-pop"]
+
+
+def test_failed_tracks_are_left_out(tmp_path):
+    lastfm = client(tmp_path, {"Supernova": ["k-pop"], "Armageddon": RuntimeError()})
+    journal = CheckpointJournal("lastfm", str(tmp_path))
+
+    result = get_track_tags([("aespa", "Supernova"), ("aespa", "Armageddon")], lastfm, journal)
+
+    # 실패한 곡은 결과에서 빠지므로 add_song_genre 가 "Error" 로 적는다
+    assert result == {("aespa", "Supernova"): ["k-pop"]}
+    assert track_key("aespa", "Armageddon") not in journal
+    assert lastfm.cache.getTags("aespa", "Armageddon") is MISS
+
+
+def test_non_json_429_backs_off_and_retries(tmp_path):
+    class ProxyResponse(FakeResponse):
+        def json(self):
+            raise ValueError("Expecting value: <html>Too Many Requests</html>")
+
+    class RateLimitedSession(FakeSession):
+        def get(self, url, params):
+            if not self.requested:
+                self.requested.append((params["artist"], params["track"]))
+                response = ProxyResponse(None, 429)
+                response.headers["Retry-After"] = "2"
+                return response
+            return super().get(url, params)
+
+    class Limiter(TokenBucket):
+        paused = []
+
+        def pause(self, seconds):
+            self.paused.append(seconds)
+
+    lastfm = client(tmp_path, {"Supernova": ["k-pop"]})
+    lastfm.session = RateLimitedSession({"Supernova": ["k-pop"]})
+    lastfm.limiter = Limiter(rate=1000, capacity=1000)
+
+    assert lastfm.trackTags("aespa", "Supernova") == ["k-pop"]
+    assert lastfm.limiter.paused == [2.0]
+    assert lastfm.requests == 2
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+from plugins import rate_limit
+from plugins.rate_limit import SharedTokenBucket, TokenBucket, parse_retry_after
+from plugins.spotify_client import SpotifyClient
+
+
+class FakeClock:
+    """Stands in for the `time` module so waits advance the clock instead of sleeping."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) == rate_limit.DEFAULT_RETRY_AFTER
+    assert parse_retry_after("soon", default=1.5) == 1.5
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+
+
+def test_token_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.slept == []
+
+    bucket.acquire()
+    assert sum(clock.slept) == pytest.approx(0.5)
+
+
+def test_token_bucket_pause_blocks_every_caller(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(5)
+    bucket.pause(1)  # 더 짧은 pause 가 앞선 pause 를 줄이지 않는다
+
+    bucket.acquire()
+    assert sum(clock.slept) == pytest.approx(5.0)
+
+
+def test_shared_bucket_is_shared_between_instances(clock, tmp_path):
+    path = str(tmp_path / "rate_limit.sqlite3")
+    first = SharedTokenBucket("spotify", rate=1, capacity=2, path=path)
+    second = SharedTokenBucket("spotify", rate=1, capacity=2, path=path)
+    other = SharedTokenBucket("lastfm", rate=1, capacity=2, path=path)
+
+    first.acquire()
+    first.acquire()
+    other.acquire()
+    assert clock.slept == []
+
+    # 다른 프로세스의 limiter 도 같은 버킷에서 토큰을 가져간다
+    second.acquire()
+    assert sum(clock.slept) == pytest.approx(1.0)
+
+    clock.slept.clear()
+    second.pause(30)
+    assert first.utilization()["pausedFor"] == pytest.approx(30)
+    first.acquire()
+    assert sum(clock.slept) == pytest.approx(30.0)
+    assert other.utilization()["pausedFor"] == 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        return self.responses.pop(0)
+
+
+def test_spotify_429_pauses_the_limiter_for_retry_after(clock):
+    limiter = TokenBucket(rate=100, capacity=100)
+    session = FakeSession(FakeResponse(429, {"Retry-After": "3"}), FakeResponse(200))
+    client = SpotifyClient(session=session, limiter=limiter, tokenProvider=lambda: "token")
+
+    assert client.get("/artists/1").status_code == 200
+    assert client.stats["rateLimited"] == 1
+    # 같은 limiter 를 쓰는 다른 worker 도 Retry-After 동안 멈춘다
+    assert sum(clock.slept) == pytest.approx(3.0)
+    limiter.acquire()
+    assert sum(clock.slept) == pytest.approx(3.0)
+
+
+def test_shared_bucket_waits_for_another_writer(tmp_path):
+    path = str(tmp_path / "rate_limit.sqlite3")
+    bucket = SharedTokenBucket("spotify", rate=100, capacity=100, path=path)
+    bucket.acquire()
+
+    # 다른 프로세스가 쓰기 트랜잭션을 잡고 있으면 BEGIN IMMEDIATE 에서 기다린다
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (bucket.acquire(), done.set()))
+    thread.start()
+    assert not done.wait(0.2)
+
+    writer.execute("COMMIT")
+    thread.join(5)
+    assert done.is_set()
+    writer.close()
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+from plugins import spotify_client
+from plugins.rate_limit import TokenBucket
+from plugins.spotify_client import (ArtistBatchResolver, SpotifyClient,
+                                    SpotifyRequestException, enrich,
+                                    get_artist_resolver)
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+        self.headers = {}
+        self.text = str(self.data)
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Answers `/artists?ids=` with one artist per ID, or `status` for every request when it is set."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.batches = []
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers, params):
+        with self._lock:
+            self.tokens.append(headers["Authorization"])
+            ids = params["ids"].split(",")
+            self.batches.append(ids)
+        if self.status != 200:
+            return FakeResponse(self.status, {"error": {"status": self.status}})
+        return FakeResponse(200, {"artists": [{"id": id, "name": f"artist {id}"} for id in ids]})
+
+
+def client(session):
+    return SpotifyClient(
+        session=session, limiter=TokenBucket(rate=1000, capacity=1000), tokenProvider=lambda: "token"
+    )
+
+
+def test_concurrent_lookups_are_batched():
+    session = FakeSession()
+    resolver = ArtistBatchResolver(flushDelay=0.5, client=client(session))
+    futures = {}
+    start = threading.Barrier(120)
+
+    def submit(id):
+        start.wait()
+        futures[id] = resolver.submit(id)
+
+    threads = [threading.Thread(target=submit, args=(f"id{i}",)) for i in range(120)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {id: future.result(timeout=5)["id"] for id, future in futures.items()} == {id: id for id in futures}
+    assert sorted(len(batch) for batch in session.batches) == [20, 50, 50]
+    assert resolver.requests == 3
+
+    resolver.close()
+    assert not resolver._worker.is_alive()
+
+
+def test_failed_batch_fails_its_waiters():
+    resolver = ArtistBatchResolver(client=client(FakeSession(status=500)))
+    futures = [resolver.submit(f"id{i}") for i in range(3)]
+    resolver.flush()
+
+    for future in futures:
+        assert isinstance(future.exception(timeout=5), SpotifyRequestException)
+    with pytest.raises(SpotifyRequestException):
+        resolver.resolve(["id9"])
+
+    resolver.close()
+    assert not resolver._worker.is_alive()
+    with pytest.raises(RuntimeError):
+        resolver.submit("id10")
+
+
+def test_unauthorized_refreshes_the_token_once():
+    class UnauthorizedSession(FakeSession):
+        def get(self, url, headers, params):
+            super().get(url, headers, params)
+            return FakeResponse(401)
+
+    session = UnauthorizedSession()
+    tokens = iter(["old", "new", "newer"])
+    current = [next(tokens)]
+    refreshed = []
+
+    def refresh(token):
+        refreshed.append(token)
+        current[0] = next(tokens)
+
+    spotify = SpotifyClient(
+        session=session,
+        limiter=TokenBucket(rate=1000, capacity=1000),
+        tokenProvider=lambda: current[0],
+        onUnauthorized=refresh,
+    )
+
+    # 갱신한 토큰도 거절되면 더 재시도하지 않고 401 응답을 돌려준다
+    assert spotify.get("/artists", {"ids": "a"}).status_code == 401
+    assert refreshed == ["old"]
+    assert session.tokens == ["Bearer old", "Bearer new"]
+    with pytest.raises(SpotifyRequestException):
+        spotify.json("/artists", {"ids": "a"})
+
+
+def test_enrich_keeps_order_and_uses_default_on_error():
+    def square(n):
+        if n == 3:
+            raise ValueError(n)
+        return n * n
+
+    assert enrich(square, range(6), maxConcurrency=3, default=-1) == [0, 1, 4, -1, 16, 25]
+    assert enrich(square, []) == []
+
+
+def test_get_artist_resolver_is_shared(monkeypatch):
+    monkeypatch.setattr(spotify_client, "_shared_resolver", None)
+    monkeypatch.setattr(spotify_client, "get_spotify_client", lambda: client(FakeSession()))
+
+    resolver = get_artist_resolver()
+    assert get_artist_resolver() is resolver
+    assert resolver.resolve(["a", "b", "a"]) == {"a": {"id": "a", "name": "artist a"},
+                                                 "b": {"id": "b", "name": "artist b"}}
+    resolver.close()
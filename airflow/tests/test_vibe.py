@@ -0,0 +1,51 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from plugins.chart_fixtures import ChartFixture, _vibe_item, _vibe_payload
+from plugins.vibe import ChartData
+
+
+class PagedVibeSession(requests.Session):
+    """Serves `total` synthetic VIBE entries, honouring the `start`/`display` query parameters."""
+
+    def __init__(self, total):
+        super().__init__()
+        self.items = [_vibe_item(i) for i in range(total)]
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        query = parse_qs(urlparse(url).query)
+        start, display = int(query["start"][0]), int(query["display"][0])
+        payload = _vibe_payload(self.items[start - 1:start - 1 + display])
+        payload["response"]["result"]["chart"]["chartTotalCount"] = len(self.items)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return ChartFixture(200, {"Content-Type": "application/json"}, body).response()
+
+
+def test_fetch_all_entries_keeps_cache_key():
+    session = PagedVibeSession(250)
+    chart = ChartData(queryCount=100, fetch=False, session=session)
+    key = chart.cacheKey
+
+    assert chart.fetchAllEntries() is True
+    assert len(chart) == 250
+    assert list(chart.columns.rank) == list(range(1, 251))
+    assert chart.cacheKey == key
+    assert len(session.urls) == 3
+
+    # 같은 객체로 다시 호출해도 같은 페이지를 요청한다
+    session.urls.clear()
+    chart.fetchAllEntries()
+    assert len(chart) == 250 and len(session.urls) == 3
+
+
+def test_fetch_all_entries_conditional_skips_remaining_pages():
+    session = PagedVibeSession(250)
+    ChartData(queryCount=100, fetch=False, session=session).fetchAllEntries(conditional=True)
+
+    session.urls.clear()
+    chart = ChartData(queryCount=100, fetch=False, session=session)
+    assert chart.fetchAllEntries(conditional=True) is False
+    assert len(session.urls) == 1